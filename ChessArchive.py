@@ -0,0 +1,162 @@
+# Date: October 18, 2026
+# Description: Append-only binary archive of ChessVar games, read through mmap. The data file starts with a header
+#              (b"CVAR", version, checkpoint interval) followed by one record per game: its moves as 2-byte
+#              encoded moves (see ChessVar.encode_move), then a checkpoint (ChessVar.to_bytes) after every
+#              checkpoint interval plies. The index file (data path + ".idx") has one 16-byte entry per game: record
+#              offset, number of plies and number of checkpoints. A reader can jump to any ply of any game by
+#              loading the checkpoint before it and replaying fewer than checkpoint interval moves.
+
+import mmap
+import os
+import struct
+from ChessVar import ChessVar, POSITION_SIZE, decode_move
+
+_HEADER = struct.Struct("<4sBxH")                        # Magic, version, checkpoint interval
+_MAGIC = b"CVAR"
+_VERSION = 1
+_INDEX_ENTRY = struct.Struct("<QII")                     # Record offset, plies, checkpoints
+MOVE_SIZE = 2
+
+
+class ArchiveWriter:
+    """Represents a writer appending games to an archive (data file and index file). Use it as a context manager or
+    call close when done."""
+
+    def __init__(self, path, checkpoint_interval=32):
+        """Creates an ArchiveWriter for the archive at path, creating the archive if it does not exist yet. A new
+        archive stores a checkpoint every checkpoint_interval plies; an existing one keeps its own interval. Raises
+        ValueError if checkpoint_interval is not 1-65535 (the header keeps it in 2 bytes)."""
+        if not 1 <= checkpoint_interval <= 65535:
+            raise ValueError(f"checkpoint_interval must be 1-65535, not {checkpoint_interval}")
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._data_file = open(path, "ab")
+        self._index_file = open(path + ".idx", "ab")
+        if is_new:
+            self._data_file.write(_HEADER.pack(_MAGIC, _VERSION, checkpoint_interval))
+            self._checkpoint_interval = checkpoint_interval
+        else:
+            with open(path, "rb") as data_file:
+                self._checkpoint_interval = _read_header(data_file.read(_HEADER.size))
+
+    def __enter__(self):
+        """Returns the writer."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the archive files."""
+        self.close()
+
+    def close(self):
+        """Closes the archive files."""
+        self._data_file.close()
+        self._index_file.close()
+
+    def add_game(self, moves):
+        """Takes the encoded moves of a game from the starting position, checks each one with make_move and appends the
+        game to the archive. Raises ValueError (and appends nothing) if a move is not legal. Returns the number of
+        plies stored."""
+        today_game = ChessVar()
+        checkpoints = []
+        moves = list(moves)
+        for ply, move in enumerate(moves, 1):
+            if not today_game.make_move(*decode_move(move)):
+                raise ValueError(f"move {ply} ({''.join(decode_move(move))}) is not legal")
+            if ply % self._checkpoint_interval == 0:
+                checkpoints.append(today_game.to_bytes())
+
+        offset = self._data_file.tell()
+        self._data_file.write(struct.pack(f"<{len(moves)}H", *moves))
+        self._data_file.write(b"".join(checkpoints))
+        self._data_file.flush()
+        self._index_file.write(_INDEX_ENTRY.pack(offset, len(moves), len(checkpoints)))
+        self._index_file.flush()
+        return len(moves)
+
+
+def _read_header(header):
+    """Takes the first bytes of an archive and returns its checkpoint interval. Raises ValueError if it is not an
+    archive."""
+    if len(header) < _HEADER.size:
+        raise ValueError("not a ChessVar archive")
+    magic, version, checkpoint_interval = _HEADER.unpack_from(header)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not a ChessVar archive")
+    return checkpoint_interval
+
+
+class ArchiveReader:
+    """Represents a reader of an archive, with the data file and index file mapped into memory. Games written after the
+    reader was opened are not seen. Use it as a context manager or call close when done."""
+
+    def __init__(self, path):
+        """Creates an ArchiveReader for the archive at path."""
+        self._data_file = open(path, "rb")
+        self._index_file = open(path + ".idx", "rb")
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._checkpoint_interval = _read_header(self._data)
+        index_size = os.fstat(self._index_file.fileno()).st_size
+        self._game_count = index_size // _INDEX_ENTRY.size
+        self._index = None
+        if self._game_count:
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        """Returns the reader."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the archive."""
+        self.close()
+
+    def close(self):
+        """Closes the archive."""
+        if self._index is not None:
+            self._index.close()
+        self._data.close()
+        self._data_file.close()
+        self._index_file.close()
+
+    def __len__(self):
+        """Returns the number of games in the archive."""
+        return self._game_count
+
+    def get_checkpoint_interval(self):
+        """Returns the number of plies between checkpoints."""
+        return self._checkpoint_interval
+
+    def _entry(self, game_num):
+        """Takes a game number and returns its index entry (record offset, plies, checkpoints). Raises IndexError if
+        there is no such game."""
+        if not 0 <= game_num < self._game_count:
+            raise IndexError(f"game {game_num} is not in the archive")
+        return _INDEX_ENTRY.unpack_from(self._index, game_num * _INDEX_ENTRY.size)
+
+    def get_plies(self, game_num):
+        """Takes a game number and returns the number of plies of that game."""
+        return self._entry(game_num)[1]
+
+    def get_moves(self, game_num, start=0, stop=None):
+        """Takes a game number and returns a tuple of its encoded moves from ply start up to (not including) ply stop
+        (default: the end of the game)."""
+        offset, plies, checkpoints = self._entry(game_num)
+        stop = plies if stop is None else min(stop, plies)
+        if start >= stop:
+            return ()
+        return struct.unpack_from(f"<{stop - start}H", self._data, offset + start * MOVE_SIZE)
+
+    def get_position(self, game_num, ply):
+        """Takes a game number and a ply (0 = starting position, up to the number of plies of the game) and returns a
+        new ChessVar game in the position after that many plies. Starts from the last checkpoint at or before the ply
+        and replays the moves after it."""
+        offset, plies, checkpoints = self._entry(game_num)
+        if not 0 <= ply <= plies:
+            raise IndexError(f"game {game_num} has {plies} plies, not {ply}")
+        checkpoint_num = min(ply // self._checkpoint_interval, checkpoints)
+        if checkpoint_num:
+            checkpoint_offset = offset + plies * MOVE_SIZE + (checkpoint_num - 1) * POSITION_SIZE
+            today_game = ChessVar.from_bytes(self._data[checkpoint_offset:checkpoint_offset + POSITION_SIZE])
+        else:
+            today_game = ChessVar()
+        for move in self.get_moves(game_num, checkpoint_num * self._checkpoint_interval, ply):
+            today_game.make_encoded_move(move)
+        return today_game
@@ -0,0 +1,72 @@
+import unittest
+import os
+import random
+import tempfile
+from ChessVar import ChessVar, encode_move
+from ChessArchive import ArchiveWriter, ArchiveReader
+
+
+class TestChessArchive(unittest.TestCase):
+
+    def setUp(self):
+        """Writes an archive of random games with a checkpoint every 4 plies."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.cva")
+        rnd = random.Random(5)
+        self.games = []
+        with ArchiveWriter(self.path, checkpoint_interval=4) as writer:
+            for game_num in range(20):
+                today_game = ChessVar()
+                moves = []
+                while today_game.get_game_state() == "UNFINISHED" and len(moves) < 30:
+                    move = rnd.choice(today_game.generate_legal_moves())
+                    today_game.make_encoded_move(move)
+                    moves.append(move)
+                writer.add_game(moves)
+                self.games.append(moves)
+
+    def tearDown(self):
+        """Removes the archive."""
+        self.directory.cleanup()
+
+    def test_1(self):
+        """Tests every ply of every game seeks to the same position as replaying the game from the opening."""
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 20)
+            for game_num, moves in enumerate(self.games):
+                self.assertEqual(reader.get_moves(game_num), tuple(moves))
+                today_game = ChessVar()
+                for ply in range(len(moves) + 1):
+                    self.assertEqual(reader.get_position(game_num, ply).to_fen(), today_game.to_fen())
+                    if ply < len(moves):
+                        today_game.make_encoded_move(moves[ply])
+
+    def test_2(self):
+        """Tests appending to an existing archive keeps its checkpoint interval and earlier games."""
+        with ArchiveWriter(self.path, checkpoint_interval=50) as writer:
+            writer.add_game([encode_move("d2", "d4"), encode_move("e7", "e5")])
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 21)
+            self.assertEqual(reader.get_checkpoint_interval(), 4)
+            self.assertEqual(reader.get_moves(0), tuple(self.games[0]))
+            self.assertEqual(reader.get_moves(20, 1), (encode_move("e7", "e5"),))
+            self.assertEqual(reader.get_position(20, 2).get_square("e5"), "e5: black pawn")
+
+    def test_3(self):
+        """Tests an illegal game is not appended and bad game numbers and plies raise IndexError."""
+        with ArchiveWriter(self.path) as writer:
+            self.assertRaises(ValueError, writer.add_game, [encode_move("d2", "d5")])
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 20)
+            self.assertRaises(IndexError, reader.get_position, 20, 0)
+            self.assertRaises(IndexError, reader.get_position, 0, len(self.games[0]) + 1)
+
+    def test_4(self):
+        """Tests a checkpoint interval outside 1-65535 is refused before any file is created."""
+        path = os.path.join(self.directory.name, "other.cva")
+        for checkpoint_interval in (0, -1, 65536):
+            self.assertRaises(ValueError, ArchiveWriter, path, checkpoint_interval)
+        self.assertFalse(os.path.exists(path))
+        ArchiveWriter(path, 65535).close()
+        with ArchiveReader(path) as reader:
+            self.assertEqual(reader.get_checkpoint_interval(), 65535)
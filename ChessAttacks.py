@@ -0,0 +1,189 @@
+# Date: October 18, 2026
+# Description: Incrementally maintained attack maps for ChessVar. For every piece on the board, keeps the 64-bit mask
+#              of squares it attacks (bit n = square number n, a8 = bit 0): the squares where it would capture an
+#              opponent piece with its next move, as in ChessTensor.attack_maps. When a square changes, only the piece
+#              on it and the pieces whose attacks depend on it (sliders whose rays reach it, pawns that could move to
+#              or vertically capture from it) are worked out again, and only when the maps are next asked for, so
+#              keeping the maps costs a few pieces per query instead of 64 x 64 is_move_legal calls.
+
+from ChessVar import PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING, PIECE_MASK, BLACK, FIRST_MOVE, EMPTY
+from ChessBitboard import KNIGHT_MOVES, KING_MOVES
+
+
+def _build_rays():
+    """Returns (rook rays, bishop rays): for each square, a tuple of (mask of the squares met walking away from it in
+    one direction, True if the square numbers increase that way). Bishop rays leave out the direction towards row 8
+    and column a, since a bishop or queen only moves that way onto empty squares and so never captures that way."""
+    rook_rays = []
+    bishop_rays = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        rays = []
+        for row_step, col_step in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, 1), (1, -1)):
+            mask = 0
+            row_to, col_to = row + row_step, col + col_step
+            while 0 <= row_to < 8 and 0 <= col_to < 8:
+                mask |= 1 << (row_to * 8 + col_to)
+                row_to, col_to = row_to + row_step, col_to + col_step
+            rays.append((mask, row_step * 8 + col_step > 0))
+        rook_rays.append(tuple(rays[:4]))
+        bishop_rays.append(tuple(rays[4:]))
+    return tuple(rook_rays), tuple(bishop_rays)
+
+
+ROOK_RAYS, BISHOP_RAYS = _build_rays()
+
+
+def piece_attacks(squares, sq_num, occupied):
+    """Takes ChessVar's 64 square codes, the square number of a piece and the mask of occupied squares, and returns
+    (attacks, depends): the mask of squares the piece attacks and the mask of squares whose contents the attacks
+    depend on. A pawn attacks the squares it moves to (capturing by moving straight onto a piece) and the squares it
+    could vertically capture on (see PawnMove.check_vertical_capture: the right side only if there is no opponent
+    piece on the left side). Squares with the side's own pieces count as attacked when the piece could move there if
+    they were empty."""
+    code = squares[sq_num]
+    chess_piece = code & PIECE_MASK
+    if chess_piece == KNIGHT:
+        return KNIGHT_MOVES[sq_num], 0
+    if chess_piece == KING:
+        return KING_MOVES[sq_num], 0
+
+    if chess_piece == PAWN:
+        own_color = code & BLACK
+        attacks = 0
+        depends = 0
+        for step in (-8, 8):
+            dest = sq_num + step
+            if not 0 <= dest < 64:
+                continue
+            destinations = [dest]
+            if code & FIRST_MOVE and 0 <= dest + step < 64:
+                depends |= 1 << (dest + step)
+                if squares[dest] == EMPTY:
+                    destinations.append(dest + step)
+            for dest in destinations:
+                attacks |= 1 << dest
+                depends |= 1 << dest
+                in_dest = squares[dest]
+                if in_dest != EMPTY and in_dest & BLACK == own_color:
+                    # Not a legal destination, so no vertical capture from it
+                    continue
+                # Row 8 - r for white, list number r + 1 for black (see PawnMove.check_vertical_capture)
+                vert_row = 7 - dest // 8 if own_color == 0 else 9 - dest // 8
+                if vert_row > 7:
+                    continue
+                col = dest % 8
+                left_sq = vert_row * 8 + (col - 1) % 8
+                attacks |= 1 << left_sq
+                depends |= 1 << left_sq
+                if col < 7:
+                    right_sq = vert_row * 8 + col + 1
+                    depends |= 1 << right_sq
+                    left_code = squares[left_sq]
+                    if left_code == EMPTY or left_code & BLACK == own_color:
+                        attacks |= 1 << right_sq
+        return attacks, depends
+
+    rays = ()
+    if chess_piece == ROOK or chess_piece == QUEEN:
+        rays = ROOK_RAYS[sq_num]
+    if chess_piece == BISHOP or chess_piece == QUEEN:
+        rays += BISHOP_RAYS[sq_num]
+    attacks = 0
+    for ray, increasing in rays:
+        blockers = ray & occupied
+        if not blockers:
+            attacks |= ray
+        elif increasing:
+            # Up to the lowest blocker
+            attacks |= ray & (((blockers & -blockers) << 1) - 1)
+        else:
+            # Down to the highest blocker
+            attacks |= ray & -(1 << (blockers.bit_length() - 1))
+    return attacks, attacks
+
+
+class AttackMap:
+    """Represents the attack maps of a ChessVar board: the attack mask of every piece and, for sliders and pawns, the
+    mask of squares it depends on. ChessVar calls set_square after every change to the board it shares with the
+    AttackMap. Changed squares are only noted there; the pieces they affect are worked out again at the next query,
+    so a move and its unmake_move cost nothing until someone asks."""
+
+    def __init__(self, squares):
+        """Creates an AttackMap of ChessVar's 64 square codes (the same bytearray, not a copy)."""
+        self._squares = squares
+        self._attacks = {}                               # Square number of a piece -> its attack mask
+        self._depends = {}                               # Square number of a slider or pawn -> mask it depends on
+        self._occupied = 0
+        for sq_num in range(64):
+            if squares[sq_num] != EMPTY:
+                self._occupied |= 1 << sq_num
+        self._changed = self._occupied                   # Squares changed since the attacks were last worked out
+
+    def set_board(self, squares):
+        """Takes the bytearray that holds ChessVar's square codes from now on (a copy of the one shared until now, so
+        the attacks worked out so far still hold)."""
+        self._squares = squares
+
+    def _update(self, sq_num):
+        """Works out the attacks of the piece on a square again (or forgets the square if it is empty)."""
+        if self._squares[sq_num] == EMPTY:
+            self._attacks.pop(sq_num, None)
+            self._depends.pop(sq_num, None)
+            return
+        attacks, depends = piece_attacks(self._squares, sq_num, self._occupied)
+        self._attacks[sq_num] = attacks
+        if depends:
+            self._depends[sq_num] = depends
+        else:
+            self._depends.pop(sq_num, None)
+
+    def set_square(self, sq_num, code):
+        """Takes the number of a square that was just changed to code and notes the change."""
+        bit = 1 << sq_num
+        self._changed |= bit
+        if code == EMPTY:
+            self._occupied &= ~bit
+        else:
+            self._occupied |= bit
+
+    def _refresh(self):
+        """Works out again the attacks of the pieces on the changed squares and of every piece depending on one of
+        them. The other pieces read only squares that did not change, so their attacks are still right."""
+        changed = self._changed
+        if not changed:
+            return
+        affected = changed
+        for piece_sq, depends in self._depends.items():
+            if depends & changed:
+                affected |= 1 << piece_sq
+        while affected:
+            low_bit = affected & -affected
+            self._update(low_bit.bit_length() - 1)
+            affected ^= low_bit
+        self._changed = 0
+
+    def get_attacks(self, sq_num):
+        """Returns the attack mask of the piece on a square (0 if it is empty)."""
+        self._refresh()
+        return self._attacks.get(sq_num, 0)
+
+    def get_attacked(self, color_bit):
+        """Takes a color bit (0 white, BLACK) and returns the mask of squares attacked by that side's pieces."""
+        self._refresh()
+        squares = self._squares
+        attacked = 0
+        for sq_num, attacks in self._attacks.items():
+            if squares[sq_num] & BLACK == color_bit:
+                attacked |= attacks
+        return attacked
+
+    def get_attackers(self, sq_num):
+        """Returns the mask of squares whose pieces (of either side) attack a square."""
+        self._refresh()
+        bit = 1 << sq_num
+        attackers = 0
+        for piece_sq, attacks in self._attacks.items():
+            if attacks & bit:
+                attackers |= 1 << piece_sq
+        return attackers
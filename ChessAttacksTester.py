@@ -0,0 +1,92 @@
+import unittest
+import random
+from ChessVar import ChessVar, SQUARE_NAMES
+from ChessAttacks import AttackMap
+
+try:
+    import numpy as np
+    from ChessTensor import attack_maps
+except ImportError:
+    np = None
+
+
+def capturable_pieces(today_game):
+    """Returns the set of square locations of the opponent pieces the current player's legal moves remove."""
+    black_to_move = today_game.get_current_turn() == "black"
+    opponent = [sq_num for sq_num in range(64) if today_game._squares[sq_num] and
+                bool(today_game._squares[sq_num] & 8) != black_to_move]
+    captured = set()
+    for move in today_game.generate_legal_moves():
+        before = bytes(today_game._squares)
+        today_game.make_encoded_move(move)
+        captured.update(SQUARE_NAMES[sq_num] for sq_num in opponent if today_game._squares[sq_num] != before[sq_num])
+        today_game.unmake_move()
+    return captured
+
+
+class TestChessAttacks(unittest.TestCase):
+
+    def test_1(self):
+        """Tests attacks, attackers and threatened pieces in the first moves of a game."""
+        today_game = ChessVar()
+        self.assertEqual(today_game.attackers_of("f3"), ("f2", "g1"))
+        # b2 and d2 could move to row 3 and vertically capture on row 6
+        self.assertEqual(today_game.attackers_of("c6"), ("b8", "c7", "b2", "d2"))
+        self.assertIn("d1", today_game.attacked_squares("white"))
+        self.assertNotIn("d7", today_game.attacked_squares("white"))
+        today_game.make_move("g1", "f3")
+        self.assertEqual(today_game.attackers_of("f3"), ("f2",))
+        # h7 could move to h6 and vertically capture on row 1, on the left side of column h
+        self.assertEqual(today_game.attackers_of("g1"), ("h7", "f3", "g2", "h1"))
+        self.assertEqual(today_game.threatened_pieces("white"), ("a2", "b2", "c2", "d2", "e2", "f2", "g2", "h2", "a1",
+                                                                 "b1", "c1", "d1", "e1", "f1", "h1"))
+        today_game.make_move("d7", "d5")
+        self.assertEqual(today_game.threatened_pieces("black"), ("f8", "d5"))
+        self.assertEqual(set(today_game.threatened_pieces("black")), capturable_pieces(today_game))
+
+    def test_2(self):
+        """Tests threatened_pieces gives exactly the pieces the opponent's legal moves capture, with the maps kept up
+        to date over make_move, unmake_move and set_square."""
+        for seed in range(4):
+            rnd = random.Random(seed)
+            today_game = ChessVar()
+            for ply in range(120):
+                moves = today_game.generate_legal_moves()
+                if not moves:
+                    break
+                opponent = "white" if today_game.get_current_turn() == "black" else "black"
+                if ply % 3 == 0:
+                    self.assertEqual(set(today_game.threatened_pieces(opponent)), capturable_pieces(today_game))
+                today_game.make_encoded_move(rnd.choice(moves))
+                if ply % 10 == 9:
+                    today_game.unmake_move()
+                if ply == 50:
+                    today_game.set_square(SQUARE_NAMES[rnd.randrange(64)], "white", "queen")
+            fresh_map = AttackMap(today_game._squares)
+            for sq_num, sq_location in enumerate(SQUARE_NAMES):
+                attackers = tuple(SQUARE_NAMES[piece_sq] for piece_sq in range(64)
+                                  if fresh_map.get_attacks(piece_sq) >> sq_num & 1)
+                self.assertEqual(today_game.attackers_of(sq_location), attackers)
+
+    @unittest.skipIf(np is None, "needs NumPy")
+    def test_3(self):
+        """Tests attacked_squares matches ChessTensor.attack_maps during random games and after from_fen."""
+        rnd = random.Random(22)
+        today_game = ChessVar()
+        for ply in range(150):
+            maps = attack_maps(np.frombuffer(bytes(today_game._squares), dtype=np.uint8)[None])[0].reshape(2, 64)
+            for color_num, side_color in enumerate(("white", "black")):
+                expected = tuple(SQUARE_NAMES[sq_num] for sq_num in range(64) if maps[color_num, sq_num])
+                self.assertEqual(today_game.attacked_squares(side_color), expected)
+            moves = today_game.generate_legal_moves()
+            if not moves:
+                break
+            today_game.make_encoded_move(rnd.choice(moves))
+        copy_game = ChessVar.from_fen(today_game.to_fen())
+        copy_game.attacked_squares("white")
+        copy_game._load(ChessVar()._squares, "white", 1, [0] * 6, [0] * 6)
+        self.assertEqual(copy_game.attacked_squares("black"), ChessVar().attacked_squares("black"))
+
+
+if __name__ == '__main__':
+    unittest.main()
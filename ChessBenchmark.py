@@ -0,0 +1,165 @@
+# Date: October 18, 2026
+# Description: Benchmarks and node counts for ChessVar. Counts the positions reached after every sequence of N moves
+#              (perft) from the starting position and some mid-game positions, and times perft, make_move,
+#              is_move_legal and creating games. Results can be saved as a JSON baseline and compared to one later:
+#              a different node count means the rules changed, a slower rate is flagged as a regression.
+
+import argparse
+import json
+import sys
+import time
+from ChessVar import ChessVar, SQUARE_NAMES
+
+# Positions reached from the starting position by these moves (from square + to square)
+POSITIONS = {
+    "start": "",
+    "midgame-1": "g2g3 f7f5 g3g2 h8h4 d1f3 g7g6 h2h3 h4d4 b2b4 e7e5 g2g3 f8b4 e1d2 e8f7",
+    "midgame-2": "d2d4 h7h5 b2b3 c7c5 g1f3 c5c6 h2h3 h5h6 f3e5 h6h5 e5d7 g7g5 e2e3 c6c5",
+    "midgame-3": "d2d4 c7c5 a2a4 d7d5 b1c3 c8e6 c3d5 b8c6 d5e7 g7g5 a1b1 d8d6 h2h4 d6e7",
+}
+
+# Exact perft node counts: dictionary where keys = position name and values = counts for depth 1, 2, 3, ...
+PERFT_COUNTS = {
+    "start": (20, 400, 8848, 204542),
+    "midgame-1": (35, 1590, 49893),
+    "midgame-2": (39, 1165, 36017),
+    "midgame-3": (32, 1246, 40139),
+}
+
+# A game replayed to time make_move
+SAMPLE_GAME = POSITIONS["midgame-3"]
+
+
+def load_position(name):
+    """Takes the name of one of the POSITIONS and returns a new ChessVar game in that position."""
+    today_game = ChessVar()
+    for move in POSITIONS[name].split():
+        today_game.make_move(move[:2], move[2:])
+    return today_game
+
+
+def perft(game, depth):
+    """Takes a ChessVar game and a depth and returns the number of positions reached after every sequence of depth
+    legal moves. Positions where the game ended earlier are not counted. The game is left as it was."""
+    if depth == 0:
+        return 1
+    moves = game.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        game.make_encoded_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def _time_repeated(function, min_time):
+    """Calls function until min_time seconds have passed. Returns (calls, seconds)."""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls, elapsed
+
+
+def run_benchmarks(max_depth=3, min_time=0.5):
+    """Runs every benchmark and returns a dictionary with "nodes" (dictionary where keys = "position/depth" and values
+    = perft node count) and "rates" (dictionary where keys = benchmark name and values = operations per second)."""
+    results = {"nodes": {}, "rates": {}}
+    total_nodes = 0
+    total_time = 0.0
+    for name in POSITIONS:
+        today_game = load_position(name)
+        for depth in range(1, min(max_depth, len(PERFT_COUNTS[name])) + 1):
+            start = time.perf_counter()
+            nodes = perft(today_game, depth)
+            total_time += time.perf_counter() - start
+            total_nodes += nodes
+            results["nodes"][f"{name}/{depth}"] = nodes
+    results["rates"]["perft nodes/s"] = total_nodes / total_time
+
+    moves = [(move[:2], move[2:]) for move in SAMPLE_GAME.split()]
+
+    def replay_game():
+        today_game = ChessVar()
+        for original_sq, destination_sq in moves:
+            today_game.make_move(original_sq, destination_sq)
+
+    calls, seconds = _time_repeated(replay_game, min_time)
+    results["rates"]["make_move/s"] = calls * len(moves) / seconds
+
+    today_game = load_position("midgame-1")
+
+    def check_all_pairs():
+        for original_sq in SQUARE_NAMES:
+            for destination_sq in SQUARE_NAMES:
+                today_game.is_move_legal(original_sq, destination_sq)
+
+    calls, seconds = _time_repeated(check_all_pairs, min_time)
+    results["rates"]["is_move_legal/s"] = calls * 64 * 64 / seconds
+
+    def create_games():
+        for num in range(100):
+            ChessVar()
+
+    calls, seconds = _time_repeated(create_games, min_time)
+    results["rates"]["games created/s"] = calls * 100 / seconds
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Takes benchmark results, baseline results and the allowed slowdown (0.2 = 20%). Returns a list of problems:
+    node counts that differ from the baseline and rates more than tolerance below the baseline."""
+    problems = []
+    for key, nodes in results["nodes"].items():
+        if key in baseline["nodes"] and baseline["nodes"][key] != nodes:
+            problems.append(f"node count {key}: {nodes}, baseline {baseline['nodes'][key]}")
+    for key, rate in results["rates"].items():
+        if key in baseline["rates"] and rate < baseline["rates"][key] * (1 - tolerance):
+            problems.append(f"regression {key}: {rate:.0f}, baseline {baseline['rates'][key]:.0f}")
+    return problems
+
+
+def check_node_counts(results):
+    """Takes benchmark results and returns a list of the perft node counts that differ from PERFT_COUNTS."""
+    problems = []
+    for key, nodes in results["nodes"].items():
+        name, depth = key.split("/")
+        if PERFT_COUNTS[name][int(depth) - 1] != nodes:
+            problems.append(f"node count {key}: {nodes}, expected {PERFT_COUNTS[name][int(depth) - 1]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChessVar perft node counts and benchmarks")
+    parser.add_argument("--depth", type=int, default=3, help="deepest perft depth to run")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to run each timed benchmark")
+    parser.add_argument("--save", help="save the results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="compare the results with the JSON baseline in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.depth, args.min_time)
+    for key, nodes in results["nodes"].items():
+        print(f"perft {key}: {nodes}")
+    for key, rate in results["rates"].items():
+        print(f"{key}: {rate:,.0f}")
+
+    problems = check_node_counts(results)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            problems += compare(results, json.load(baseline_file), args.tolerance)
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
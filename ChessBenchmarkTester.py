@@ -0,0 +1,53 @@
+import unittest
+import copy
+from ChessVar import SQUARE_NAMES
+from ChessBenchmark import POSITIONS, PERFT_COUNTS, load_position, perft, compare, check_node_counts
+
+
+def perft_brute_force(game, depth):
+    """Counts perft nodes by checking every pair of squares with is_move_legal and copying the game for each move."""
+    if depth == 0:
+        return 1
+    if game.get_game_state() != "UNFINISHED":
+        return 0
+    nodes = 0
+    for original_sq in SQUARE_NAMES:
+        for destination_sq in SQUARE_NAMES:
+            if game.is_move_legal(original_sq, destination_sq):
+                next_game = copy.deepcopy(game)
+                next_game.make_move(original_sq, destination_sq)
+                nodes += perft_brute_force(next_game, depth - 1)
+    return nodes
+
+
+class TestChessBenchmark(unittest.TestCase):
+
+    def test_1(self):
+        """Tests perft node counts of every position up to depth 2 (depth 3 from the start)."""
+        for name in POSITIONS:
+            today_game = load_position(name)
+            max_depth = 3 if name == "start" else 2
+            self.assertEqual(tuple(perft(today_game, depth) for depth in range(1, max_depth + 1)),
+                             PERFT_COUNTS[name][:max_depth], name)
+
+    def test_2(self):
+        """Tests perft with generated moves counts the same nodes as checking every pair of squares."""
+        today_game = load_position("midgame-2")
+        self.assertEqual(perft_brute_force(today_game, 2), perft(today_game, 2))
+
+    def test_3(self):
+        """Tests perft leaves the game as it was."""
+        today_game = load_position("midgame-1")
+        board = today_game.get_board()
+        perft(today_game, 3)
+        self.assertEqual(today_game.get_board(), board)
+
+    def test_4(self):
+        """Tests compare flags changed node counts and slower rates but not small slowdowns."""
+        baseline = {"nodes": {"start/1": 20}, "rates": {"make_move/s": 1000.0, "perft nodes/s": 1000.0}}
+        results = {"nodes": {"start/1": 21}, "rates": {"make_move/s": 900.0, "perft nodes/s": 700.0}}
+        problems = compare(results, baseline, tolerance=0.2)
+        self.assertEqual(len(problems), 2)
+        self.assertIn("start/1", problems[0])
+        self.assertIn("perft nodes/s", problems[1])
+        self.assertEqual(len(check_node_counts(results)), 1)
@@ -0,0 +1,64 @@
+import unittest
+import random
+from ChessVar import ChessVar, SQUARE_NAMES
+from ChessBitboard import BitboardValidator, KNIGHT_MOVES, PATHS
+
+
+class TestChessBitboard(unittest.TestCase):
+
+    def assert_same_legality(self, default_game, bitboard_game):
+        """Checks that both games give the same answer for every pair of squares."""
+        for original_sq in SQUARE_NAMES:
+            for destination_sq in SQUARE_NAMES:
+                self.assertEqual(default_game.is_move_legal(original_sq, destination_sq),
+                                 bitboard_game.is_move_legal(original_sq, destination_sq),
+                                 (original_sq, destination_sq))
+
+    def test_1(self):
+        """Tests knight table and path table for a rook move."""
+        self.assertEqual(KNIGHT_MOVES[0], (1 << 10) | (1 << 17))          # a8 -> c7, b6
+        self.assertEqual(PATHS[56 * 64 + 32], (1 << 48) | (1 << 40))      # a1 -> a4 passes a2 and a3
+
+    def test_2(self):
+        """Tests the occupancy mask follows set_square."""
+        today_game = ChessVar(use_bitboards=True)
+        today_game.set_square("d4", "white", "queen")
+        today_game.set_square("a8", "-", "-")
+        occupied = today_game._bitboards.get_occupied()
+        self.assertTrue(occupied >> 35 & 1)
+        self.assertFalse(occupied & 1)
+        self.assertEqual(BitboardValidator(today_game._squares).get_occupied(), occupied)
+
+    def test_3(self):
+        """Tests bitboard backend gives the same answers as the validators during random games."""
+        for seed in range(3):
+            rnd = random.Random(seed)
+            default_game = ChessVar()
+            bitboard_game = ChessVar(use_bitboards=True)
+            for ply in range(30):
+                self.assert_same_legality(default_game, bitboard_game)
+                moves = [(a, b) for a in SQUARE_NAMES for b in SQUARE_NAMES if default_game.is_move_legal(a, b)]
+                if not moves or default_game.get_game_state() != "UNFINISHED":
+                    break
+                original_sq, destination_sq = rnd.choice(moves)
+                default_game.make_move(original_sq, destination_sq)
+                bitboard_game.make_move(original_sq, destination_sq)
+
+    def test_4(self):
+        """Tests bitboard backend gives the same answers as the validators for randomly placed pieces."""
+        rnd = random.Random(7)
+        pieces = ["pawn", "pawn 1", "rook", "knight", "bishop", "queen", "king"]
+        for position in range(5):
+            default_game = ChessVar()
+            bitboard_game = ChessVar(use_bitboards=True)
+            for sq in SQUARE_NAMES:
+                if rnd.random() < 0.4:
+                    color, piece = rnd.choice(["white", "black"]), rnd.choice(pieces)
+                else:
+                    color, piece = "-", "-"
+                default_game.set_square(sq, color, piece)
+                bitboard_game.set_square(sq, color, piece)
+            self.assert_same_legality(default_game, bitboard_game)
+            default_game.turn_changer()
+            bitboard_game.turn_changer()
+            self.assert_same_legality(default_game, bitboard_game)
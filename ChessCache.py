@@ -0,0 +1,169 @@
+# Date: October 18, 2026
+# Description: A size-bounded cache of analysis results keyed by ChessVar.position_hash. Each entry is a tuple
+#              (depth, score, flag, best move, verdict): the search depth, the score for the side to move (a win or loss
+#              counted in plies from the position itself, so it holds at any ply and in later searches), whether the
+#              score is exact or a bound (see ChessEngine), the best move encoded as in generate_legal_moves (or None)
+#              and the game state the search proved ('UNFINISHED' if it did not prove a win). The cache never holds more
+#              than max_entries positions. It replaces entries either depth-preferred (two slots per hash bucket, one
+#              keeping the deepest entry and one always taking the newest) or least recently used, counts hits and
+#              misses, and can be saved to and loaded from a file between runs.
+
+import os
+import struct
+from collections import OrderedDict
+
+POLICIES = ("depth", "lru")
+VERDICTS = ("UNFINISHED", "WHITE_WON", "BLACK_WON")
+
+_HEADER = struct.Struct("<4sBxxxQ")                      # Magic, version, number of entries
+_MAGIC = b"CVTT"
+_VERSION = 2                                             # 2: wins and losses counted from the position, not the root
+_ENTRY = struct.Struct("<QBiBHB")                        # Hash, depth, score, flag, best move, verdict number
+_NO_MOVE = 0xFFFF
+_VERDICT_NUMBERS = {verdict: num for num, verdict in enumerate(VERDICTS)}
+
+
+class PositionCache:
+    """Represents a cache of analysis results (see the module description) holding at most max_entries positions,
+    with a replacement policy ('depth' or 'lru') and counters of hits, misses, stores and evictions."""
+
+    def __init__(self, max_entries=1 << 18, policy="depth"):
+        """Creates an empty PositionCache. Raises ValueError if the policy is not one of POLICIES, or if max_entries is
+        less than 1 (less than 2 for the 'depth' policy, whose buckets hold two entries). With an odd max_entries the
+        'depth' policy holds one position less."""
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, not {policy!r}")
+        min_entries = 2 if policy == "depth" else 1
+        if max_entries < min_entries:
+            raise ValueError(f"max_entries must be at least {min_entries} for the {policy!r} policy, not {max_entries}")
+        self._max_entries = max_entries
+        self._policy = policy
+        self._bucket_count = max_entries // 2
+        self.clear()
+        self.reset_stats()
+
+    def clear(self):
+        """Removes every entry. The counters are kept."""
+        self._size = 0
+        if self._policy == "lru":
+            self._entries = OrderedDict()
+        else:
+            self._keys = [None] * (self._bucket_count * 2)        # Slot 2b: deepest entry of bucket b, 2b + 1: newest
+            self._values = [None] * (self._bucket_count * 2)
+
+    def reset_stats(self):
+        """Sets the hit, miss, store and eviction counters back to 0."""
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def __len__(self):
+        """Returns the number of positions in the cache."""
+        if self._policy == "lru":
+            return len(self._entries)
+        return self._size
+
+    def get_policy(self):
+        """Returns the replacement policy."""
+        return self._policy
+
+    def get_max_entries(self):
+        """Returns the maximum number of positions the cache holds."""
+        return self._max_entries
+
+    def get_stats(self):
+        """Returns a dictionary of the counters (hits, misses, stores, evictions), the hit rate (hits / lookups, 0 if
+        there were none) and the number of entries and maximum number of entries."""
+        lookups = self._hits + self._misses
+        return {"hits": self._hits, "misses": self._misses, "stores": self._stores, "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0, "entries": len(self),
+                "max_entries": self._max_entries}
+
+    def get(self, position_hash):
+        """Takes a position hash and returns its entry, or None if it is not in the cache."""
+        if self._policy == "lru":
+            entry = self._entries.get(position_hash)
+            if entry is not None:
+                self._entries.move_to_end(position_hash)
+        else:
+            slot = position_hash % self._bucket_count * 2
+            if self._keys[slot] == position_hash:
+                entry = self._values[slot]
+            elif self._keys[slot + 1] == position_hash:
+                entry = self._values[slot + 1]
+            else:
+                entry = None
+        if entry is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return entry
+
+    def put(self, position_hash, entry):
+        """Takes a position hash and its entry (depth, score, flag, best move, verdict) and stores it, replacing the
+        position's previous entry. If the cache is full, another entry is evicted: the least recently used one for
+        'lru'; for 'depth', the bucket's deepest entry if the new one is at least as deep, otherwise its newest."""
+        self._stores += 1
+        if self._policy == "lru":
+            entries = self._entries
+            if position_hash in entries:
+                entries.move_to_end(position_hash)
+            elif len(entries) >= self._max_entries:
+                entries.popitem(last=False)
+                self._evictions += 1
+            entries[position_hash] = entry
+            return
+
+        keys = self._keys
+        values = self._values
+        slot = position_hash % self._bucket_count * 2
+        if keys[slot] == position_hash or keys[slot] is None or entry[0] >= values[slot][0]:
+            if keys[slot + 1] == position_hash:
+                # The position moves up to the deep slot, do not keep it twice
+                keys[slot + 1] = values[slot + 1] = None
+                self._size -= 1
+        else:
+            slot += 1
+        if keys[slot] is None:
+            self._size += 1
+        elif keys[slot] != position_hash:
+            self._evictions += 1
+        keys[slot] = position_hash
+        values[slot] = entry
+
+    def items(self):
+        """Returns a list of (position hash, entry) of every position in the cache."""
+        if self._policy == "lru":
+            return list(self._entries.items())
+        return [(key, value) for key, value in zip(self._keys, self._values) if key is not None]
+
+    def save(self, path):
+        """Takes a file path and writes every entry to it. The file is written under another name first and then
+        renamed, so a reader never sees a half-written cache."""
+        temp_path = path + ".tmp"
+        items = self.items()
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(_HEADER.pack(_MAGIC, _VERSION, len(items)))
+            for position_hash, (depth, score, flag, best_move, verdict) in items:
+                cache_file.write(_ENTRY.pack(position_hash, depth, score, flag,
+                                             _NO_MOVE if best_move is None else best_move,
+                                             _VERDICT_NUMBERS[verdict]))
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Takes the path of a file written by save and stores its entries in the cache (as with put, so a smaller
+        cache keeps what its policy prefers). Returns the number of entries read. Raises ValueError if the file is not
+        a saved cache."""
+        with open(path, "rb") as cache_file:
+            data = cache_file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a saved position cache")
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or len(data) != _HEADER.size + count * _ENTRY.size:
+            raise ValueError(f"{path} is not a saved position cache")
+        for position_hash, depth, score, flag, best_move, verdict_num in _ENTRY.iter_unpack(data[_HEADER.size:]):
+            self.put(position_hash, (depth, score, flag, None if best_move == _NO_MOVE else best_move,
+                                     VERDICTS[verdict_num]))
+        self._stores -= count
+        return count
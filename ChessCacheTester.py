@@ -0,0 +1,74 @@
+import unittest
+import os
+import tempfile
+from ChessVar import ChessVar
+from ChessCache import PositionCache
+from ChessEngine import ChessEngine
+
+
+class TestChessCache(unittest.TestCase):
+
+    def test_1(self):
+        """Tests the least recently used entry is evicted and hits and misses are counted."""
+        cache = PositionCache(2, "lru")
+        cache.put(1, (1, 10, 0, None, "UNFINISHED"))
+        cache.put(2, (1, 20, 0, None, "UNFINISHED"))
+        self.assertEqual(cache.get(1)[1], 10)
+        cache.put(3, (1, 30, 0, None, "UNFINISHED"))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1, "stores": 3, "evictions": 1, "hit_rate": 0.5,
+                                             "entries": 2, "max_entries": 2})
+
+    def test_2(self):
+        """Tests the depth-preferred policy keeps the deeper entry of a bucket and never holds more than its size."""
+        cache = PositionCache(2, "depth")
+        cache.put(5, (6, 50, 0, None, "UNFINISHED"))
+        cache.put(7, (2, 70, 0, None, "UNFINISHED"))
+        cache.put(9, (3, 90, 0, None, "UNFINISHED"))
+        self.assertEqual(cache.get(5)[0], 6)
+        self.assertIsNone(cache.get(7))
+        self.assertEqual(cache.get(9)[0], 3)
+        cache.put(9, (8, 91, 0, None, "UNFINISHED"))
+        self.assertEqual(cache.get(9)[1], 91)
+        self.assertIsNone(cache.get(5))
+        self.assertEqual(len(cache), 1)
+        self.assertRaises(ValueError, PositionCache, 2, "random")
+
+    def test_3(self):
+        """Tests a saved cache loads back with the same entries."""
+        cache = PositionCache(64, "lru")
+        cache.put(2 ** 64 - 1, (4, -99998, 2, 3372, "BLACK_WON"))
+        cache.put(12, (0, 5, 1, None, "UNFINISHED"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.bin")
+            cache.save(path)
+            loaded = PositionCache(64)
+            self.assertEqual(loaded.load(path), 2)
+            with open(path, "r+b") as cache_file:
+                cache_file.truncate(20)
+            self.assertRaises(ValueError, loaded.load, path)
+        self.assertEqual(sorted(loaded.items()), sorted(cache.items()))
+        self.assertEqual(loaded.get_stats()["stores"], 0)
+
+    def test_4(self):
+        """Tests an engine sharing a cache finds its results and records proven verdicts."""
+        today_game = ChessVar()
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5"), ("g1", "f3"), ("d8", "g5")):
+            today_game.make_move(original_sq, destination_sq)
+        cache = PositionCache(1024)
+        first = ChessEngine(max_depth=3, cache=cache).search(today_game)
+        self.assertEqual(cache.get(today_game.position_hash())[4], "WHITE_WON")
+        cache.reset_stats()
+        self.assertEqual(ChessEngine(max_depth=3, cache=cache).search(today_game), first)
+        self.assertGreater(cache.get_stats()["hits"], 0)
+
+    def test_5(self):
+        """Tests a cache too small for its policy is rejected and an odd size never holds more than max_entries."""
+        self.assertRaises(ValueError, PositionCache, 1)
+        self.assertRaises(ValueError, PositionCache, 0, "lru")
+        for max_entries, policy in ((1, "lru"), (3, "depth")):
+            cache = PositionCache(max_entries, policy)
+            for position_hash in range(10):
+                cache.put(position_hash, (1, 0, 0, None, "UNFINISHED"))
+            self.assertLessEqual(len(cache), max_entries)
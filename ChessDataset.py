@@ -0,0 +1,216 @@
+# Date: October 18, 2026
+# Description: Exports training data for move prediction from self-played or archived ChessVar games. Every game is
+#              replayed through ChessVar.make_move and gives one row per ply: the position before the move
+#              (ChessVar.to_bytes), the move played (encoded as in generate_legal_moves), the game's final outcome
+#              (1 white won, -1 black won, 0 unfinished) and the number of plies left to the end of the game. Rows are
+#              written straight into memory-mapped .npy shards of shard_size rows (one file per field and shard), so
+#              memory use does not grow with the number of games. Each task (a range of games) writes its own shards,
+#              so tasks can run in worker processes; manifest.json lists the fields and every shard.
+
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ChessVar import ChessVar, POSITION_SIZE, decode_move
+from ChessArchive import ArchiveReader
+from ChessSelfPlay import AGENTS, play_game
+
+FIELDS = {"positions": ("uint8", (POSITION_SIZE,)), "moves": ("uint16", ()), "outcomes": ("int8", ()),
+          "plies_to_end": ("uint16", ())}
+OUTCOMES = {"WHITE_WON": 1, "BLACK_WON": -1}            # Any other final game state is 0
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardWriter:
+    """Represents a writer of rows into a sequence of shards named prefix-00000, prefix-00001, ... in a directory.
+    Call close when done, which returns the list of shards written."""
+
+    def __init__(self, directory, prefix, shard_size=1 << 16):
+        """Creates a ShardWriter writing shards of shard_size rows into directory."""
+        self._directory = directory
+        self._prefix = prefix
+        self._shard_size = shard_size
+        self._shards = []                                # One dictionary ("name", "rows", "games") per shard
+        self._arrays = None                              # Field name -> memory-mapped array of the current shard
+        self._rows = 0                                   # Rows written to the current shard
+
+    def _path(self, name, field):
+        """Returns the file path of a field of a shard."""
+        return os.path.join(self._directory, f"{name}-{field}.npy")
+
+    def _start_shard(self):
+        """Creates the files of the next shard."""
+        name = f"{self._prefix}-{len(self._shards):05d}"
+        self._shards.append({"name": name, "rows": 0, "games": 0})
+        self._arrays = {field: np.lib.format.open_memmap(self._path(name, field), mode="w+", dtype=dtype,
+                                                         shape=(self._shard_size,) + shape)
+                        for field, (dtype, shape) in FIELDS.items()}
+        self._rows = 0
+
+    def add_game(self, moves):
+        """Takes the encoded moves of a game from the starting position, replays them with make_move and writes one
+        row per move. Raises ValueError (and writes nothing) if a move is not legal. Returns the number of rows."""
+        today_game = ChessVar()
+        positions = []
+        for ply, move in enumerate(moves, 1):
+            positions.append(today_game.to_bytes())
+            if not today_game.make_move(*decode_move(move)):
+                raise ValueError(f"move {ply} ({''.join(decode_move(move))}) is not legal")
+        if not positions:
+            return 0
+
+        plies = len(positions)
+        rows = {"positions": np.frombuffer(b"".join(positions), dtype=np.uint8).reshape(plies, POSITION_SIZE),
+                "moves": np.asarray(moves, dtype=np.uint16),
+                "outcomes": np.full(plies, OUTCOMES.get(today_game.get_game_state(), 0), dtype=np.int8),
+                "plies_to_end": np.arange(plies, 0, -1, dtype=np.uint16)}
+        written = 0
+        while written < plies:
+            if self._arrays is None or self._rows == self._shard_size:
+                self._finish_shard()
+                self._start_shard()
+            count = min(plies - written, self._shard_size - self._rows)
+            for field, array in self._arrays.items():
+                array[self._rows:self._rows + count] = rows[field][written:written + count]
+            self._rows += count
+            written += count
+            self._shards[-1]["rows"] = self._rows
+        self._shards[-1]["games"] += 1                   # Counted in the shard where the game ends
+        return plies
+
+    def _finish_shard(self):
+        """Flushes and closes the current shard. A shard with fewer than shard_size rows is rewritten with just its
+        rows into a temporary file, which replaces the shard file only once both are closed, so the replace works on
+        Windows too and a failed replace leaves the full, flushed shard."""
+        if self._arrays is None:
+            return
+        name = self._shards[-1]["name"]
+        arrays = self._arrays
+        self._arrays = None
+        for field in list(arrays):
+            array = arrays.pop(field)
+            array.flush()
+            if self._rows < self._shard_size:
+                dtype, shape = FIELDS[field]
+                temp_path = self._path(name, field) + ".tmp"
+                trimmed = np.lib.format.open_memmap(temp_path, mode="w+", dtype=dtype, shape=(self._rows,) + shape)
+                trimmed[:] = array[:self._rows]
+                trimmed.flush()
+                del trimmed
+                # Drop the last reference to the shard's memmap, which closes its mapping of the file
+                del array
+                os.replace(temp_path, self._path(name, field))
+
+    def close(self):
+        """Finishes the last shard and returns the list of shards written (dictionaries with "name", "rows" and
+        "games")."""
+        self._finish_shard()
+        return self._shards
+
+
+def archive_tasks(path, games_per_task=1000):
+    """Takes the path of a ChessArchive archive and returns the tasks exporting all of its games."""
+    with ArchiveReader(path) as reader:
+        game_count = len(reader)
+    return [("archive", path, first_game, min(games_per_task, game_count - first_game))
+            for first_game in range(0, game_count, games_per_task)]
+
+
+def self_play_tasks(games, white="random", black="random", seed=0, max_plies=200, depth=2, games_per_task=1000):
+    """Returns the tasks exporting games played between the white and black agents (game n uses seed + n, as in
+    ChessSelfPlay.play_games)."""
+    return [("self-play", white, black, first_game, min(games_per_task, games - first_game), seed, max_plies, depth)
+            for first_game in range(0, games, games_per_task)]
+
+
+def _task_games(task):
+    """Takes a task and yields the encoded moves of each of its games, one game at a time."""
+    if task[0] == "archive":
+        path, first_game, count = task[1:]
+        with ArchiveReader(path) as reader:
+            for game_num in range(first_game, first_game + count):
+                yield reader.get_moves(game_num)
+        return
+    white, black, first_game, count, seed, max_plies, depth = task[1:]
+    for game_num in range(first_game, first_game + count):
+        rnd = random.Random(seed + game_num)
+        moves = []
+        play_game(AGENTS[white](rnd, depth), AGENTS[black](rnd, depth), max_plies, moves)
+        yield moves
+
+
+def export_task(directory, prefix, task, shard_size):
+    """Runs in a worker process. Takes the output directory, the shard name prefix, a task and the shard size, writes
+    the task's games and returns the list of shards written."""
+    writer = ShardWriter(directory, prefix, shard_size)
+    for moves in _task_games(task):
+        writer.add_game(moves)
+    return writer.close()
+
+
+def export_dataset(directory, tasks, shard_size=1 << 16, workers=None):
+    """Takes an output directory and a list of tasks (see archive_tasks and self_play_tasks) and exports them over
+    worker processes (workers=0 exports in this process), task n writing shards part-n-00000, part-n-00001, ...
+    Writes manifest.json and returns it as a dictionary with "fields" (name -> {"dtype", "shape"} of one row),
+    "shard_size", "rows", "games" and "shards" (in task order)."""
+    os.makedirs(directory, exist_ok=True)
+    prefixes = [f"part-{task_num:05d}" for task_num in range(len(tasks))]
+    shards = []
+    if workers == 0:
+        for prefix, task in zip(prefixes, tasks):
+            shards.extend(export_task(directory, prefix, task, shard_size))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for task_shards in executor.map(export_task, [directory] * len(tasks), prefixes, tasks,
+                                            [shard_size] * len(tasks)):
+                shards.extend(task_shards)
+
+    manifest = {"fields": {field: {"dtype": dtype, "shape": list(shape)} for field, (dtype, shape) in FIELDS.items()},
+                "shard_size": shard_size, "rows": sum(shard["rows"] for shard in shards),
+                "games": sum(shard["games"] for shard in shards), "shards": shards}
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    return manifest
+
+
+def read_manifest(directory):
+    """Takes a dataset directory and returns its manifest dictionary."""
+    with open(os.path.join(directory, MANIFEST_NAME)) as manifest_file:
+        return json.load(manifest_file)
+
+
+def iter_shards(directory):
+    """Takes a dataset directory and yields, for every shard in order, a dictionary of field name -> read-only
+    memory-mapped array of the shard's rows."""
+    for shard in read_manifest(directory)["shards"]:
+        yield {field: np.load(os.path.join(directory, f"{shard['name']}-{field}.npy"), mmap_mode="r")
+               for field in FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ChessVar games as sharded .npy training data")
+    parser.add_argument("directory", help="output directory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--archive", help="export the games of a ChessArchive archive")
+    source.add_argument("--self-play", type=int, metavar="GAMES", help="export this many self-played games")
+    parser.add_argument("--white", choices=sorted(AGENTS), default="random", help="self-play agent playing white")
+    parser.add_argument("--black", choices=sorted(AGENTS), default="random", help="self-play agent playing black")
+    parser.add_argument("--seed", type=int, default=0, help="self-play random seed")
+    parser.add_argument("--shard-size", type=int, default=1 << 16, help="rows per shard")
+    parser.add_argument("--games-per-task", type=int, default=1000, help="games exported by one worker task")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (0 = export in this process)")
+    args = parser.parse_args()
+
+    if args.archive is not None:
+        tasks = archive_tasks(args.archive, args.games_per_task)
+    else:
+        tasks = self_play_tasks(args.self_play, args.white, args.black, args.seed,
+                                games_per_task=args.games_per_task)
+    manifest = export_dataset(args.directory, tasks, args.shard_size, args.workers)
+    print(f"{manifest['games']} games, {manifest['rows']} rows in {len(manifest['shards'])} shards")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import tempfile
+from ChessVar import ChessVar, encode_move
+from ChessArchive import ArchiveWriter
+try:
+    import numpy
+    from ChessDataset import ShardWriter, archive_tasks, self_play_tasks, export_dataset, iter_shards, read_manifest
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "needs NumPy")
+class TestChessDataset(unittest.TestCase):
+
+    def setUp(self):
+        """Creates a directory for the datasets."""
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Removes the directory."""
+        self.directory.cleanup()
+
+    def test_1(self):
+        """Tests rows hold the position before each move, the move, the outcome and the plies left, across shards."""
+        moves = [encode_move(*move) for move in (("d2", "d4"), ("e7", "e5"), ("g1", "f3"), ("d8", "g5"),
+                                                 ("c1", "g5"))]
+        writer = ShardWriter(self.directory.name, "test", shard_size=3)
+        self.assertEqual(writer.add_game(moves), 5)
+        self.assertEqual(writer.add_game(moves[:1]), 1)
+        self.assertRaises(ValueError, writer.add_game, [encode_move("d2", "d5")])
+        shards = writer.close()
+        self.assertEqual([(shard["rows"], shard["games"]) for shard in shards], [(3, 0), (3, 2)])
+
+        positions = numpy.load(os.path.join(self.directory.name, "test-00001-positions.npy"))
+        outcomes = numpy.load(os.path.join(self.directory.name, "test-00001-outcomes.npy"))
+        plies_to_end = numpy.load(os.path.join(self.directory.name, "test-00001-plies_to_end.npy"))
+        replayed = ChessVar()
+        for move in moves[:3]:
+            replayed.make_encoded_move(move)
+        self.assertEqual(positions[0].tobytes(), replayed.to_bytes())
+        self.assertEqual(outcomes.tolist(), [1, 1, 0])
+        self.assertEqual(plies_to_end.tolist(), [2, 1, 1])
+
+    def test_2(self):
+        """Tests exporting in worker processes gives the same rows as in this process."""
+        tasks = self_play_tasks(6, seed=2, max_plies=30, games_per_task=2)
+        in_process = export_dataset(os.path.join(self.directory.name, "a"), tasks, shard_size=50, workers=0)
+        workers = export_dataset(os.path.join(self.directory.name, "b"), tasks, shard_size=50, workers=2)
+        self.assertEqual(in_process, workers)
+        self.assertEqual(read_manifest(os.path.join(self.directory.name, "b")), workers)
+        for shard_a, shard_b in zip(iter_shards(os.path.join(self.directory.name, "a")),
+                                    iter_shards(os.path.join(self.directory.name, "b"))):
+            for field in shard_a:
+                self.assertEqual(shard_a[field].tolist(), shard_b[field].tolist())
+
+    def test_3(self):
+        """Tests the games of an archive are exported with one row per ply."""
+        archive_path = os.path.join(self.directory.name, "games.cva")
+        with ArchiveWriter(archive_path) as writer:
+            writer.add_game([encode_move("d2", "d4"), encode_move("e7", "e5")])
+            writer.add_game([encode_move("g1", "f3")])
+        manifest = export_dataset(os.path.join(self.directory.name, "out"), archive_tasks(archive_path, 1), workers=0)
+        self.assertEqual((manifest["games"], manifest["rows"]), (2, 3))
+        moves = [shard["moves"].tolist() for shard in iter_shards(os.path.join(self.directory.name, "out"))]
+        self.assertEqual(moves, [[encode_move("d2", "d4"), encode_move("e7", "e5")], [encode_move("g1", "f3")]])
+
+    def test_4(self):
+        """Tests a short shard's memory-mapped files are closed before the trimmed files replace them."""
+        import weakref
+        import ChessDataset
+        writer = ShardWriter(self.directory.name, "test", shard_size=8)
+        writer.add_game([encode_move("d2", "d4")])
+        mapped = [weakref.ref(array) for array in writer._arrays.values()]
+        replaced = []
+        original_replace = ChessDataset.os.replace
+
+        def checked_replace(source, destination):
+            replaced.append(sum(ref() is not None for ref in mapped))
+            original_replace(source, destination)
+
+        ChessDataset.os.replace = checked_replace
+        try:
+            writer.close()
+        finally:
+            ChessDataset.os.replace = original_replace
+        self.assertEqual(replaced, [3, 2, 1, 0])
+        self.assertEqual(len(numpy.load(os.path.join(self.directory.name, "test-00000-moves.npy"))), 1)
@@ -0,0 +1,228 @@
+# Date: October 18, 2026
+# Description: A computer opponent for the chess variant. Searches the moves of a ChessVar game with negamax
+#              alpha-beta, iterative deepening and a transposition table (a ChessCache.PositionCache, which can be
+#              shared between engines and saved between runs), within a time and/or node budget. Positions are scored
+#              by how close each side is to capturing all of the opponent's pieces of one type.
+
+import time
+from ChessVar import ChessVar, PIECE_MASK, decode_move
+from ChessCache import PositionCache
+
+WIN_SCORE = 100000                                       # Score of a won position (less the plies it takes)
+PIECES_TO_WIN = {"pawn": 8, "rook": 2, "knight": 2, "bishop": 2, "queen": 1, "king": 1}
+_CAPTURE_ORDER = (0, 1, 4, 4, 4, 8, 8)                   # Piece type code -> how early to try capturing it
+
+_EXACT = 0                                               # Transposition table entry flags
+_LOWER = 1
+_UPPER = 2
+_PROVEN_SCORE = WIN_SCORE - 1000                         # Scores at least this far from 0 are forced wins or losses
+
+
+def _score_to_table(score, ply):
+    """Takes a score found ply plies from the root and returns it as stored in the transposition table: a win or loss
+    counted in plies from the position itself instead of from the root, so it holds wherever the position is met."""
+    if score >= _PROVEN_SCORE:
+        return score + ply
+    if score <= -_PROVEN_SCORE:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    """Takes a score stored by _score_to_table and returns it for the position met ply plies from the root."""
+    if score >= _PROVEN_SCORE:
+        return score - ply
+    if score <= -_PROVEN_SCORE:
+        return score + ply
+    return score
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out."""
+
+
+class ChessEngine:
+    """Represents a search engine for ChessVar games with a search depth limit, time limit (seconds), node limit and a
+    transposition table (PositionCache where keys = position hash and entries = (depth, score, flag, best move,
+    verdict))."""
+
+    def __init__(self, max_depth=6, time_limit=None, node_limit=None, table_size=1 << 18, cache=None,
+                 tablebase=None):
+        """Creates a ChessEngine with a depth limit, optional time limit in seconds and optional node limit. Uses cache
+        (a PositionCache, possibly shared with other engines) as its transposition table, or a new depth-preferred
+        one holding table_size positions if cache is None, made by the first search (or get_cache) so that engines
+        only used for evaluate cost nothing. If a ChessTablebase.Tablebase is given, positions it has
+        tables for are scored from the tables instead of being searched."""
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._table_size = table_size
+        self._table = cache
+        self._tablebase = tablebase
+        self._root_move = None
+        self._nodes = 0
+        self._deadline = None
+
+    def get_nodes(self):
+        """Returns the number of positions visited by the last search."""
+        return self._nodes
+
+    def get_cache(self):
+        """Returns the transposition table (a PositionCache), making it if no search has yet."""
+        if self._table is None:
+            self._table = PositionCache(self._table_size)
+        return self._table
+
+    def clear_table(self):
+        """Empties the transposition table."""
+        if self._table is not None:
+            self._table.clear()
+
+    def evaluate(self, game):
+        """Takes a ChessVar game and returns its score for the current player. Each side gets (collected /
+        needed)^2 * 1000 for every chess piece type, so being one capture away from completing a type counts for much
+        more than a few captures spread over several types."""
+        white_progress = 0
+        black_progress = 0
+        white_score = game.get_white_score()
+        black_score = game.get_black_score()
+        for chess_piece, needed in PIECES_TO_WIN.items():
+            white_progress += 1000 * white_score[chess_piece] * white_score[chess_piece] // (needed * needed)
+            black_progress += 1000 * black_score[chess_piece] * black_score[chess_piece] // (needed * needed)
+        if game.get_current_turn() == "white":
+            return white_progress - black_progress
+        return black_progress - white_progress
+
+    def search(self, game):
+        """Takes a ChessVar game and searches it with iterative deepening until the depth limit, time limit or node
+        limit is reached. Returns (best move encoded as in generate_legal_moves, score for the current player, depth
+        of the last completed search). The best move is None if the current player has no moves. The game is left as
+        it was."""
+        self._nodes = 0
+        if self._table is None:
+            self._table = PositionCache(self._table_size)
+        self._deadline = None if self._time_limit is None else time.perf_counter() + self._time_limit
+        moves = game.generate_legal_moves()
+        if not moves:
+            return None, self.terminal_score(game), 0
+
+        best_move, best_score, completed_depth = moves[0], 0, 0
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score = self._negamax(game, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except SearchTimeout:
+                break
+            best_move, best_score, completed_depth = self._root_move, score, depth
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                # Forced win or loss found, deeper searches would not change it
+                break
+        return best_move, best_score, completed_depth
+
+    def terminal_score(self, game, ply=0):
+        """Takes a ChessVar game with no moves (finished, or stuck) and the plies it is from the root of a search, and
+        returns its score for the current player: a win or loss (sooner is better) if the game is over, otherwise 0
+        (the game cannot go on)."""
+        game_state = game.get_game_state()
+        if game_state == "UNFINISHED":
+            return 0
+        if game_state == ("WHITE_WON" if game.get_current_turn() == "white" else "BLACK_WON"):
+            return WIN_SCORE - ply
+        return -(WIN_SCORE - ply)
+
+    def _order_moves(self, game, moves, best_move):
+        """Returns the moves sorted with the best move from the transposition table first and then captures of the
+        chess pieces that are closest to winning."""
+        squares = game._squares
+        ordered = sorted(moves, key=lambda move: -_CAPTURE_ORDER[squares[move & 63] & PIECE_MASK])
+        if best_move in moves:
+            ordered.remove(best_move)
+            ordered.insert(0, best_move)
+        return ordered
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """Returns the score for the current player of searching the game depth plies deep, between alpha and beta."""
+        self._nodes += 1
+        if self._nodes & 1023 == 0:
+            if self._deadline is not None and time.perf_counter() > self._deadline:
+                raise SearchTimeout()
+        if self._node_limit is not None and self._nodes > self._node_limit:
+            raise SearchTimeout()
+
+        position_hash = game.position_hash()
+        entry = self._table.get(position_hash)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, best_move, verdict = entry
+            entry_score = _score_from_table(entry_score, ply)
+            if entry_depth >= depth and ply > 0:
+                if entry_flag == _EXACT:
+                    return entry_score
+                if entry_flag == _LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_flag == _UPPER and entry_score <= alpha:
+                    return entry_score
+
+        if game.get_game_state() != "UNFINISHED":
+            return self.terminal_score(game, ply)
+        if self._tablebase is not None and ply > 0:
+            plies_to_end = self._tablebase.probe(game)
+            if plies_to_end is not None:
+                if plies_to_end > 0:
+                    return WIN_SCORE - (ply + plies_to_end)
+                if plies_to_end < 0:
+                    return -(WIN_SCORE - (ply - plies_to_end))
+                return 0
+        if depth == 0:
+            return self.evaluate(game)
+        moves = game.generate_legal_moves()
+        if not moves:
+            return 0
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        for move in self._order_moves(game, moves, best_move):
+            game.make_encoded_move(move)
+            try:
+                score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = _UPPER
+        elif best_score >= beta:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        verdict = "UNFINISHED"
+        if (best_score >= _PROVEN_SCORE and flag != _UPPER) or (best_score <= -_PROVEN_SCORE and flag != _LOWER):
+            # The side to move is proven to win (or lose) whatever is searched later
+            white_wins = (best_score > 0) == (game.get_current_turn() == "white")
+            verdict = "WHITE_WON" if white_wins else "BLACK_WON"
+        self._table.put(position_hash, (depth, _score_to_table(best_score, ply), flag, best_move, verdict))
+        if ply == 0:
+            self._root_move = best_move
+        return best_score
+
+
+def main():
+    today_game = ChessVar()
+    engine = ChessEngine(time_limit=1.0)
+    while today_game.get_game_state() == "UNFINISHED":
+        move, score, depth = engine.search(today_game)
+        if move is None:
+            break
+        original_sq, destination_sq = decode_move(move)
+        print(f"{today_game.get_current_turn()} plays {original_sq} {destination_sq} "
+              f"(score {score}, depth {depth}, nodes {engine.get_nodes()})")
+        today_game.make_encoded_move(move)
+    print(today_game.get_game_state())
+
+
+if __name__ == '__main__':
+    main()
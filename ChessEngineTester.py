@@ -0,0 +1,74 @@
+import unittest
+from ChessVar import ChessVar, encode_move
+from ChessEngine import ChessEngine, WIN_SCORE
+
+
+class TestChessEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Creates a game where white can win by capturing black's queen."""
+        self.today_game = ChessVar()
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5"), ("g1", "f3"), ("d8", "g5")):
+            self.today_game.make_move(original_sq, destination_sq)
+
+    def test_1(self):
+        """Tests search finds a winning capture and leaves the game as it was."""
+        board = self.today_game.get_board()
+        position_hash = self.today_game.position_hash()
+        move, score, depth = ChessEngine(max_depth=4).search(self.today_game)
+        self.assertIn(move, (encode_move("f3", "g5"), encode_move("c1", "g5")))
+        self.assertEqual(score, WIN_SCORE - 1)
+        self.assertEqual(depth, 1)
+        self.assertEqual(self.today_game.get_board(), board)
+        self.assertEqual(self.today_game.position_hash(), position_hash)
+
+    def test_2(self):
+        """Tests the node limit stops the search and a legal move is still returned."""
+        engine = ChessEngine(max_depth=20, node_limit=500)
+        today_game = ChessVar()
+        today_game.make_move("g1", "f3")
+        move, score, depth = engine.search(today_game)
+        self.assertIn(move, today_game.generate_legal_moves())
+        self.assertLessEqual(engine.get_nodes(), 501)
+
+    def test_3(self):
+        """Tests evaluate prefers the side closer to completing a type."""
+        engine = ChessEngine()
+        today_game = ChessVar()
+        today_game.get_white_score()["rook"] = 1
+        today_game.get_black_score()["pawn"] = 2
+        self.assertGreater(engine.evaluate(today_game), 0)
+        today_game.turn_changer()
+        self.assertLess(engine.evaluate(today_game), 0)
+
+    def test_4(self):
+        """Tests a game that is over returns no move and the score of the side that won."""
+        today_game = ChessVar()
+        today_game.get_white_score()["king"] = 1
+        self.assertEqual(ChessEngine().search(today_game), (None, WIN_SCORE, 0))
+        today_game.turn_changer()
+        self.assertEqual(ChessEngine().search(today_game), (None, -WIN_SCORE, 0))
+
+    def test_5(self):
+        """Tests the transposition table is only made by the first search (or get_cache), not by evaluate."""
+        engine = ChessEngine(max_depth=2, table_size=64)
+        engine.evaluate(self.today_game)
+        engine.clear_table()
+        self.assertIsNone(engine._table)
+        engine.search(self.today_game)
+        cache = engine.get_cache()
+        self.assertGreater(cache.get_stats()["stores"], 0)
+
+    def test_6(self):
+        """Tests a forced win found through the transposition table has the same distance whichever ply the position
+        was stored at: searching black's win in 3 after e1d2 gives the same score whether the table was filled by a
+        search from the position before e1d2 (where it is met one ply deeper) or not."""
+        today_game = ChessVar()
+        for original_sq, destination_sq in (("c2", "c4"), ("a7", "a5"), ("d1", "a4"), ("e7", "e5"), ("h1", "h4"),
+                                            ("g8", "h6")):
+            self.assertTrue(today_game.make_move(original_sq, destination_sq))
+        engine = ChessEngine(max_depth=5)
+        self.assertEqual(engine.search(today_game)[1], -(WIN_SCORE - 4))
+        today_game.make_move("e1", "d2")
+        self.assertEqual(ChessEngine(max_depth=5).search(today_game)[1], WIN_SCORE - 3)
+        self.assertEqual(ChessEngine(max_depth=5, cache=engine.get_cache()).search(today_game)[1], WIN_SCORE - 3)
@@ -0,0 +1,107 @@
+# Date: October 18, 2026
+# Description: Streaming validation of recorded games. Reads game records (one game per line: an optional game id and
+#              a tab, then the moves as from square + to square separated by spaces, i.e. "42<TAB>d2d4 e7e5") from
+#              files of any size, replays each game through ChessVar.make_move and reports the first illegal move or
+#              the final game state. Games can be validated in worker processes a chunk at a time.
+
+import argparse
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from ChessVar import ChessVar, SQUARE_INDEX
+
+
+def read_records(path):
+    """Takes the path of a game record file and yields (game id, moves text) for every game, reading one line at a
+    time. Blank lines and lines starting with '#' are skipped. A game without an id gets its line number."""
+    with open(path) as record_file:
+        for line_num, line in enumerate(record_file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            game_id, tab, moves = line.rpartition("\t")
+            yield (game_id if tab else str(line_num)), moves
+
+
+def validate_game(game_id, moves):
+    """Takes a game id and the game's moves text and replays the game. Returns (game id, result, plies, error): the
+    result is 'WHITE_WON', 'BLACK_WON' or 'UNFINISHED' after the last move, or 'ILLEGAL' with plies = number of moves
+    made before the first bad one and error = 'move: reason' (reason: 'bad notation', 'illegal move' or
+    'game over'). error is None if every move was made."""
+    today_game = ChessVar()
+    plies = 0
+    for move in moves.split():
+        original_sq, destination_sq = move[:2], move[2:]
+        if len(move) != 4 or original_sq not in SQUARE_INDEX or destination_sq not in SQUARE_INDEX:
+            return game_id, "ILLEGAL", plies, f"{move}: bad notation"
+        if not today_game.make_move(original_sq, destination_sq):
+            if today_game.get_game_state() != "UNFINISHED":
+                return game_id, "ILLEGAL", plies, f"{move}: game over"
+            return game_id, "ILLEGAL", plies, f"{move}: illegal move"
+        plies += 1
+    return game_id, today_game.get_game_state(), plies, None
+
+
+def validate_records(records):
+    """Takes an iterable of (game id, moves text) and yields the result of validate_game for each, one at a time."""
+    for game_id, moves in records:
+        yield validate_game(game_id, moves)
+
+
+def validate_chunk(records):
+    """Runs in a worker process. Takes a list of (game id, moves text) and returns the list of their results."""
+    return list(validate_records(records))
+
+
+def chunked(iterable, size):
+    """Takes an iterable and yields lists of up to size items from it, without reading further ahead."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_records_parallel(records, workers=None, chunk_size=1000, max_pending=None):
+    """Takes an iterable of (game id, moves text) and yields the result of validate_game for each, in order. Chunks
+    of chunk_size games are validated in worker processes, with at most max_pending chunks (default: 2 per worker)
+    read ahead, so memory use does not depend on the number of games."""
+    workers = workers or os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunked(records, chunk_size):
+            pending.append(executor.submit(validate_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        for future in pending:
+            yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate recorded ChessVar games")
+    parser.add_argument("paths", nargs="+", help="game record files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (0 = validate in this process)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="games per chunk sent to a worker")
+    parser.add_argument("--quiet", action="store_true", help="only print the totals, not each illegal game")
+    args = parser.parse_args()
+
+    records = itertools.chain.from_iterable(read_records(path) for path in args.paths)
+    if args.workers == 0:
+        results = validate_records(records)
+    else:
+        results = validate_records_parallel(records, args.workers, args.chunk_size)
+    counts = {}
+    for game_id, result, plies, error in results:
+        counts[result] = counts.get(result, 0) + 1
+        if error is not None and not args.quiet:
+            print(f"{game_id}: ply {plies + 1} {error}")
+    for result, count in sorted(counts.items()):
+        print(f"{result}: {count}")
+
+
+if __name__ == '__main__':
+    main()
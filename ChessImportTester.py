@@ -0,0 +1,54 @@
+import unittest
+import os
+import tempfile
+import itertools
+from ChessImport import read_records, validate_game, validate_records, validate_records_parallel, chunked
+
+
+class TestChessImport(unittest.TestCase):
+
+    def setUp(self):
+        """Writes a small game record file."""
+        record_file = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+        record_file.write("# test games\n"
+                          "win\td2d4 e7e5 g1f3 d8g5 c1g5\n"
+                          "\n"
+                          "d2d4 e7e5\n"
+                          "illegal\td2d4 e7e5 d4d6\n"
+                          "over\td2d4 e7e5 g1f3 d8g5 c1g5 a7a6\n"
+                          "notation\td2d4 e7\n")
+        record_file.close()
+        self.path = record_file.name
+
+    def tearDown(self):
+        """Removes the game record file."""
+        os.remove(self.path)
+
+    def test_1(self):
+        """Tests records are read with their game id or line number."""
+        records = list(read_records(self.path))
+        self.assertEqual([game_id for game_id, moves in records], ["win", "4", "illegal", "over", "notation"])
+        self.assertEqual(records[1][1], "d2d4 e7e5")
+
+    def test_2(self):
+        """Tests the result and first bad move of each game."""
+        results = list(validate_records(read_records(self.path)))
+        self.assertEqual(results, [("win", "WHITE_WON", 5, None),
+                                   ("4", "UNFINISHED", 2, None),
+                                   ("illegal", "ILLEGAL", 2, "d4d6: illegal move"),
+                                   ("over", "ILLEGAL", 5, "a7a6: game over"),
+                                   ("notation", "ILLEGAL", 1, "e7: bad notation")])
+
+    def test_3(self):
+        """Tests validating in worker processes gives the same results in the same order."""
+        records = list(read_records(self.path)) * 7
+        self.assertEqual(list(validate_records_parallel(records, workers=2, chunk_size=3, max_pending=2)),
+                         list(validate_records(records)))
+
+    def test_4(self):
+        """Tests chunked does not read further ahead than the chunk it yields."""
+        counter = itertools.count()
+        chunks = chunked(counter, 4)
+        self.assertEqual(next(chunks), [0, 1, 2, 3])
+        self.assertEqual(next(counter), 4)
+        self.assertEqual(validate_game("empty", ""), ("empty", "UNFINISHED", 0, None))
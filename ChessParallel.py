@@ -0,0 +1,129 @@
+# Date: October 18, 2026
+# Description: Parallel analysis of a ChessVar position. The moves of the current player are split across a pool of
+#              worker processes, each searching the position after one move with ChessEngine. Positions are sent to
+#              the workers as ChessVar.to_bytes, and the node counts of every worker are added up.
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from ChessVar import ChessVar, decode_move
+from ChessEngine import ChessEngine, WIN_SCORE
+from ChessCache import PositionCache
+
+_MATE_RANGE = 1000                                       # Scores this close to WIN_SCORE are wins/losses in N plies
+_WORKER_TABLE_SIZE = 1 << 16                             # Positions in the transposition table of each worker
+_worker_cache = None                                     # That table, made by the worker's first search
+
+
+def _parent_score(child_score):
+    """Takes the score of the position after a move (for the player to move there) and returns the score of the move
+    for the player who made it. A win or loss is one ply further away from the position before the move."""
+    score = -child_score
+    if score > WIN_SCORE - _MATE_RANGE:
+        return score - 1
+    if score < -WIN_SCORE + _MATE_RANGE:
+        return score + 1
+    return score
+
+
+def _search_move(position, move, max_depth, time_limit, node_limit):
+    """Runs in a worker process. Takes a position (ChessVar.to_bytes), one of its moves and the search limits.
+    Searches the position after the move and returns (move, score of the move, depth reached, nodes, worker process
+    id). The score is None and the depth 0 if the time or node limit ran out before the search completed one depth.
+    Every search in the worker shares one transposition table, kept between moves and analyses."""
+    global _worker_cache
+    today_game = ChessVar.from_bytes(position)
+    today_game.make_encoded_move(move)
+    if _worker_cache is None:
+        _worker_cache = PositionCache(_WORKER_TABLE_SIZE)
+    engine = ChessEngine(max_depth=max(max_depth - 1, 1), time_limit=time_limit, node_limit=node_limit,
+                         cache=_worker_cache)
+    if max_depth <= 1 or today_game.get_game_state() != "UNFINISHED":
+        # Nothing to search after the move: score the position as it is
+        depth = 0
+        if today_game.get_game_state() == "UNFINISHED":
+            child_score = engine.evaluate(today_game)
+        else:
+            child_score = engine.terminal_score(today_game)
+    else:
+        best_move, child_score, depth = engine.search(today_game)
+        if depth == 0:
+            # The score of an unfinished iteration means nothing
+            return move, None, 0, engine.get_nodes() + 1, os.getpid()
+    return move, _parent_score(child_score), depth + 1, engine.get_nodes() + 1, os.getpid()
+
+
+class ParallelAnalyzer:
+    """Represents a parallel analyzer with a pool of worker processes (concurrent.futures.ProcessPoolExecutor) and the
+    search limits used for each move: depth, time limit (seconds) and node limit per move. Use it as a context manager
+    or call shutdown when done, so the worker processes are stopped."""
+
+    def __init__(self, max_workers=None, max_depth=4, time_limit=None, node_limit=None):
+        """Creates a ParallelAnalyzer with at most max_workers worker processes (default: number of CPUs) and the
+        search limits for each move."""
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+
+    def __enter__(self):
+        """Returns the analyzer."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stops the worker processes."""
+        self.shutdown()
+
+    def shutdown(self):
+        """Stops the worker processes."""
+        self._executor.shutdown()
+
+    def analyze(self, game):
+        """Takes a ChessVar game and searches every move of the current player in the worker processes. Returns a
+        dictionary with the best move ("move", encoded as in generate_legal_moves, None if there are no moves), its
+        "score" for the current player, the lowest "depth" reached over the moves, "scores" (dictionary where keys =
+        move and values = score), total "nodes" and "worker_nodes" (dictionary where keys = worker process id and
+        values = nodes searched by it). Moves whose search ran out of time or nodes before completing one depth have
+        no score and make the depth 0; if no move has a score, the first move is returned with a score of 0. The game
+        is not changed."""
+        moves = game.generate_legal_moves()
+        result = {"move": None, "score": 0, "depth": 0, "scores": {}, "nodes": 0, "worker_nodes": {}}
+        if not moves:
+            result["score"] = ChessEngine().terminal_score(game)
+            return result
+
+        position = game.to_bytes()
+        futures = [self._executor.submit(_search_move, position, move, self._max_depth, self._time_limit,
+                                         self._node_limit) for move in moves]
+        depths = []
+        for future in futures:
+            move, score, depth, nodes, worker = future.result()
+            result["nodes"] += nodes
+            result["worker_nodes"][worker] = result["worker_nodes"].get(worker, 0) + nodes
+            depths.append(depth)
+            if score is None:
+                continue
+            result["scores"][move] = score
+            if result["move"] is None or score > result["score"]:
+                result["move"], result["score"] = move, score
+        if result["move"] is None:
+            result["move"] = moves[0]
+        result["depth"] = min(depths)
+        return result
+
+
+def main():
+    """Analyzes the starting position (or the position after the moves given on the command line, i.e. d2d4 e7e5)
+    and prints the score of every move."""
+    today_game = ChessVar()
+    for move in sys.argv[1:]:
+        today_game.make_move(move[:2], move[2:])
+    with ParallelAnalyzer(max_depth=4) as analyzer:
+        result = analyzer.analyze(today_game)
+    for move, score in sorted(result["scores"].items(), key=lambda item: -item[1]):
+        print(" ".join(decode_move(move)), score)
+    print(f"nodes {result['nodes']} over {len(result['worker_nodes'])} workers, depth {result['depth']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import unittest
+from ChessVar import ChessVar
+from ChessEngine import ChessEngine
+from ChessParallel import ParallelAnalyzer
+
+
+class TestChessParallel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Starts one analyzer with two worker processes for all tests."""
+        cls.analyzer = ParallelAnalyzer(max_workers=2, max_depth=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stops the worker processes."""
+        cls.analyzer.shutdown()
+
+    def test_1(self):
+        """Tests parallel analysis gives the same score as the engine and counts the nodes of every worker."""
+        today_game = ChessVar()
+        today_game.make_move("g1", "f3")
+        today_game.make_move("g8", "f6")
+        result = self.analyzer.analyze(today_game)
+        move, score, depth = ChessEngine(max_depth=2).search(today_game)
+        self.assertEqual(result["score"], score)
+        self.assertEqual(result["scores"][result["move"]], score)
+        self.assertEqual(set(result["scores"]), set(today_game.generate_legal_moves()))
+        self.assertEqual(sum(result["worker_nodes"].values()), result["nodes"])
+
+    def test_2(self):
+        """Tests a finished game has no move to analyze."""
+        today_game = ChessVar()
+        today_game.get_black_score()["queen"] = 1
+        self.assertIsNone(self.analyzer.analyze(today_game)["move"])
+
+    def test_3(self):
+        """Tests moves whose search completed no depth before the node limit are left out instead of scored 0."""
+        with ParallelAnalyzer(max_workers=1, max_depth=3, node_limit=1) as analyzer:
+            result = analyzer.analyze(ChessVar())
+        self.assertEqual(result["scores"], {})
+        self.assertEqual(result["depth"], 0)
+        self.assertEqual(result["score"], 0)
+        self.assertIn(result["move"], ChessVar().generate_legal_moves())
+        self.assertEqual(ChessEngine().terminal_score(ChessVar()), 0)
@@ -0,0 +1,68 @@
+# Date: October 18, 2026
+# Description: A bounded pool of ChessVar games for code that plays many short games (self-play workers, the game
+#              server). acquire hands out a game in the starting position, recycling a released one if there is one,
+#              and release puts a finished game back with ChessVar.reset (dropping its subscribers and history) so its
+#              board, score dictionaries and lists are reused instead of allocated again. The pool never keeps more
+#              than max_size idle games; games released when it is full are left to the garbage collector.
+
+from ChessVar import ChessVar
+
+
+class ChessPool:
+    """Represents a pool of at most max_size idle ChessVar games (all using bitboards or all not), with counters of
+    games created, reused, released and discarded."""
+
+    def __init__(self, max_size=64, use_bitboards=False):
+        """Creates an empty ChessPool."""
+        self._max_size = max_size
+        self._use_bitboards = use_bitboards
+        self._idle = []                                  # Reset games ready to hand out, last released last
+        self._idle_ids = set()                           # id() of every game in _idle
+        self._created = 0
+        self._reused = 0
+        self._released = 0
+        self._discarded = 0
+
+    def __len__(self):
+        """Returns the number of idle games in the pool."""
+        return len(self._idle)
+
+    def get_max_size(self):
+        """Returns the most idle games the pool keeps."""
+        return self._max_size
+
+    def get_stats(self):
+        """Returns a dictionary of the number of games created, reused (handed out again), released and discarded
+        (released when the pool was full), and the number of idle games."""
+        return {"created": self._created, "reused": self._reused, "released": self._released,
+                "discarded": self._discarded, "idle": len(self._idle)}
+
+    def acquire(self):
+        """Returns a game in the starting position: a released one if the pool has any, otherwise a new one."""
+        if self._idle:
+            self._reused += 1
+            today_game = self._idle.pop()
+            self._idle_ids.discard(id(today_game))
+            return today_game
+        self._created += 1
+        return ChessVar(self._use_bitboards)
+
+    def release(self, today_game):
+        """Takes a game that is no longer used, resets it and keeps it for the next acquire. Returns False (and keeps
+        nothing) if the game is already in the pool, the pool already holds max_size games or the game does not use
+        bitboards the way the pool's games do. The caller must not use the game afterwards."""
+        if id(today_game) in self._idle_ids:
+            return False
+        self._released += 1
+        if len(self._idle) >= self._max_size or (today_game._bitboards is not None) != self._use_bitboards:
+            self._discarded += 1
+            return False
+        today_game.reset()
+        self._idle.append(today_game)
+        self._idle_ids.add(id(today_game))
+        return True
+
+    def clear(self):
+        """Drops every idle game."""
+        self._idle.clear()
+        self._idle_ids.clear()
@@ -0,0 +1,91 @@
+import unittest
+import random
+from ChessVar import ChessVar
+from ChessPool import ChessPool
+
+
+def play_random(today_game, plies, seed):
+    """Makes up to plies random legal moves in today_game."""
+    rnd = random.Random(seed)
+    for _ in range(plies):
+        moves = today_game.generate_legal_moves()
+        if not moves:
+            break
+        today_game.make_encoded_move(rnd.choice(moves))
+
+
+class TestChessPool(unittest.TestCase):
+
+    def test_1(self):
+        """Tests reset puts a played game back in the same state as a new one."""
+        today_game = ChessVar()
+        events = []
+        today_game.subscribe("*", lambda event_name, details: events.append(event_name))
+        today_game.record_events(4)
+        today_game.attacked_squares("white")
+        play_random(today_game, 40, 1)
+        white_score = today_game.get_white_score()
+        today_game.reset()
+        new_game = ChessVar()
+        self.assertEqual(today_game.to_bytes(), new_game.to_bytes())
+        self.assertEqual(today_game.position_hash(), new_game.position_hash())
+        self.assertEqual(today_game.get_board(), new_game.create_game_board())
+        self.assertEqual(today_game.get_material("black"), new_game.get_material("black"))
+        self.assertEqual(today_game.attacked_squares("black"), new_game.attacked_squares("black"))
+        self.assertIs(today_game.get_white_score(), white_score)
+        self.assertFalse(today_game.unmake_move())
+        self.assertEqual(today_game.get_recent_events(), [])
+        events.clear()
+        self.assertTrue(today_game.make_move("d2", "d4"))
+        self.assertEqual(events, [])
+
+    def test_2(self):
+        """Tests copy gives an independent game with the same position and history."""
+        today_game = ChessVar(use_bitboards=True)
+        for original_sq, destination_sq in (("d2", "d4"), ("h7", "h5"), ("b2", "b3"), ("c7", "c5"), ("g1", "f3"),
+                                            ("c5", "c6")):
+            self.assertTrue(today_game.make_move(original_sq, destination_sq))
+        copy_game = today_game.copy()
+        self.assertEqual(copy_game.to_fen(), today_game.to_fen())
+        self.assertEqual(copy_game.position_hash(), today_game.position_hash())
+        moves = copy_game.generate_legal_moves()
+        copy_game.make_encoded_move(moves[0])
+        self.assertNotEqual(copy_game.to_fen(), today_game.to_fen())
+        for _ in range(7):
+            copy_game.unmake_move()
+        self.assertEqual(copy_game.to_bytes(), ChessVar().to_bytes())
+        self.assertIsNotNone(copy_game._bitboards)
+        self.assertEqual(today_game.get_board(), ChessVar.from_fen(today_game.to_fen()).get_board())
+
+    def test_3(self):
+        """Tests the pool reuses released games, never keeps more than max_size and counts what it did."""
+        pool = ChessPool(2)
+        games = [pool.acquire() for _ in range(3)]
+        for today_game in games:
+            play_random(today_game, 10, 3)
+        self.assertTrue(pool.release(games[0]))
+        self.assertTrue(pool.release(games[1]))
+        self.assertFalse(pool.release(games[2]))
+        self.assertFalse(pool.release(ChessVar(use_bitboards=True)))
+        self.assertEqual(len(pool), 2)
+        reused = pool.acquire()
+        self.assertIs(reused, games[1])
+        self.assertEqual(reused.to_bytes(), ChessVar().to_bytes())
+        self.assertEqual(pool.get_stats(), {"created": 3, "reused": 1, "released": 4, "discarded": 2, "idle": 1})
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+    def test_4(self):
+        """Tests a game released twice is only kept once, so two acquires never hand out the same game."""
+        pool = ChessPool(4)
+        today_game = pool.acquire()
+        self.assertTrue(pool.release(today_game))
+        self.assertFalse(pool.release(today_game))
+        self.assertEqual(len(pool), 1)
+        self.assertIsNot(pool.acquire(), pool.acquire())
+        self.assertEqual(pool.get_stats()["released"], 1)
+        self.assertTrue(pool.release(today_game))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# Date: October 18, 2026
+# Description: Opt-in profiling of ChessVar's hot paths. A Profiler, while enabled, replaces the instrumented methods
+#              (is_move_legal, every chess piece validator's validate, PawnMove.vertical_capture, get_square,
+#              set_square, make_move and get_game_state) with wrappers that count calls and add up wall time, both in
+#              total and per call stack of instrumented methods. The validators are measured through validate and
+#              vertical_capture, which ChessVar calls directly; the older is_move_valid and check_vertical_capture
+#              only pass their calls on to them, so their time shows up there. Disabling puts the original methods
+#              back, so a game that is not being profiled runs exactly the code it always did. Totals can be exported
+#              as a dictionary, as Prometheus text or as folded stacks ("a;b;c microseconds" lines) for flamegraph
+#              tools.
+
+import time
+import ChessVar as chess_var_module
+from ChessVar import ChessVar
+
+# Instrumented methods: (class name in ChessVar, method name)
+TARGETS = (("ChessVar", "make_move"), ("ChessVar", "is_move_legal"), ("ChessVar", "get_game_state"),
+           ("ChessVar", "get_square"), ("ChessVar", "set_square"), ("PawnMove", "validate"),
+           ("PawnMove", "vertical_capture"), ("RookMove", "validate"), ("KnightMove", "validate"),
+           ("BishopMove", "validate"), ("QueenMove", "validate"), ("KingMove", "validate"))
+
+_enabled_profiler = None                                 # The Profiler whose wrappers are installed, if any
+
+
+class Profiler:
+    """Represents a profiler of the TARGETS methods with call counts, total and self seconds per method (self time
+    leaves out the time spent in instrumented methods it called) and self seconds per call stack. Only one Profiler
+    can be enabled at a time. Can be used as a context manager that enables it and disables it afterwards."""
+
+    def __init__(self, targets=TARGETS, clock=time.perf_counter):
+        """Creates a disabled Profiler of the targets ((class name, method name) in ChessVar) timed with clock."""
+        self._targets = tuple(targets)
+        self._clock = clock
+        self._originals = {}                             # (class name, method name) -> the method replaced
+        self._stack = []                                 # Names of the instrumented calls running now, outermost first
+        self._child_seconds = []                         # Time spent in instrumented calls made by each of them
+        self.reset()
+
+    def reset(self):
+        """Sets every count and time back to 0."""
+        self._calls = {f"{class_name}.{method_name}": 0 for class_name, method_name in self._targets}
+        self._seconds = dict.fromkeys(self._calls, 0.0)
+        self._self_seconds = dict.fromkeys(self._calls, 0.0)
+        self._stacks = {}                                # Tuple of names (outermost first) -> self seconds
+
+    def is_enabled(self):
+        """Returns True if the profiler's wrappers are installed."""
+        return bool(self._originals)
+
+    def enable(self):
+        """Replaces the target methods with counting wrappers. Does nothing if already enabled. Raises RuntimeError if
+        another Profiler is enabled."""
+        global _enabled_profiler
+        if self._originals:
+            return
+        if _enabled_profiler is not None:
+            raise RuntimeError("another Profiler is already enabled")
+        for class_name, method_name in self._targets:
+            cls = getattr(chess_var_module, class_name)
+            original = cls.__dict__[method_name]
+            self._originals[(class_name, method_name)] = original
+            setattr(cls, method_name, self._wrap(f"{class_name}.{method_name}", original))
+        _enabled_profiler = self
+
+    def disable(self):
+        """Puts the original methods back. The counts and times are kept."""
+        global _enabled_profiler
+        for (class_name, method_name), original in self._originals.items():
+            setattr(getattr(chess_var_module, class_name), method_name, original)
+        self._originals = {}
+        if _enabled_profiler is self:
+            _enabled_profiler = None
+
+    def __enter__(self):
+        """Enables the profiler and returns it."""
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Disables the profiler."""
+        self.disable()
+
+    def _wrap(self, name, original):
+        """Returns a function that calls original and records its call and time under name."""
+        clock = self._clock
+        stack = self._stack
+        child_seconds = self._child_seconds
+
+        def profiled(*args, **kwargs):
+            stack.append(name)
+            child_seconds.append(0.0)
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                seconds = clock() - start
+                self_seconds = seconds - child_seconds.pop()
+                key = tuple(stack)
+                stack.pop()
+                if child_seconds:
+                    child_seconds[-1] += seconds
+                self._calls[name] += 1
+                self._seconds[name] += seconds
+                self._self_seconds[name] += self_seconds
+                self._stacks[key] = self._stacks.get(key, 0.0) + self_seconds
+
+        profiled.__name__ = original.__name__
+        profiled.__doc__ = original.__doc__
+        profiled.__wrapped__ = original
+        return profiled
+
+    def get_stats(self):
+        """Returns a dictionary where keys = 'Class.method' and values = dictionaries with 'calls', 'seconds' (total)
+        and 'self_seconds'."""
+        return {name: {"calls": self._calls[name], "seconds": self._seconds[name],
+                       "self_seconds": self._self_seconds[name]} for name in self._calls}
+
+    def to_prometheus(self, prefix="chessvar"):
+        """Returns the counts and times in the Prometheus text exposition format, one series per method."""
+        lines = []
+        for metric, help_text, values in (
+                ("calls_total", "Calls of instrumented ChessVar methods.", self._calls),
+                ("seconds_total", "Wall time spent in instrumented ChessVar methods.", self._seconds),
+                ("self_seconds_total", "Wall time spent in instrumented ChessVar methods, less the time spent in "
+                                       "instrumented methods they called.", self._self_seconds)):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name, value in values.items():
+                lines.append(f'{prefix}_{metric}{{method="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def to_folded(self):
+        """Returns the self time of every call stack as folded stacks: one 'outer;inner;... microseconds' line per
+        stack, as read by flamegraph.pl and similar tools."""
+        return "".join(f"{';'.join(key)} {round(seconds * 1e6)}\n" for key, seconds in sorted(self._stacks.items()))
+
+    def write_folded(self, path):
+        """Takes a file path and writes the folded stacks (see to_folded) to it."""
+        with open(path, "w") as folded_file:
+            folded_file.write(self.to_folded())
+
+    def format_table(self):
+        """Returns a text table of the methods that were called, most total time first."""
+        lines = [f"{'method':<34}{'calls':>10}{'total ms':>12}{'self ms':>12}{'us/call':>10}"]
+        for name in sorted(self._calls, key=lambda name: -self._seconds[name]):
+            calls = self._calls[name]
+            if calls:
+                lines.append(f"{name:<34}{calls:>10}{self._seconds[name] * 1000:>12.1f}"
+                             f"{self._self_seconds[name] * 1000:>12.1f}{self._seconds[name] * 1e6 / calls:>10.2f}")
+        return "\n".join(lines)
+
+
+def main():
+    today_game = ChessVar()
+    with Profiler() as profiler:
+        for move in "d2d4 c7c5 a2a4 d7d5 b1c3 c8e6 c3d5 b8c6 d5e7 g7g5 a1b1 d8d6 h2h4 d6e7".split():
+            today_game.make_move(move[:2], move[2:])
+    print(profiler.format_table())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import tempfile
+from ChessVar import ChessVar, PawnMove
+from ChessProfiler import Profiler
+
+
+class FakeClock:
+    """A clock that moves forward one second every time it is read."""
+
+    def __init__(self):
+        """Creates a FakeClock at 0 seconds."""
+        self._now = 0.0
+
+    def __call__(self):
+        """Moves the clock forward one second and returns the time."""
+        self._now += 1.0
+        return self._now
+
+
+class TestChessProfiler(unittest.TestCase):
+
+    def test_1(self):
+        """Tests calls are counted while enabled and the original methods are back after disabling."""
+        original = ChessVar.make_move
+        today_game = ChessVar()
+        with Profiler() as profiler:
+            self.assertTrue(profiler.is_enabled())
+            self.assertIsNot(ChessVar.make_move, original)
+            self.assertTrue(today_game.make_move("d2", "d4"))
+            self.assertFalse(today_game.make_move("d4", "d5"))
+            today_game.get_square("d4")
+        self.assertIs(ChessVar.make_move, original)
+        self.assertFalse(profiler.is_enabled())
+        today_game.make_move("e7", "e5")
+
+        stats = profiler.get_stats()
+        self.assertEqual(stats["ChessVar.make_move"]["calls"], 2)
+        self.assertEqual(stats["ChessVar.is_move_legal"]["calls"], 2)
+        self.assertEqual(stats["PawnMove.validate"]["calls"], 1)
+        self.assertEqual(stats["PawnMove.vertical_capture"]["calls"], 1)
+        self.assertEqual(stats["ChessVar.get_square"]["calls"], 1)
+        self.assertEqual(stats["KingMove.validate"]["calls"], 0)
+
+    def test_2(self):
+        """Tests total and self times and the folded stacks of nested calls."""
+        today_game = ChessVar()
+        with Profiler(clock=FakeClock()) as profiler:
+            today_game.make_move("d2", "d4")
+        stats = profiler.get_stats()
+        # Every call reads the clock twice and the calls made inside it read it in between
+        self.assertEqual(stats["PawnMove.validate"]["seconds"], 1.0)
+        self.assertEqual(stats["ChessVar.is_move_legal"]["seconds"], 3.0)
+        self.assertEqual(stats["ChessVar.is_move_legal"]["self_seconds"], 2.0)
+        self.assertEqual(stats["ChessVar.make_move"]["seconds"], 9.0)
+        self.assertEqual(stats["ChessVar.make_move"]["self_seconds"], 4.0)
+        self.assertEqual(profiler.to_folded().splitlines(), [
+            "ChessVar.make_move 4000000",
+            "ChessVar.make_move;ChessVar.get_game_state 1000000",
+            "ChessVar.make_move;ChessVar.is_move_legal 2000000",
+            "ChessVar.make_move;ChessVar.is_move_legal;PawnMove.validate 1000000",
+            "ChessVar.make_move;PawnMove.vertical_capture 1000000"])
+
+        path = os.path.join(tempfile.mkdtemp(), "moves.folded")
+        profiler.write_folded(path)
+        with open(path) as folded_file:
+            self.assertEqual(folded_file.read(), profiler.to_folded())
+
+    def test_3(self):
+        """Tests the Prometheus export, reset and that only one profiler can be enabled."""
+        profiler = Profiler(targets=(("PawnMove", "validate"),))
+        with profiler:
+            with self.assertRaises(RuntimeError):
+                Profiler().enable()
+            ChessVar().make_move("a2", "a3")
+        self.assertIn('chessvar_calls_total{method="PawnMove.validate"} 1', profiler.to_prometheus())
+        self.assertIn("# TYPE chessvar_seconds_total counter", profiler.to_prometheus())
+        self.assertEqual(PawnMove.validate.__name__, "validate")
+        profiler.reset()
+        self.assertEqual(profiler.get_stats()["PawnMove.validate"]["calls"], 0)
+        with Profiler() as other_profiler:
+            ChessVar().make_move("a2", "a3")
+        self.assertEqual(other_profiler.get_stats()["ChessVar.make_move"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# Date: October 18, 2026
+# Description: Self-play of the chess variant between computer agents (random, greedy capture, search). Plays N games
+#              over worker processes and reports games and plies per second, win rates and the distribution of game
+#              lengths. Run: python ChessSelfPlay.py --games 1000 --white greedy --black random
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ChessVar import ChessVar
+from ChessEngine import ChessEngine
+from ChessPool import ChessPool
+
+
+class RandomAgent:
+    """Represents an agent that plays a random legal move."""
+
+    def __init__(self, rnd, depth):
+        """Creates a RandomAgent using the random number generator rnd. Depth is not used."""
+        self._rnd = rnd
+
+    def choose_move(self, game):
+        """Takes a ChessVar game and returns one of its legal moves (encoded), or None if there are none."""
+        moves = game.generate_legal_moves()
+        return self._rnd.choice(moves) if moves else None
+
+
+class GreedyAgent:
+    """Represents an agent that plays the move leaving it closest to completing a type of chess piece (a winning
+    capture first), choosing randomly between equally good moves."""
+
+    def __init__(self, rnd, depth):
+        """Creates a GreedyAgent using the random number generator rnd. Depth is not used."""
+        self._rnd = rnd
+        self._engine = ChessEngine()
+
+    def choose_move(self, game):
+        """Takes a ChessVar game and returns its best legal move (encoded) one move ahead, or None if there are none."""
+        best_moves = []
+        best_score = None
+        for move in game.generate_legal_moves():
+            game.make_encoded_move(move)
+            if game.get_game_state() != "UNFINISHED":
+                score = float("inf")
+            else:
+                score = -self._engine.evaluate(game)
+            game.unmake_move()
+            if best_score is None or score > best_score:
+                best_moves, best_score = [move], score
+            elif score == best_score:
+                best_moves.append(move)
+        return self._rnd.choice(best_moves) if best_moves else None
+
+
+class SearchAgent:
+    """Represents an agent that plays the best move found by a ChessEngine search of the given depth."""
+
+    def __init__(self, rnd, depth):
+        """Creates a SearchAgent searching depth plies. rnd is not used, the search always picks the same move."""
+        self._engine = ChessEngine(max_depth=depth)
+
+    def choose_move(self, game):
+        """Takes a ChessVar game and returns the move found by the search (encoded), or None if there are none."""
+        return self._engine.search(game)[0]
+
+
+AGENTS = {"random": RandomAgent, "greedy": GreedyAgent, "search": SearchAgent}
+
+
+def play_game(white_agent, black_agent, max_plies, moves=None, pool=None):
+    """Takes the agents playing white and black and the most plies to play. Plays one game and returns (result,
+    plies played), the result being 'WHITE_WON', 'BLACK_WON', 'NO_MOVES' (the current player cannot move) or
+    'UNFINISHED' (max_plies reached). Moves are chosen from generate_legal_moves, so they are made with
+    make_encoded_move without checking them again. If a list is given as moves, every move made is appended to it.
+    If a ChessPool is given, the game is taken from it and given back at the end."""
+    today_game = ChessVar() if pool is None else pool.acquire()
+    try:
+        return _play_out(today_game, {"white": white_agent, "black": black_agent}, max_plies, moves)
+    finally:
+        if pool is not None:
+            pool.release(today_game)
+
+
+def _play_out(today_game, agents, max_plies, moves):
+    """Plays today_game until it ends, a player has no move or max_plies are played (see play_game)."""
+    plies = 0
+    while plies < max_plies:
+        game_state = today_game.get_game_state()
+        if game_state != "UNFINISHED":
+            return game_state, plies
+        move = agents[today_game.get_current_turn()].choose_move(today_game)
+        if move is None:
+            return "NO_MOVES", plies
+        today_game.make_encoded_move(move)
+        if moves is not None:
+            moves.append(move)
+        plies += 1
+    return today_game.get_game_state(), plies
+
+
+def play_games(white, black, first_game, count, seed, max_plies, depth):
+    """Runs in a worker process. Takes the agent names for white and black, the number of the first game, number of
+    games, seed, most plies per game and search depth. Plays the games (game n uses seed + n, so results do not depend
+    on how games are split over workers) and returns a list of (result, plies) per game."""
+    results = []
+    pool = ChessPool(1)                                  # One game, reset between games
+    for game_num in range(first_game, first_game + count):
+        rnd = random.Random(seed + game_num)
+        white_agent = AGENTS[white](rnd, depth)
+        black_agent = AGENTS[black](rnd, depth)
+        results.append(play_game(white_agent, black_agent, max_plies, pool=pool))
+    return results
+
+
+def run_self_play(games, white="random", black="random", workers=None, max_plies=200, seed=0, depth=2,
+                  games_per_task=50):
+    """Plays games between the white and black agents over worker processes (workers=0 plays them in this process)
+    and returns a dictionary with "games", "plies", "seconds", "games/s", "plies/s", "results" (dictionary where keys
+    = result and values = number of games) and "lengths" (sorted list of the number of plies of every game)."""
+    start = time.perf_counter()
+    tasks = [(white, black, first_game, min(games_per_task, games - first_game), seed, max_plies, depth)
+             for first_game in range(0, games, games_per_task)]
+    all_results = []
+    if workers == 0:
+        for task in tasks:
+            all_results.extend(play_games(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for results in executor.map(play_games, *zip(*tasks)):
+                all_results.extend(results)
+    seconds = time.perf_counter() - start
+
+    summary = {"games": len(all_results), "plies": sum(plies for result, plies in all_results),
+               "seconds": seconds, "results": {}, "lengths": sorted(plies for result, plies in all_results)}
+    summary["games/s"] = summary["games"] / seconds
+    summary["plies/s"] = summary["plies"] / seconds
+    for result, plies in all_results:
+        summary["results"][result] = summary["results"].get(result, 0) + 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play between ChessVar agents")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--white", choices=sorted(AGENTS), default="random", help="agent playing white")
+    parser.add_argument("--black", choices=sorted(AGENTS), default="random", help="agent playing black")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (0 = no workers)")
+    parser.add_argument("--max-plies", type=int, default=200, help="most plies per game")
+    parser.add_argument("--depth", type=int, default=2, help="search depth of the search agent")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    summary = run_self_play(args.games, args.white, args.black, args.workers, args.max_plies, args.seed, args.depth)
+    print(f"{summary['games']} games, {summary['plies']} plies in {summary['seconds']:.2f} s: "
+          f"{summary['games/s']:,.1f} games/s, {summary['plies/s']:,.0f} plies/s")
+    for result, count in sorted(summary["results"].items()):
+        print(f"{result}: {count} ({100 * count / summary['games']:.1f}%)")
+    lengths = summary["lengths"]
+    if lengths:
+        print(f"game length (plies): min {lengths[0]}, median {lengths[len(lengths) // 2]}, "
+              f"90% {lengths[len(lengths) * 9 // 10]}, max {lengths[-1]}")
+
+
+if __name__ == '__main__':
+    main()
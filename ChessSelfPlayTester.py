@@ -0,0 +1,35 @@
+import unittest
+import random
+from ChessVar import ChessVar
+from ChessSelfPlay import GreedyAgent, RandomAgent, play_game, play_games, run_self_play
+
+
+class TestChessSelfPlay(unittest.TestCase):
+
+    def test_1(self):
+        """Tests games give the same results however they are split into tasks."""
+        together = play_games("random", "greedy", 0, 6, 11, 200, 2)
+        split = play_games("random", "greedy", 0, 2, 11, 200, 2) + play_games("random", "greedy", 2, 4, 11, 200, 2)
+        self.assertEqual(together, split)
+
+    def test_2(self):
+        """Tests the summary adds up over worker processes."""
+        summary = run_self_play(12, "random", "random", workers=2, seed=3, games_per_task=5)
+        self.assertEqual(summary["games"], 12)
+        self.assertEqual(sum(summary["results"].values()), 12)
+        self.assertEqual(sum(summary["lengths"]), summary["plies"])
+        in_process = run_self_play(12, "random", "random", workers=0, seed=3, games_per_task=5)
+        self.assertEqual(in_process["lengths"], summary["lengths"])
+
+    def test_3(self):
+        """Tests the greedy agent plays a winning capture."""
+        today_game = ChessVar()
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5"), ("g1", "f3"), ("d8", "g5")):
+            today_game.make_move(original_sq, destination_sq)
+        today_game.make_encoded_move(GreedyAgent(random.Random(0), 0).choose_move(today_game))
+        self.assertEqual(today_game.get_game_state(), "WHITE_WON")
+
+    def test_4(self):
+        """Tests the ply limit ends a game."""
+        rnd = random.Random(1)
+        self.assertEqual(play_game(RandomAgent(rnd, 0), RandomAgent(rnd, 0), 1), ("UNFINISHED", 1))
@@ -0,0 +1,484 @@
+# Date: October 18, 2026
+# Description: asyncio server hosting many ChessVar games over TCP or a Unix socket, plus a load generator that
+#              measures requests per second and move latency. The protocol is one JSON object per line. Requests have
+#              an "op" and get one response line with "ok" (true or false, with an "error" if false):
+#                {"op": "new", "game": optional id}                   -> {"ok": true, "game": id}
+#                {"op": "join", "game": id, "color": "white"}         -> {"ok": true}
+#                {"op": "move", "game": id, "from": "d2", "to": "d4"} -> {"ok": true, "state": ..., "turn": ...}
+#                {"op": "state", "game": id}                          -> {"ok": true, "fen": ..., "state": ...,
+#                                                                         "turn": ...}
+#                {"op": "watch", "game": id}                          -> {"ok": true}, then the game's snapshot and
+#                                                                         deltas (see ChessSpectator)
+#              A connection may only move for a color it joined. After a move, the other player's connection is sent
+#              {"event": "move", "game": id, "from": ..., "to": ..., "state": ..., "turn": ...}. Games with no request
+#              for idle_timeout seconds are removed and their players and spectators are sent
+#              {"event": "evicted", "game": id}.
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from ChessVar import ChessVar, SQUARE_INDEX, decode_move
+from ChessSpectator import GameBroadcaster
+from ChessProfiler import Profiler
+from ChessPool import ChessPool
+
+
+class GameSession:
+    """Represents one hosted game: the ChessVar game, the lock held while a request uses it, the number of requests
+    waiting for or holding the lock, the connection playing each color, the spectators and the time of its last
+    request."""
+
+    def __init__(self, game_id, now, today_game=None):
+        """Creates a GameSession with a ChessVar game in the starting position (a new one if none is given)."""
+        self._game_id = game_id
+        self._game = ChessVar() if today_game is None else today_game
+        self._lock = asyncio.Lock()
+        self._pending = 0                                # Requests waiting for or holding the lock
+        self._players = {}                               # Color -> _Connection
+        self._broadcaster = None                         # GameBroadcaster, once the game has a spectator
+        self._watchers = {}                              # _Connection -> (Spectator, task sending it messages)
+        self._last_active = now
+
+    def get_game_id(self):
+        """Returns the game id."""
+        return self._game_id
+
+    def get_game(self):
+        """Returns the ChessVar game."""
+        return self._game
+
+    def get_lock(self):
+        """Returns the lock of the game."""
+        return self._lock
+
+    def get_pending(self):
+        """Returns the number of requests waiting for or holding the lock."""
+        return self._pending
+
+    def add_pending(self, change):
+        """Takes +1 when a request starts waiting for the lock and -1 when it is done with the game."""
+        self._pending += change
+
+    def get_players(self):
+        """Returns the dictionary of color -> connection playing it."""
+        return self._players
+
+    def get_broadcaster(self, max_pending):
+        """Takes the queue size of each spectator and returns the GameBroadcaster of the game, creating it the first
+        time."""
+        if self._broadcaster is None:
+            self._broadcaster = GameBroadcaster(self._game, self._game_id, max_pending)
+        return self._broadcaster
+
+    def get_watchers(self):
+        """Returns the dictionary of connection -> (Spectator, task sending it messages)."""
+        return self._watchers
+
+    def stop_watching(self, connection):
+        """Takes a connection and stops sending it the game, if it was watching."""
+        spectator, task = self._watchers.pop(connection, (None, None))
+        if spectator is not None:
+            self._broadcaster.leave(spectator)
+            task.cancel()
+
+    def close(self):
+        """Stops sending the game to every spectator."""
+        for connection in list(self._watchers):
+            self.stop_watching(connection)
+        if self._broadcaster is not None:
+            self._broadcaster.close()
+
+    def get_last_active(self):
+        """Returns the time of the last request for the game."""
+        return self._last_active
+
+    def touch(self, now):
+        """Takes the current time and records it as the time of the last request."""
+        self._last_active = now
+
+
+async def _read_line(reader):
+    """Takes a stream reader and returns its next line (b"" once the client has closed it), or None if the line is
+    longer than the reader's limit, after reading past the rest of it."""
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    try:
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+    except asyncio.IncompleteReadError:
+        return b""
+
+
+class _Connection:
+    """Represents one client connection: its stream writer, the (game id, color) pairs it joined and the game ids it
+    watches."""
+
+    def __init__(self, writer):
+        self._writer = writer
+        self._joined = set()
+        self._watched = set()
+
+    def get_joined(self):
+        """Returns the set of (game id, color) joined by the connection."""
+        return self._joined
+
+    def get_watched(self):
+        """Returns the set of game ids watched by the connection."""
+        return self._watched
+
+    def write(self, message):
+        """Takes a message dictionary and queues it as one JSON line, unless the connection is closing."""
+        self.write_encoded(json.dumps(message).encode() + b"\n")
+
+    def write_encoded(self, line):
+        """Takes a message already encoded as a line of bytes and queues it, unless the connection is closing."""
+        if not self._writer.is_closing():
+            self._writer.write(line)
+
+    async def drain(self):
+        """Waits until the connection can take more."""
+        try:
+            await self._writer.drain()
+        except ConnectionError:
+            pass
+
+    async def send(self, message):
+        """Takes a message dictionary, writes it as one JSON line and waits until the connection can take more."""
+        self.write(message)
+        await self.drain()
+
+    async def stream(self, spectator, wake):
+        """Takes a Spectator and the asyncio.Event set when it has messages, and sends its messages until
+        cancelled."""
+        while True:
+            await wake.wait()
+            wake.clear()
+            for line in spectator.get_messages():
+                self.write_encoded(line)
+            await self.drain()
+
+
+class GameServer:
+    """Represents a server hosting games keyed by game id. Requests for different games never wait for each other;
+    requests for the same game are handled one at a time."""
+
+    def __init__(self, idle_timeout=300, max_games=None, spectator_queue=64, pool_size=64):
+        """Creates a GameServer. Games idle for idle_timeout seconds are evicted; max_games (default: no limit) caps
+        the number of hosted games. A spectator that falls spectator_queue messages behind is sent a snapshot
+        instead. Evicted games are recycled for new ones through a ChessPool keeping up to pool_size of them."""
+        self._idle_timeout = idle_timeout
+        self._max_games = max_games
+        self._spectator_queue = spectator_queue
+        self._pool = ChessPool(pool_size)
+        self._sessions = {}                              # Game id -> GameSession
+        self._game_ids = itertools.count(1)
+        self._server = None
+        self._evictor = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Starts listening on a Unix socket at path if given, otherwise on host and port (0 = any free port), and
+        starts evicting idle games."""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self.handle_client, path)
+        else:
+            self._server = await asyncio.start_server(self.handle_client, host, port)
+        self._evictor = asyncio.create_task(self._evict_forever())
+
+    def get_address(self):
+        """Returns the address the server listens on: (host, port) or the Unix socket path."""
+        return self._server.sockets[0].getsockname()
+
+    def get_pool(self):
+        """Returns the ChessPool new games are taken from."""
+        return self._pool
+
+    def get_game_count(self):
+        """Returns the number of hosted games."""
+        return len(self._sessions)
+
+    async def close(self):
+        """Stops listening and stops evicting idle games."""
+        if self._evictor is not None:
+            self._evictor.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        """Serves clients until cancelled."""
+        await self._server.serve_forever()
+
+    async def _evict_forever(self):
+        """Evicts idle games every few seconds."""
+        while True:
+            await asyncio.sleep(max(min(self._idle_timeout / 4, 30), 0.01))
+            self.evict_idle()
+
+    def evict_idle(self, now=None):
+        """Removes the games with no request for idle_timeout seconds before now (default: the current time), except
+        those with a request handling or waiting for the game, and tells their players. Their games go back to the pool,
+        so no request may still reach them. Returns the number of games removed."""
+        now = time.monotonic() if now is None else now
+        idle_ids = [game_id for game_id, session in self._sessions.items()
+                    if now - session.get_last_active() >= self._idle_timeout and not session.get_pending()]
+        for game_id in idle_ids:
+            session = self._sessions.pop(game_id)
+            for color, connection in session.get_players().items():
+                connection.get_joined().discard((game_id, color))
+                connection.write({"event": "evicted", "game": game_id})
+            for connection in session.get_watchers():
+                connection.get_watched().discard(game_id)
+                connection.write({"event": "evicted", "game": game_id})
+            session.close()
+            self._pool.release(session.get_game())
+        return len(idle_ids)
+
+    async def handle_client(self, reader, writer):
+        """Reads the requests of one client connection and answers each one until the client disconnects."""
+        connection = _Connection(writer)
+        try:
+            while True:
+                line = await _read_line(reader)
+                if line is None:
+                    await connection.send({"ok": False, "error": "request too long"})
+                    continue
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    response = {"ok": False, "error": "bad request"}
+                else:
+                    response = await self.handle_request(request, connection)
+                await connection.send(response)
+        except ConnectionError:
+            pass
+        finally:
+            for game_id, color in connection.get_joined():
+                session = self._sessions.get(game_id)
+                if session is not None and session.get_players().get(color) is connection:
+                    del session.get_players()[color]
+            for game_id in connection.get_watched():
+                session = self._sessions.get(game_id)
+                if session is not None:
+                    session.stop_watching(connection)
+            writer.close()
+
+    async def handle_request(self, request, connection):
+        """Takes a request dictionary and the connection it came from and returns the response dictionary. Fields of
+        the wrong type get an error response, like unknown games and squares."""
+        op = request.get("op")
+        if op == "new":
+            return self._new_game(request.get("game"))
+
+        game_id = request.get("game")
+        session = self._sessions.get(game_id) if isinstance(game_id, str) else None
+        if session is None:
+            return {"ok": False, "error": "no such game"}
+        session.add_pending(1)
+        try:
+            async with session.get_lock():
+                if self._sessions.get(game_id) is not session:
+                    return {"ok": False, "error": "no such game"}
+                session.touch(time.monotonic())
+                if op == "move":
+                    return self._move(session, request.get("from"), request.get("to"), connection)
+                if op == "join":
+                    return self._join(session, request.get("color"), connection)
+                if op == "watch":
+                    return self._watch(session, connection)
+                if op == "state":
+                    today_game = session.get_game()
+                    return {"ok": True, "fen": today_game.to_fen(), "state": today_game.get_game_state(),
+                            "turn": today_game.get_current_turn()}
+        finally:
+            session.add_pending(-1)
+        return {"ok": False, "error": "bad request"}
+
+    def _new_game(self, game_id):
+        """Takes a requested game id (None to pick one) and starts hosting a new game. Returns the response."""
+        if self._max_games is not None and len(self._sessions) >= self._max_games:
+            return {"ok": False, "error": "server full"}
+        if game_id is None:
+            game_id = str(next(self._game_ids))
+            while game_id in self._sessions:
+                game_id = str(next(self._game_ids))
+        elif not isinstance(game_id, str) or game_id in self._sessions:
+            return {"ok": False, "error": "game exists"}
+        self._sessions[game_id] = GameSession(game_id, time.monotonic(), self._pool.acquire())
+        return {"ok": True, "game": game_id}
+
+    def _join(self, session, color, connection):
+        """Takes a session, a color and a connection and makes the connection the player of that color, unless
+        another connection already is. Returns the response."""
+        if color not in ("white", "black"):
+            return {"ok": False, "error": "bad color"}
+        players = session.get_players()
+        if players.get(color, connection) is not connection:
+            return {"ok": False, "error": "color taken"}
+        players[color] = connection
+        connection.get_joined().add((session.get_game_id(), color))
+        return {"ok": True}
+
+    def _watch(self, session, connection):
+        """Takes a session and a connection and starts sending the game to the connection as a spectator. The
+        response is written before the task sending the game first runs. Returns the response."""
+        if connection in session.get_watchers():
+            return {"ok": False, "error": "already watching"}
+        wake = asyncio.Event()
+        spectator = session.get_broadcaster(self._spectator_queue).join(wake.set)
+        session.get_watchers()[connection] = (spectator, asyncio.create_task(connection.stream(spectator, wake)))
+        connection.get_watched().add(session.get_game_id())
+        return {"ok": True}
+
+    def _move(self, session, original_sq, destination_sq, connection):
+        """Takes a session, the squares of a move and the connection asking for it. Makes the move if the connection
+        plays the side to move and the move is legal, and queues it for the other player without waiting for their
+        connection to take it, so a stalled player never holds up the game's lock. Returns the response."""
+        today_game = session.get_game()
+        if session.get_players().get(today_game.get_current_turn()) is not connection:
+            return {"ok": False, "error": "not your turn"}
+        if (not isinstance(original_sq, str) or not isinstance(destination_sq, str) or original_sq not in SQUARE_INDEX
+                or destination_sq not in SQUARE_INDEX):
+            return {"ok": False, "error": "bad square"}
+        if not today_game.make_move(original_sq, destination_sq):
+            return {"ok": False, "error": "illegal move", "state": today_game.get_game_state()}
+
+        result = {"state": today_game.get_game_state(), "turn": today_game.get_current_turn()}
+        event = {"event": "move", "game": session.get_game_id(), "from": original_sq, "to": destination_sq, **result}
+        for player in set(session.get_players().values()):
+            if player is not connection:
+                player.write(event)
+        return {"ok": True, **result}
+
+
+async def _load_client(host, port, path, moves, seed, latencies):
+    """Runs one load generator client: plays random legal moves for both colors of its own games, starting a new game
+    whenever one ends, until it has made moves moves. Appends the latency of every move to latencies. Returns the
+    number of requests sent."""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    rnd = random.Random(seed)
+    requests = 0
+
+    async def request(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    mirror = None
+    game_id = None
+    for _ in range(moves):
+        if mirror is None or mirror.get_game_state() != "UNFINISHED":
+            game_id = (await request({"op": "new"}))["game"]
+            await request({"op": "join", "game": game_id, "color": "white"})
+            await request({"op": "join", "game": game_id, "color": "black"})
+            requests += 3
+            mirror = ChessVar()
+        move = rnd.choice(mirror.generate_legal_moves())
+        original_sq, destination_sq = decode_move(move)
+        start = time.perf_counter()
+        response = await request({"op": "move", "game": game_id, "from": original_sq, "to": destination_sq})
+        latencies.append(time.perf_counter() - start)
+        requests += 1
+        if not response["ok"]:
+            raise RuntimeError(f"server rejected {original_sq}{destination_sq}: {response['error']}")
+        mirror.make_encoded_move(move)
+    writer.close()
+    return requests
+
+
+async def run_load(clients=50, moves=200, host="127.0.0.1", port=None, path=None, seed=0):
+    """Takes the number of concurrent clients and the number of moves each makes and runs the load generator against
+    the server at path (Unix socket) or host and port. If neither port nor path is given, runs against a server
+    started in this process. Returns a dictionary with the number of requests and moves, the seconds taken,
+    requests per second and the p50 and p99 move latency in milliseconds (0 if no moves were made)."""
+    server = None
+    if port is None and path is None:
+        server = GameServer()
+        await server.start(host)
+        port = server.get_address()[1]
+    latencies = []
+    start = time.perf_counter()
+    try:
+        requests = await asyncio.gather(*(_load_client(host, port, path, moves, seed + client_num, latencies)
+                                          for client_num in range(clients)))
+    finally:
+        if server is not None:
+            await server.close()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    result = {"requests": sum(requests), "moves": len(latencies), "seconds": seconds,
+              "requests_per_second": sum(requests) / seconds, "p50_ms": 0.0, "p99_ms": 0.0}
+    if latencies:
+        result["p50_ms"] = latencies[len(latencies) // 2] * 1000
+        result["p99_ms"] = latencies[min(len(latencies) * 99 // 100, len(latencies) - 1)] * 1000
+    return result
+
+
+async def _serve(host, port, path, idle_timeout):
+    """Runs a GameServer until cancelled."""
+    server = GameServer(idle_timeout)
+    await server.start(host, port, path)
+    print(f"serving on {server.get_address()}")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host ChessVar games or measure a server under load")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="host games")
+    serve_parser.add_argument("--idle-timeout", type=float, default=300, help="seconds before an idle game is evicted")
+    load_parser = subparsers.add_parser("load", help="run the load generator (against an in-process server if no "
+                                                     "--port or --unix is given)")
+    load_parser.add_argument("--clients", type=int, default=50, help="concurrent clients")
+    load_parser.add_argument("--moves", type=int, default=200, help="moves per client")
+    load_parser.add_argument("--seed", type=int, default=0, help="random seed")
+    for subparser in (serve_parser, load_parser):
+        subparser.add_argument("--host", default="127.0.0.1", help="TCP host")
+        subparser.add_argument("--port", type=int, default=None, help="TCP port")
+        subparser.add_argument("--unix", default=None, help="Unix socket path (instead of TCP)")
+        subparser.add_argument("--profile", default=None, metavar="FILE",
+                               help="profile ChessVar's hot paths and write folded stacks to FILE")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler()
+        profiler.enable()
+    try:
+        if args.command == "serve":
+            try:
+                asyncio.run(_serve(args.host, args.port or 8765, args.unix, args.idle_timeout))
+            except KeyboardInterrupt:
+                pass
+        else:
+            summary = asyncio.run(run_load(args.clients, args.moves, args.host, args.port, args.unix, args.seed))
+            print(f"{summary['requests']} requests ({summary['moves']} moves) in {summary['seconds']:.2f}s: "
+                  f"{summary['requests_per_second']:.0f} requests/s, move latency p50 {summary['p50_ms']:.2f} ms, "
+                  f"p99 {summary['p99_ms']:.2f} ms")
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.write_folded(args.profile)
+            print(profiler.format_table())
+
+
+if __name__ == '__main__':
+    main()
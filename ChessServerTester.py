@@ -0,0 +1,178 @@
+import unittest
+import asyncio
+import json
+import time
+from ChessServer import GameServer, _Connection, run_load
+
+
+class TestChessServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        """Starts a server on a free local port."""
+        self.server = GameServer(idle_timeout=60)
+        await self.server.start()
+        self.port = self.server.get_address()[1]
+        self.streams = []
+
+    async def asyncTearDown(self):
+        """Closes the client connections and stops the server."""
+        for reader, writer in self.streams:
+            writer.close()
+        await self.server.close()
+
+    async def connect(self):
+        """Opens a client connection and returns (reader, writer)."""
+        streams = await asyncio.open_connection("127.0.0.1", self.port)
+        self.streams.append(streams)
+        return streams
+
+    async def request(self, streams, message):
+        """Sends a request line and returns the next line received."""
+        reader, writer = streams
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def test_1(self):
+        """Tests a move by one player is validated, answered and pushed to the other player."""
+        white, black = await self.connect(), await self.connect()
+        game_id = (await self.request(white, {"op": "new"}))["game"]
+        self.assertEqual(await self.request(white, {"op": "join", "game": game_id, "color": "white"}), {"ok": True})
+        self.assertEqual(await self.request(black, {"op": "join", "game": game_id, "color": "black"}), {"ok": True})
+        self.assertEqual(await self.request(black, {"op": "join", "game": game_id, "color": "white"}),
+                         {"ok": False, "error": "color taken"})
+
+        response = await self.request(white, {"op": "move", "game": game_id, "from": "d2", "to": "d4"})
+        self.assertEqual(response, {"ok": True, "state": "UNFINISHED", "turn": "black"})
+        self.assertEqual(json.loads(await black[0].readline()),
+                         {"event": "move", "game": game_id, "from": "d2", "to": "d4", "state": "UNFINISHED",
+                          "turn": "black"})
+
+        response = await self.request(white, {"op": "move", "game": game_id, "from": "e7", "to": "e5"})
+        self.assertEqual(response["error"], "not your turn")
+        response = await self.request(black, {"op": "move", "game": game_id, "from": "e7", "to": "e3"})
+        self.assertEqual(response["error"], "illegal move")
+        self.assertEqual((await self.request(black, {"op": "state", "game": game_id}))["turn"], "black")
+
+    async def test_2(self):
+        """Tests bad requests and unknown games are answered with an error."""
+        client = await self.connect()
+        reader, writer = client
+        writer.write(b"not json\n")
+        self.assertEqual(json.loads(await reader.readline()), {"ok": False, "error": "bad request"})
+        self.assertEqual(await self.request(client, {"op": "move", "game": "none"}),
+                         {"ok": False, "error": "no such game"})
+        await self.request(client, {"op": "new", "game": "g"})
+        self.assertEqual(await self.request(client, {"op": "new", "game": "g"}), {"ok": False, "error": "game exists"})
+
+    async def test_3(self):
+        """Tests idle games are evicted and their players told."""
+        client = await self.connect()
+        game_id = (await self.request(client, {"op": "new"}))["game"]
+        await self.request(client, {"op": "join", "game": game_id, "color": "white"})
+        now = time.monotonic()
+        self.assertEqual(self.server.evict_idle(), 0)
+        self.assertEqual(self.server.evict_idle(now + 61), 1)
+        self.assertEqual(json.loads(await client[0].readline()), {"event": "evicted", "game": game_id})
+        self.assertEqual(self.server.get_game_count(), 0)
+
+    async def test_4(self):
+        """Tests the load generator makes every move it is asked to."""
+        summary = await run_load(clients=4, moves=10, port=self.port)
+        self.assertEqual(summary["moves"], 40)
+        self.assertGreaterEqual(summary["requests"], 40 + 4 * 3)
+        self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+
+    async def test_5(self):
+        """Tests a spectator gets a snapshot and then the delta of every move."""
+        player, spectator = await self.connect(), await self.connect()
+        game_id = (await self.request(player, {"op": "new"}))["game"]
+        await self.request(player, {"op": "join", "game": game_id, "color": "white"})
+        self.assertEqual(await self.request(spectator, {"op": "watch", "game": game_id}), {"ok": True})
+        self.assertEqual(json.loads(await spectator[0].readline())["event"], "snapshot")
+        await self.request(player, {"op": "move", "game": game_id, "from": "d2", "to": "d4"})
+        self.assertEqual(json.loads(await spectator[0].readline()),
+                         {"event": "delta", "game": game_id, "seq": 1, "from": "d2", "to": "d4",
+                          "squares": {"d2": "", "d4": "M"}, "turn": "black"})
+
+    async def test_6(self):
+        """Tests new games are hosted on games recycled from evicted ones."""
+        client = await self.connect()
+        game_id = (await self.request(client, {"op": "new"}))["game"]
+        await self.request(client, {"op": "join", "game": game_id, "color": "white"})
+        await self.request(client, {"op": "move", "game": game_id, "from": "d2", "to": "d4"})
+        old_game = self.server._sessions[game_id].get_game()
+        self.assertEqual(self.server.evict_idle(time.monotonic() + 61), 1)
+        self.assertEqual(json.loads(await client[0].readline()), {"event": "evicted", "game": game_id})
+        new_id = (await self.request(client, {"op": "new"}))["game"]
+        self.assertIs(self.server._sessions[new_id].get_game(), old_game)
+        state = await self.request(client, {"op": "state", "game": new_id})
+        self.assertEqual(state["fen"], "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1")
+        self.assertEqual(self.server.get_pool().get_stats()["reused"], 1)
+
+    async def test_7(self):
+        """Tests a game is not evicted while a request is waiting for it, so the request never reaches a recycled
+        game."""
+        client = await self.connect()
+        game_id = (await self.request(client, {"op": "new"}))["game"]
+        await self.request(client, {"op": "join", "game": game_id, "color": "white"})
+        session = self.server._sessions[game_id]
+        reader, writer = client
+        async with session.get_lock():
+            writer.write(json.dumps({"op": "move", "game": game_id, "from": "d2", "to": "d4"}).encode() + b"\n")
+            await writer.drain()
+            while not session.get_pending():
+                await asyncio.sleep(0.01)
+            self.assertEqual(self.server.evict_idle(time.monotonic() + 61), 0)
+        self.assertEqual(json.loads(await reader.readline()), {"ok": True, "state": "UNFINISHED", "turn": "black"})
+        self.assertEqual(session.get_pending(), 0)
+        self.assertEqual(self.server.evict_idle(time.monotonic() + 61), 1)
+        self.assertEqual(json.loads(await reader.readline()), {"event": "evicted", "game": game_id})
+        new_id = (await self.request(client, {"op": "new"}))["game"]
+        state = await self.request(client, {"op": "state", "game": new_id})
+        self.assertEqual(state["fen"], "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1")
+
+    async def test_8(self):
+        """Tests a move is answered, and the game's lock let go, even if the other player's connection never takes
+        more."""
+        class StalledWriter:
+            def __init__(self):
+                self.lines = []
+
+            def is_closing(self):
+                return False
+
+            def write(self, line):
+                self.lines.append(line)
+
+            async def drain(self):
+                await asyncio.Event().wait()
+
+        white, black = _Connection(StalledWriter()), _Connection(StalledWriter())
+        game_id = self.server._new_game(None)["game"]
+        await self.server.handle_request({"op": "join", "game": game_id, "color": "white"}, white)
+        await self.server.handle_request({"op": "join", "game": game_id, "color": "black"}, black)
+        response = await asyncio.wait_for(
+            self.server.handle_request({"op": "move", "game": game_id, "from": "d2", "to": "d4"}, white), 1)
+        self.assertEqual(response, {"ok": True, "state": "UNFINISHED", "turn": "black"})
+        self.assertEqual(json.loads(black._writer.lines[0])["event"], "move")
+        self.assertFalse(self.server._sessions[game_id].get_lock().locked())
+
+    async def test_9(self):
+        """Tests fields of the wrong type and over-long lines get an error without dropping the connection."""
+        client = await self.connect()
+        reader, writer = client
+        game_id = (await self.request(client, {"op": "new"}))["game"]
+        await self.request(client, {"op": "join", "game": game_id, "color": "white"})
+        self.assertEqual(await self.request(client, {"op": "state", "game": [game_id]}),
+                         {"ok": False, "error": "no such game"})
+        self.assertEqual(await self.request(client, {"op": "move", "game": game_id, "from": ["d2"], "to": {"d": 4}}),
+                         {"ok": False, "error": "bad square"})
+        writer.write(b"x" * (1 << 17))
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(b"x" * (1 << 17) + b"\n")
+        self.assertEqual(json.loads(await reader.readline()), {"ok": False, "error": "request too long"})
+        self.assertEqual(await self.request(client, {"op": "move", "game": game_id, "from": "d2", "to": "d4"}),
+                         {"ok": True, "state": "UNFINISHED", "turn": "black"})
+        self.assertEqual((await run_load(clients=1, moves=0, port=self.port))["p99_ms"], 0.0)
@@ -0,0 +1,145 @@
+# Date: October 18, 2026
+# Description: Streams a ChessVar game to many spectators as small per-move deltas. A GameBroadcaster listens to the
+#              game's move_made and game_over events, turns each into one JSON line (built once, shared by every
+#              spectator) and queues it for each Spectator. New spectators start with a snapshot of the position, and
+#              every spectator is sent a new snapshot after a change that is not a move (board_changed: unmake_move,
+#              set_square, restore or reset), since no delta describes it. A
+#              spectator whose queue is full (a slow consumer) has its queue replaced by a snapshot of the current
+#              position, so a lagging spectator costs at most max_pending messages of memory.
+#              Messages:
+#                {"event": "snapshot", "game": id, "seq": n, "fen": ChessVar.to_fen(), "state": ...}
+#                {"event": "delta", "game": id, "seq": n, "from": "d2", "to": "d4", "squares": {"d2": "", "d4": "M"},
+#                 "turn": ...} plus, after a capture, "capture": {"square": ..., "piece": ...} and
+#                 "score": {"side": ..., "piece": ..., "count": ...} (the capturing side's new count of that piece)
+#                {"event": "end", "game": id, "seq": n, "state": "WHITE_WON" or "BLACK_WON"}
+#              seq is the number of moves and other board changes since the broadcaster started; squares use the
+#              to_fen letters.
+
+import json
+from collections import deque
+
+
+class Spectator:
+    """Represents one spectator of a game: a bounded queue of encoded messages (JSON lines, as bytes) waiting to be
+    sent to it."""
+
+    def __init__(self, max_pending, wake=None):
+        """Creates a Spectator whose queue holds up to max_pending messages. wake, if given, is called with no
+        arguments whenever a message is queued while the queue was empty."""
+        self._pending = deque()
+        self._max_pending = max_pending
+        self._wake = wake
+        self._resyncs = 0
+
+    def offer(self, message):
+        """Takes an encoded message and queues it. Returns False (and queues nothing) if the queue is full."""
+        if len(self._pending) >= self._max_pending:
+            return False
+        self._pending.append(message)
+        if len(self._pending) == 1 and self._wake is not None:
+            self._wake()
+        return True
+
+    def resync(self, snapshot):
+        """Takes an encoded snapshot and replaces everything queued with it."""
+        self._pending.clear()
+        self._resyncs += 1
+        self.offer(snapshot)
+
+    def get_messages(self):
+        """Returns the list of queued messages, oldest first, and empties the queue."""
+        messages = list(self._pending)
+        self._pending.clear()
+        return messages
+
+    def get_resyncs(self):
+        """Returns the number of times the queue was full and replaced by a snapshot."""
+        return self._resyncs
+
+
+def _encode(message):
+    """Takes a message dictionary and returns it as one JSON line in bytes."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class GameBroadcaster:
+    """Represents the spectators of one ChessVar game. Subscribes to the game's events until close is called."""
+
+    def __init__(self, today_game, game_id=None, max_pending=64):
+        """Creates a GameBroadcaster for a ChessVar game. game_id is put in every message; max_pending is the queue
+        size of each spectator."""
+        self._game = today_game
+        self._game_id = game_id
+        self._max_pending = max_pending
+        self._spectators = set()
+        self._seq = 0
+        self._snapshot = None                             # Encoded snapshot of the current position, once built
+        today_game.subscribe("move_made", self._on_move_made)
+        today_game.subscribe("game_over", self._on_game_over)
+        today_game.subscribe("board_changed", self._on_board_changed)
+
+    def close(self):
+        """Stops listening to the game and drops every spectator."""
+        self._game.unsubscribe("move_made", self._on_move_made)
+        self._game.unsubscribe("game_over", self._on_game_over)
+        self._game.unsubscribe("board_changed", self._on_board_changed)
+        self._spectators.clear()
+
+    def join(self, wake=None):
+        """Adds a spectator, with a snapshot of the position queued, and returns it (see Spectator for wake)."""
+        spectator = Spectator(self._max_pending, wake)
+        spectator.offer(self.get_snapshot())
+        self._spectators.add(spectator)
+        return spectator
+
+    def leave(self, spectator):
+        """Takes a spectator and stops sending it messages."""
+        self._spectators.discard(spectator)
+
+    def get_spectator_count(self):
+        """Returns the number of spectators."""
+        return len(self._spectators)
+
+    def get_snapshot(self):
+        """Returns the encoded snapshot of the current position. It is built at most once per change, however many
+        spectators need it."""
+        if self._snapshot is None:
+            self._snapshot = _encode({"event": "snapshot", "game": self._game_id, "seq": self._seq,
+                                      "fen": self._game.to_fen(), "state": self._game.get_game_state()})
+        return self._snapshot
+
+    def _publish(self, message):
+        """Takes a message dictionary, encodes it once and queues it for every spectator. A spectator with a full
+        queue is sent a snapshot instead."""
+        self._snapshot = None
+        encoded = _encode(message)
+        for spectator in self._spectators:
+            if not spectator.offer(encoded):
+                spectator.resync(self.get_snapshot())
+
+    def _on_move_made(self, event_name, details):
+        """Sends the delta of the move just made."""
+        self._seq += 1
+        message = {"event": "delta", "game": self._game_id, "seq": self._seq, "from": details["from"],
+                   "to": details["to"], "squares": dict(details["changes"]), "turn": self._game.get_current_turn()}
+        if details["captured"] is not None:
+            captured_sq, piece = details["captured"]
+            chess_piece = piece.split()[1]
+            mover = details["turn"]
+            score = self._game.get_white_score() if mover == "white" else self._game.get_black_score()
+            message["capture"] = {"square": captured_sq, "piece": piece}
+            message["score"] = {"side": mover, "piece": chess_piece, "count": score[chess_piece]}
+        self._publish(message)
+
+    def _on_board_changed(self, event_name, details):
+        """Sends a snapshot of the position after a change that was not a move."""
+        self._seq += 1
+        self._snapshot = None
+        snapshot = self.get_snapshot()
+        for spectator in self._spectators:
+            if not spectator.offer(snapshot):
+                spectator.resync(snapshot)
+
+    def _on_game_over(self, event_name, details):
+        """Sends the end of the game."""
+        self._publish({"event": "end", "game": self._game_id, "seq": self._seq, "state": details["state"]})
@@ -0,0 +1,92 @@
+import unittest
+import json
+from ChessVar import ChessVar, SQUARE_NAMES
+from ChessSpectator import GameBroadcaster
+
+
+def expand_board(fen):
+    """Takes a position written by ChessVar.to_fen and returns the to_fen letter of every square ('' if empty), in
+    square number order."""
+    letters = []
+    for char in fen.split()[0].replace("/", ""):
+        letters += [""] * int(char) if char.isdigit() else [char]
+    return letters
+
+
+def decode(messages):
+    """Takes encoded messages and returns them as dictionaries."""
+    return [json.loads(message) for message in messages]
+
+
+class TestChessSpectator(unittest.TestCase):
+
+    def test_1(self):
+        """Tests a new spectator gets a snapshot and then one delta per move, with captures and scores."""
+        today_game = ChessVar()
+        broadcaster = GameBroadcaster(today_game, "g")
+        today_game.make_move("d2", "d4")
+        spectator = broadcaster.join()
+        self.assertEqual(decode(spectator.get_messages()),
+                         [{"event": "snapshot", "game": "g", "seq": 1, "fen": today_game.to_fen(),
+                           "state": "UNFINISHED"}])
+        for original_sq, destination_sq in (("e7", "e5"), ("g1", "f3"), ("d8", "g5"), ("c1", "g5")):
+            today_game.make_move(original_sq, destination_sq)
+        messages = decode(spectator.get_messages())
+        self.assertEqual(messages[1], {"event": "delta", "game": "g", "seq": 3, "from": "g1", "to": "f3",
+                                       "squares": {"g1": "", "f3": "N"}, "turn": "black"})
+        self.assertEqual(messages[0]["squares"], {"e7": "", "e5": "m", "f2": ""})
+        self.assertEqual(messages[0]["capture"], {"square": "f2", "piece": "white pawn 1"})
+        self.assertEqual(messages[0]["score"], {"side": "black", "piece": "pawn", "count": 1})
+        self.assertEqual(messages[3]["score"], {"side": "white", "piece": "queen", "count": 1})
+        self.assertEqual(messages[4], {"event": "end", "game": "g", "seq": 5, "state": "WHITE_WON"})
+
+    def test_2(self):
+        """Tests applying the deltas to the snapshot gives the board of the game."""
+        today_game = ChessVar()
+        broadcaster = GameBroadcaster(today_game)
+        spectator = broadcaster.join()
+        for move in ("b1c3", "g8f6", "c3d5", "f6d5", "e2e4", "d5f4", "e4e5", "d7d6"):
+            today_game.make_move(move[:2], move[2:])
+        messages = decode(spectator.get_messages())
+        board = {}
+        for sq_location, letter in zip(SQUARE_NAMES, expand_board(messages[0]["fen"])):
+            board[sq_location] = letter
+        for message in messages[1:]:
+            board.update(message["squares"])
+        self.assertEqual([board[sq_location] for sq_location in SQUARE_NAMES], expand_board(today_game.to_fen()))
+
+    def test_3(self):
+        """Tests a slow spectator is resynced with a snapshot while others get every delta, and close stops events."""
+        today_game = ChessVar()
+        broadcaster = GameBroadcaster(today_game, max_pending=1)
+        slow, fast = broadcaster.join(), broadcaster.join()
+        fast.get_messages()
+        wakes = []
+        woken = broadcaster.join(lambda: wakes.append(1))
+        for original_sq, destination_sq in (("b1", "c3"), ("g8", "f6"), ("g1", "f3")):
+            today_game.make_move(original_sq, destination_sq)
+            self.assertEqual(len(fast.get_messages()), 1)
+        self.assertEqual(slow.get_resyncs(), 3)
+        self.assertEqual(decode(slow.get_messages()), [{"event": "snapshot", "game": None, "seq": 3,
+                                                        "fen": today_game.to_fen(), "state": "UNFINISHED"}])
+        self.assertEqual(len(wakes), 4)                   # At join and after each resync
+        broadcaster.close()
+        self.assertIsNone(today_game._listeners)
+
+    def test_4(self):
+        """Tests unmake_move and set_square send every spectator a new snapshot, so neither they nor a spectator
+        joining later are left with the board from before."""
+        today_game = ChessVar()
+        broadcaster = GameBroadcaster(today_game, "g")
+        spectator = broadcaster.join()
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5")):
+            today_game.make_move(original_sq, destination_sq)
+        broadcaster.join()
+        self.assertTrue(today_game.unmake_move())
+        messages = decode(spectator.get_messages())
+        self.assertEqual([message["event"] for message in messages], ["snapshot", "delta", "delta", "snapshot"])
+        self.assertEqual(messages[-1], {"event": "snapshot", "game": "g", "seq": 3, "fen": today_game.to_fen(),
+                                        "state": "UNFINISHED"})
+        self.assertEqual(decode(broadcaster.join().get_messages())[0]["fen"], today_game.to_fen())
+        today_game.set_square("a3", "white", "queen")
+        self.assertEqual(decode(spectator.get_messages())[0]["fen"], today_game.to_fen())
@@ -0,0 +1,359 @@
+# Date: October 18, 2026
+# Description: Endgame tablebases for the chess variant, built by retrograde analysis. A table covers one set of
+#              pieces on the board (named like "KRvKN": white's pieces, 'v', black's pieces, with P for a pawn that
+#              still has its first move and M for one that has moved) and which piece types are lethal: capturing all
+#              of a lethal type on the board wins the game (the capturing side's score then reaches the number
+#              get_game_state needs). By default every type on the board is lethal, which is the case when every
+#              piece missing from the board was captured by the other side. A type that is not (because a pawn
+#              removed a piece by moving onto it, which does not score) is listed after '_', i.e. "KMMvK_wM" (white's
+#              pawns are not lethal). A move that captures or changes the set of pieces leads to another table, which
+#              is built first.
+#              A table is one byte per index, index = (turn * 64 + square of piece n-1) * 64 ... + square of piece 0:
+#              0 = draw, odd v = the side to move wins in v plies, even v = it loses in v plies, 255 = not a position
+#              (two pieces on one square). Tables are saved as NAME.cvtb files and read through mmap, so a probe is
+#              one lookup.
+
+import argparse
+import itertools
+from array import array
+import mmap
+import os
+import struct
+from ChessVar import ChessVar, PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING, PIECE_MASK, BLACK, FIRST_MOVE, EMPTY
+from ChessVar import PIECE_NAMES
+from ChessEngine import PIECES_TO_WIN
+
+DRAW = 0
+NOT_A_POSITION = 255
+_MAX_PLIES = 254
+
+_LETTERS = "KQRBNPM"                                     # Order of the pieces in a table name and index
+_LETTER_CODES = {"K": KING, "Q": QUEEN, "R": ROOK, "B": BISHOP, "N": KNIGHT, "P": PAWN | FIRST_MOVE, "M": PAWN}
+_CODE_LETTERS = {code: letter for letter, code in _LETTER_CODES.items()}
+_TYPE_LETTERS = {KING: "K", QUEEN: "Q", ROOK: "R", BISHOP: "B", KNIGHT: "N", PAWN: "M"}
+_NEEDED = {chess_piece: PIECES_TO_WIN[PIECE_NAMES[chess_piece]] for chess_piece in range(PAWN, KING + 1)}
+_HEADER = struct.Struct("<4sBB10x")                      # Magic, version, number of pieces
+_MAGIC = b"CVTB"
+_VERSION = 1
+_FILE_SUFFIX = ".cvtb"
+
+
+def _sort_key(code):
+    """Returns the place of a square code in the piece order of table names (white first, then _LETTERS order)."""
+    return code & BLACK, _LETTERS.index(_CODE_LETTERS[code & ~BLACK])
+
+
+def table_name(codes, not_lethal=()):
+    """Takes the square codes of the pieces on the board and the (color number, piece type) pairs that are not lethal
+    and returns the name of their table."""
+    letters = ["", ""]
+    for code in sorted(codes, key=_sort_key):
+        letters[code >> 3 & 1] += _CODE_LETTERS[code & ~BLACK]
+    name = f"{letters[0]}v{letters[1]}"
+    if not_lethal:
+        name += "_" + "".join(f"{'wb'[color_num]}{_TYPE_LETTERS[chess_piece]}"
+                              for color_num, chess_piece in sorted(not_lethal))
+    return name
+
+
+def parse_name(name):
+    """Takes a table name and returns (square codes of its pieces in index order, frozenset of the (color number,
+    piece type) pairs that are not lethal). Raises ValueError if the name is not valid."""
+    pieces, underscore, suffix = name.partition("_")
+    sides = pieces.split("v")
+    if len(sides) != 2 or any(letter not in _LETTER_CODES for letter in sides[0] + sides[1]):
+        raise ValueError(f"not a table name: {name!r}")
+    codes = [_LETTER_CODES[letter] for letter in sides[0]] + [_LETTER_CODES[letter] | BLACK for letter in sides[1]]
+    codes.sort(key=_sort_key)
+    not_lethal = set()
+    for num in range(0, len(suffix), 2):
+        token = suffix[num:num + 2]
+        if len(token) != 2 or token[0] not in "wb" or token[1] not in _TYPE_LETTERS.values():
+            raise ValueError(f"not a table name: {name!r}")
+        chess_piece = _LETTER_CODES[token[1]] & PIECE_MASK
+        color_num = "wb".index(token[0])
+        on_board = sum(1 for code in codes if code & PIECE_MASK == chess_piece and code >> 3 & 1 == color_num)
+        if not 0 < on_board < _NEEDED[chess_piece]:
+            raise ValueError(f"{token} in {name!r} cannot be not lethal")
+        not_lethal.add((color_num, chess_piece))
+    if table_name(codes, not_lethal) != name:
+        raise ValueError(f"not a table name in order: {name!r} (should be {table_name(codes, not_lethal)!r})")
+    return codes, frozenset(not_lethal)
+
+
+def _scores(codes, not_lethal):
+    """Takes the pieces and not lethal types of a table and returns (white counts, black counts) for ChessVar._load
+    (in PIECE_NAMES order) that make exactly the lethal types win when captured."""
+    counts = ([0] * 6, [0] * 6)
+    for color_num in (0, 1):
+        for chess_piece in range(PAWN, KING + 1):
+            on_board = sum(1 for code in codes if code & PIECE_MASK == chess_piece and code >> 3 & 1 == color_num)
+            if on_board:
+                still_needed = on_board + ((color_num, chess_piece) in not_lethal)
+                counts[1 - color_num][chess_piece - 1] = _NEEDED[chess_piece] - still_needed
+    return counts
+
+
+def _position_key(today_game):
+    """Takes a ChessVar game and returns (table name, index) of its position, or None if its scores cannot come from a
+    table (more of a type left to capture than the score allows)."""
+    pieces = [(code, sq_num) for sq_num, code in enumerate(today_game._squares) if code != EMPTY]
+    scores = (today_game.get_white_score(), today_game.get_black_score())
+    not_lethal = set()
+    for color_num in (0, 1):
+        for chess_piece in range(PAWN, KING + 1):
+            on_board = sum(1 for code, sq_num in pieces
+                           if code & PIECE_MASK == chess_piece and code >> 3 & 1 == color_num)
+            if on_board:
+                still_needed = _NEEDED[chess_piece] - scores[1 - color_num][PIECE_NAMES[chess_piece]]
+                if still_needed < on_board:
+                    return None
+                if still_needed > on_board:
+                    not_lethal.add((color_num, chess_piece))
+    pieces.sort(key=lambda piece: _sort_key(piece[0]))
+    index = int(today_game.get_current_turn() == "black")
+    for code, sq_num in reversed(pieces):
+        index = index * 64 + sq_num
+    return table_name([code for code, sq_num in pieces], not_lethal), index
+
+
+class Tablebase:
+    """Represents the tables saved in a directory. Tables are mapped into memory the first time they are probed;
+    generate builds missing ones."""
+
+    def __init__(self, directory):
+        """Creates a Tablebase reading and writing tables in directory."""
+        self._directory = directory
+        self._tables = {}                                # Table name -> (mmap, file)
+        self._max_pieces = 0                             # Most pieces in a saved table
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if file_name.endswith(_FILE_SUFFIX):
+                    pieces = file_name[:-len(_FILE_SUFFIX)].partition("_")[0]
+                    self._max_pieces = max(self._max_pieces, len(pieces) - 1)
+
+    def close(self):
+        """Closes the mapped tables."""
+        for data, table_file in self._tables.values():
+            data.close()
+            table_file.close()
+        self._tables.clear()
+
+    def __enter__(self):
+        """Returns the tablebase."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the mapped tables."""
+        self.close()
+
+    def _path(self, name):
+        """Returns the file path of a table."""
+        return os.path.join(self._directory, name + _FILE_SUFFIX)
+
+    def _table(self, name):
+        """Takes a table name and returns its memory-mapped file (header included), or None if it is not saved."""
+        if name not in self._tables:
+            path = self._path(name)
+            if not os.path.exists(path):
+                return None
+            table_file = open(path, "rb")
+            data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, piece_count = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != _VERSION or len(data) != _HEADER.size + 2 * 64 ** piece_count:
+                data.close()
+                table_file.close()
+                raise ValueError(f"{path} is not a ChessVar table")
+            self._tables[name] = (data, table_file)
+        return self._tables[name][0]
+
+    def has_table(self, name):
+        """Takes a table name and returns True if the table is saved."""
+        return self._table(name) is not None
+
+    def probe(self, today_game):
+        """Takes a ChessVar game and returns its value for the current player from the tables: n > 0 if it wins in n
+        plies, -n if it loses in n plies, 0 for a draw. Returns None if the game is over or there is no table for the
+        position. Positions with more pieces than any saved table are turned down without looking at the board."""
+        if 64 - today_game._squares.count(EMPTY) > self._max_pieces or today_game.get_game_state() != "UNFINISHED":
+            return None
+        key = _position_key(today_game)
+        if key is None:
+            return None
+        table = self._table(key[0])
+        if table is None:
+            return None
+        value = table[_HEADER.size + key[1]]
+        if value == DRAW:
+            return 0
+        return value if value & 1 else -value
+
+    def best_move(self, today_game):
+        """Takes a ChessVar game and returns the best move (encoded as in generate_legal_moves) according to the tables:
+        the fastest win, otherwise a draw, otherwise the slowest loss. Returns None if there are no moves or a position
+        after a move has no table. The game is left as it was."""
+        best_move, best_rank = None, None
+        for move in today_game.generate_legal_moves():
+            today_game.make_encoded_move(move)
+            try:
+                if today_game.get_game_state() != "UNFINISHED":
+                    value = -1                           # As if the opponent lost at once, better than any other win
+                else:
+                    value = self.probe(today_game)
+                    if value is None:
+                        return None
+            finally:
+                today_game.unmake_move()
+            # The opponent's value after the move: a loss for it (< 0) is a win for us
+            if value < 0:
+                rank = (2, value)                        # Win in -value + 1 plies, sooner is better
+            elif value == 0:
+                rank = (1, 0)
+            else:
+                rank = (0, value)                        # Loss in value + 1 plies, later is better
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = move, rank
+        return best_move
+
+    def generate(self, name):
+        """Takes a table name, builds the table (and every table its moves lead to) unless it is saved already and
+        saves it. Returns a dictionary with the number of positions that are "wins", "losses" and "draws" for the
+        side to move, or None if the table was already saved."""
+        parse_name(name)
+        if self.has_table(name):
+            return None
+        values = self._build(name)
+        os.makedirs(self._directory, exist_ok=True)
+        temp_path = self._path(name) + ".tmp"
+        with open(temp_path, "wb") as table_file:
+            table_file.write(_HEADER.pack(_MAGIC, _VERSION, len(parse_name(name)[0])))
+            table_file.write(values)
+        os.replace(temp_path, self._path(name))
+        self._max_pieces = max(self._max_pieces, len(parse_name(name)[0]))
+        wins = sum(1 for value in values if value & 1 and value != NOT_A_POSITION)
+        draws = values.count(DRAW)
+        return {"wins": wins, "losses": len(values) - values.count(NOT_A_POSITION) - wins - draws, "draws": draws}
+
+    def _external_value(self, name, index):
+        """Takes the name and index of a position in another table, builds that table if needed and returns the raw
+        value."""
+        if not self.has_table(name):
+            self.generate(name)
+        return self._table(name)[_HEADER.size + index]
+
+    def _build(self, name):
+        """Takes a table name and returns its values (bytearray), by retrograde analysis: positions are solved one ply
+        count at a time, starting from the moves that win at once and the positions of other tables."""
+        codes, not_lethal = parse_name(name)
+        piece_count = len(codes)
+        half = 64 ** piece_count
+        values = bytearray(2 * half)
+        remaining = [0] * (2 * half)                     # Moves not yet known to lose, per position
+        edges = (array("q"), array("q"))                 # Position and position after a move, for moves in the table
+        levels = [[] for _ in range(_MAX_PLIES + 1)]     # Positions solved with that many plies
+        outside = [[] for _ in range(_MAX_PLIES + 1)]    # (position, value) of moves into other tables, by value
+
+        white_counts, black_counts = _scores(codes, not_lethal)
+        today_game = ChessVar()
+        today_game._load(bytes(64), "white", 1, white_counts, black_counts)
+        for turn in (0, 1):
+            if turn:
+                today_game.turn_changer()
+            for squares in itertools.product(range(64), repeat=piece_count):
+                index = turn
+                for sq_num in reversed(squares):
+                    index = index * 64 + sq_num
+                if len(set(squares)) < piece_count:
+                    values[index] = NOT_A_POSITION
+                    continue
+                for code, sq_num in zip(codes, squares):
+                    today_game._put(sq_num, code)
+                piece_nums = {sq_num: num for num, sq_num in enumerate(squares)}
+                self._add_moves(today_game, codes, squares, piece_nums, index, half, values, remaining, edges,
+                                levels, outside)
+                for sq_num in squares:
+                    today_game._put(sq_num, EMPTY)
+
+        # Predecessors of every position, grouped by position after the move (counting sort of the edges)
+        starts = array("q", bytes(8 * (2 * half + 1)))
+        for after in edges[1]:
+            starts[after + 1] += 1
+        for position in range(2 * half):
+            starts[position + 1] += starts[position]
+        predecessors = array("q", bytes(8 * len(edges[0])))
+        filled = array("q", starts)
+        for position, after in zip(*edges):
+            predecessors[filled[after]] = position
+            filled[after] += 1
+        del edges, filled
+
+        for plies in range(_MAX_PLIES):
+            # Positions solved in plies plies decide the positions moving into them
+            for position, value in outside[plies]:
+                self._solve_predecessor(position, value, plies, values, remaining, levels)
+            for after in levels[plies]:
+                for position in predecessors[starts[after]:starts[after + 1]]:
+                    self._solve_predecessor(position, values[after], plies, values, remaining, levels)
+        return values
+
+    def _add_moves(self, today_game, codes, squares, piece_nums, index, half, values, remaining, edges, levels,
+                   outside):
+        """Takes the game set to one position of a table and records its moves: a move winning at once solves the
+        position (win in 1 ply), a move staying in the table becomes an edge, and a move into another table is
+        recorded with that position's value."""
+        moves = today_game.generate_legal_moves()
+        remaining[index] = len(moves)
+        opponent_index_base = half - index // half * 2 * half    # Adds half for white to move, -half for black
+        for move in moves:
+            orig_num, dest_num = move >> 6, move & 63
+            piece_num = piece_nums[orig_num]
+            today_game.make_encoded_move(move)
+            try:
+                if today_game.get_game_state() != "UNFINISHED":
+                    values[index] = 1
+                    levels[1].append(index)
+                    return
+                undo = today_game._undo_stack[-1]
+                if undo[4] == -1 and undo[3] == EMPTY and today_game._squares[dest_num] == codes[piece_num]:
+                    edges[0].append(index)
+                    edges[1].append(index + opponent_index_base + (dest_num - orig_num) * 64 ** piece_num)
+                    continue
+                other_name, other_index = _position_key(today_game)
+                value = self._external_value(other_name, other_index)
+            finally:
+                today_game.unmake_move()
+            if value != DRAW:
+                outside[value].append((index, value))
+
+    def _solve_predecessor(self, position, value_after, plies, values, remaining, levels):
+        """Takes an unsolved position, the value of the position after one of its moves (solved in plies plies) and
+        solves the position if that decides it: a move to a lost position wins in plies + 1, and the last move to a
+        won position loses in plies + 1."""
+        if values[position] != DRAW:
+            return
+        if value_after & 1 == 0:
+            values[position] = plies + 1
+            levels[plies + 1].append(position)
+            return
+        remaining[position] -= 1
+        if remaining[position] == 0:
+            values[position] = plies + 1
+            levels[plies + 1].append(position)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build ChessVar endgame tables by retrograde analysis")
+    parser.add_argument("directory", help="directory of the tables")
+    parser.add_argument("names", nargs="+", help="tables to build, i.e. KvK KRvK KMvK_wM")
+    args = parser.parse_args()
+    with Tablebase(args.directory) as tablebase:
+        for name in args.names:
+            counts = tablebase.generate(name)
+            if counts is None:
+                print(f"{name}: already built")
+            else:
+                print(f"{name}: {counts['wins']} wins, {counts['losses']} losses, {counts['draws']} draws")
+
+
+if __name__ == '__main__':
+    main()
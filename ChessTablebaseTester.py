@@ -0,0 +1,95 @@
+import unittest
+import os
+import tempfile
+from ChessVar import ChessVar, KING, PAWN, BLACK, FIRST_MOVE, encode_move
+from ChessEngine import ChessEngine, WIN_SCORE
+from ChessTablebase import Tablebase, table_name, parse_name
+
+
+def set_up_position(tablebase_scores, pieces, current_turn="white"):
+    """Takes the score counts of a table, (square number, code) pieces and the turn and returns a game in that
+    position."""
+    today_game = ChessVar()
+    today_game._load(bytes(64), current_turn, 1, *tablebase_scores)
+    for sq_num, code in pieces:
+        today_game._put(sq_num, code)
+    return today_game
+
+
+class TestChessTablebase(unittest.TestCase):
+
+    def setUp(self):
+        """Creates a directory for the tables."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.tablebase = Tablebase(self.directory.name)
+
+    def tearDown(self):
+        """Closes and removes the tables."""
+        self.tablebase.close()
+        self.directory.cleanup()
+
+    def check_table(self, name, white_counts, black_counts, codes):
+        """Checks every position of a two piece table has the value its moves give it."""
+        for turn in ("white", "black"):
+            for first_sq in range(64):
+                for second_sq in range(64):
+                    if first_sq == second_sq:
+                        continue
+                    today_game = set_up_position((white_counts, black_counts),
+                                                 ((first_sq, codes[0]), (second_sq, codes[1])), turn)
+                    after = []
+                    for move in today_game.generate_legal_moves():
+                        today_game.make_encoded_move(move)
+                        if today_game.get_game_state() != "UNFINISHED":
+                            after.append(None)
+                        else:
+                            after.append(self.tablebase.probe(today_game))
+                        today_game.unmake_move()
+                    if None in after:
+                        expected = 1
+                    elif any(value < 0 for value in after):
+                        expected = min(-value for value in after if value < 0) + 1
+                    elif after and all(value > 0 for value in after):
+                        expected = -(max(after) + 1)
+                    else:
+                        expected = 0
+                    self.assertEqual(self.tablebase.probe(today_game), expected, (name, turn, first_sq, second_sq))
+
+    def test_1(self):
+        """Tests the king against king table: the side to move wins at once if the kings touch, otherwise draws."""
+        self.assertEqual(self.tablebase.generate("KvK"), {"wins": 840, "losses": 0, "draws": 7224})
+        self.assertIsNone(self.tablebase.generate("KvK"))
+        today_game = set_up_position(([0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0]), ((0, KING | BLACK), (9, KING)))
+        self.assertEqual(self.tablebase.probe(today_game), 1)
+        self.assertEqual(self.tablebase.best_move(today_game), encode_move("b7", "a8"))
+        self.check_table("KvK", [0] * 6, [0] * 6, (KING, KING | BLACK))
+
+    def test_2(self):
+        """Tests a table built with the table its pawn's first move leads to."""
+        self.tablebase.generate("PvK")
+        self.assertTrue(self.tablebase.has_table("MvK"))
+        # White's only pawn is lethal: black has collected the other 7
+        self.check_table("PvK", [0] * 6, [7, 0, 0, 0, 0, 0], (PAWN | FIRST_MOVE, KING | BLACK))
+        self.check_table("MvK", [0] * 6, [7, 0, 0, 0, 0, 0], (PAWN, KING | BLACK))
+
+    def test_3(self):
+        """Tests table names and that positions without a table are not probed."""
+        self.assertEqual(table_name([KING | BLACK, PAWN, KING]), "KMvK")
+        self.assertEqual(parse_name("KMvK_wM"), ([KING, PAWN, KING | BLACK], frozenset({(0, PAWN)})))
+        self.assertRaises(ValueError, parse_name, "KvK_wK")
+        self.assertRaises(ValueError, parse_name, "MKvK")
+        self.assertIsNone(self.tablebase.probe(ChessVar()))
+        self.assertFalse(os.listdir(self.directory.name))
+
+    def test_4(self):
+        """Tests the engine scores positions from the tables and plays the fastest win."""
+        self.tablebase.generate("PvK")
+        scores = ([0] * 6, [7, 0, 0, 0, 0, 0])
+        for sq_num in range(64):
+            today_game = set_up_position(scores, ((52, PAWN | FIRST_MOVE), (sq_num, KING | BLACK)), "black")
+            plies_to_end = self.tablebase.probe(today_game)
+            if plies_to_end is not None and plies_to_end > 1:
+                break
+        move, score, depth = ChessEngine(max_depth=1, tablebase=self.tablebase).search(today_game)
+        self.assertEqual(score, WIN_SCORE - plies_to_end)
+        self.assertEqual(move, self.tablebase.best_move(today_game))
@@ -0,0 +1,238 @@
+# Date: October 18, 2026
+# Description: Batched NumPy encodings of ChessVar positions for training and bulk statistics. Positions are taken as
+#              an (N, 64) array of square codes (ChessVar's compact board, see EMPTY ... FIRST_MOVE) and turned into
+#              (N, PLANE_COUNT, 8, 8) planes, attack maps and mobility maps for the whole batch at once. Row 0 of every
+#              8x8 plane is row 8 of the board and column 0 is column a, as in ChessVar's square numbers. The attack
+#              and mobility maps work on one 64-bit bitboard per position (bit n = square number n) with shifts and
+#              masks, and follow the same move rules as ChessVar.generate_legal_moves. Needs NumPy.
+
+import numpy as np
+from ChessVar import PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING, PIECE_MASK, BLACK, FIRST_MOVE, POSITION_SIZE
+
+# Planes 0-5: white pawn, rook, knight, bishop, queen, king; 6-11: the same for black; 12: pawns that still have their
+# first move; 13: all ones if black is to move
+PLANE_COUNT = 14
+FIRST_MOVE_PLANE = 12
+TURN_PLANE = 13
+
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_FILE_A = np.uint64(0x0101010101010101)                  # Column a (column 0) of every row
+_FILE_H = np.uint64(0x8080808080808080)
+_NOT_A = ~_FILE_A
+_NOT_H = ~_FILE_H
+_NOT_AB = np.uint64(0xFCFCFCFCFCFCFCFC)
+_NOT_GH = np.uint64(0x3F3F3F3F3F3F3F3F)
+
+# (square number change, mask of destinations that did not wrap around a row) for each one-square step
+_STEPS = {(-1, 0): (-8, _ALL), (1, 0): (8, _ALL), (0, -1): (-1, _NOT_H), (0, 1): (1, _NOT_A),
+          (-1, -1): (-9, _NOT_H), (-1, 1): (-7, _NOT_A), (1, -1): (7, _NOT_H), (1, 1): (9, _NOT_A)}
+_KNIGHT_STEPS = ((-17, _NOT_H), (-15, _NOT_A), (-10, _NOT_GH), (-6, _NOT_AB),
+                 (6, _NOT_GH), (10, _NOT_AB), (15, _NOT_H), (17, _NOT_A))
+_ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_BISHOP_DIRECTIONS = ((-1, 1), (1, 1), (1, -1))           # Towards row 8 and column a is handled apart
+
+
+def _shift(bitboards, change, mask):
+    """Takes an array of bitboards, a square number change and a mask, and returns the bitboards with every square
+    moved by the change, keeping only the squares in the mask."""
+    if change > 0:
+        return (bitboards << np.uint64(change)) & mask
+    return (bitboards >> np.uint64(-change)) & mask
+
+
+def _rotate_columns(bitboards, change):
+    """Takes an array of bitboards and returns them with every square moved one column right (change 1) or left
+    (change -1) within its row, column h going to a and a to h."""
+    if change > 0:
+        return ((bitboards << np.uint64(1)) & _NOT_A) | ((bitboards >> np.uint64(7)) & _FILE_A)
+    return ((bitboards >> np.uint64(1)) & _NOT_H) | ((bitboards & _FILE_A) << np.uint64(7))
+
+
+def _rotate_rows(bitboards):
+    """Takes an array of bitboards and returns them with every square moved one row down (towards row 1), row 1
+    going to row 8."""
+    return (bitboards << np.uint64(8)) | (bitboards >> np.uint64(56))
+
+
+def _flip_rows(bitboards):
+    """Takes an array of bitboards and returns them with the rows in reverse order (row 8 <-> row 1)."""
+    return bitboards.astype("<u8").byteswap().astype(np.uint64)
+
+
+def _to_bitboards(mask):
+    """Takes an (N, 64) boolean array and returns the (N,) array of bitboards with bit n set where column n is True."""
+    packed = np.packbits(mask, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").ravel().astype(np.uint64)
+
+
+def _to_squares(bitboards):
+    """Takes an (N,) array of bitboards and returns the (N, 64) uint8 array of their bits."""
+    data = np.ascontiguousarray(bitboards.astype("<u8")).view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(data, axis=1, bitorder="little")
+
+
+def squares_from_games(games):
+    """Takes a sequence of ChessVar games and returns their boards as an (N, 64) uint8 array of square codes and the
+    (N,) boolean array of which have black to move."""
+    codes = np.frombuffer(b"".join([bytes(game._squares) for game in games]), dtype=np.uint8).reshape(-1, 64)
+    black_to_move = np.array([game.get_current_turn() == "black" for game in games], dtype=bool)
+    return codes, black_to_move
+
+
+def squares_from_positions(data):
+    """Takes positions written by ChessVar.to_bytes, either as concatenated bytes or as an (N, POSITION_SIZE) uint8
+    array, and returns their (N, 64) uint8 array of square codes and (N,) boolean array of which have black to
+    move. Raises ValueError if the data is not a whole number of positions."""
+    positions = np.frombuffer(data, dtype=np.uint8) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    if positions.size % POSITION_SIZE:
+        raise ValueError(f"position data must be a multiple of {POSITION_SIZE} bytes")
+    positions = positions.reshape(-1, POSITION_SIZE)
+    return positions[:, :64], positions[:, 64] != 0
+
+
+def encode_planes(codes, black_to_move, dtype=np.uint8):
+    """Takes an (N, 64) array of square codes and an (N,) boolean array of which have black to move, and returns the
+    (N, PLANE_COUNT, 8, 8) array of 0/1 planes (see PLANE_COUNT) in the given dtype."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    planes = np.zeros((len(codes), PLANE_COUNT, 64), dtype=dtype)
+    pieces = codes & PIECE_MASK
+    is_black = (codes & BLACK) != 0
+    for chess_piece in range(PAWN, KING + 1):
+        of_type = pieces == chess_piece
+        planes[:, chess_piece - 1] = of_type & ~is_black
+        planes[:, chess_piece + 5] = of_type & is_black
+    planes[:, FIRST_MOVE_PLANE] = (codes & FIRST_MOVE) != 0
+    planes[:, TURN_PLANE] = np.asarray(black_to_move, dtype=bool)[:, None]
+    return planes.reshape(-1, PLANE_COUNT, 8, 8)
+
+
+def encode_games(games, dtype=np.uint8):
+    """Takes a sequence of ChessVar games and returns their (N, PLANE_COUNT, 8, 8) planes (see encode_planes)."""
+    return encode_planes(*squares_from_games(games), dtype=dtype)
+
+
+class _Board:
+    """Represents the bitboards of a batch of positions seen from one side: its pieces by type, the opponent's
+    pieces and the empty squares."""
+
+    def __init__(self, codes, black):
+        """Takes an (N, 64) array of square codes and whether the side is black."""
+        pieces = codes & PIECE_MASK
+        own = ((codes & BLACK) != 0) == black
+        occupied = codes != 0
+        self.own = _to_bitboards(occupied & own)
+        self.enemy = _to_bitboards(occupied & ~own)
+        self.empty = ~(self.own | self.enemy)
+        self.black = black
+        self.pawns = _to_bitboards(own & (pieces == PAWN))
+        self.first_move_pawns = _to_bitboards(own & (pieces == PAWN) & ((codes & FIRST_MOVE) != 0))
+        self.knights = _to_bitboards(own & (pieces == KNIGHT))
+        self.kings = _to_bitboards(own & (pieces == KING))
+        queens = own & (pieces == QUEEN)
+        self.straight = _to_bitboards(own & (pieces == ROOK) | queens)
+        self.diagonal = _to_bitboards(own & (pieces == BISHOP) | queens)
+
+
+def _destination_groups(board):
+    """Takes a _Board and yields, for each way of moving, the bitboards of the squares the side's pieces can move to
+    that way. No two pieces reach the same square the same way, so counting the bits of every group counts moves."""
+    not_own = ~board.own
+    for change, mask in (_STEPS[(-1, 0)], _STEPS[(1, 0)]):
+        step = _shift(board.pawns, change, mask)
+        yield step & not_own
+        # Two squares on the first move, if the square in between is empty
+        yield _shift(_shift(board.first_move_pawns, change, mask) & board.empty, change, mask) & not_own
+    for change, mask in _KNIGHT_STEPS:
+        yield _shift(board.knights, change, mask) & not_own
+    for change, mask in _STEPS.values():
+        yield _shift(board.kings, change, mask) & not_own
+    for sliders, directions in ((board.straight, _ROOK_DIRECTIONS), (board.diagonal, _BISHOP_DIRECTIONS)):
+        for direction in directions:
+            change, mask = _STEPS[direction]
+            reached = np.zeros_like(sliders)
+            frontier = sliders
+            while True:
+                frontier = _shift(frontier, change, mask)
+                if not frontier.any():
+                    break
+                reached |= frontier
+                frontier &= board.empty                  # Sliding stops at the first occupied square
+            yield reached & not_own
+    # Towards row 8 and column a, a bishop or queen only moves to an empty square whose next square on the diagonal
+    # (wrapping around the board) is empty too
+    change, mask = _STEPS[(-1, -1)]
+    next_empty = _rotate_rows(_rotate_columns(board.empty, 1))
+    reached = np.zeros_like(board.diagonal)
+    frontier = board.diagonal
+    while True:
+        frontier = _shift(frontier, change, mask) & board.empty
+        if not frontier.any():
+            break
+        reached |= frontier
+    yield reached & next_empty
+
+
+def _pawn_destinations(board):
+    """Takes a _Board and returns the bitboards of the squares the side's pawns can move to."""
+    destinations = np.zeros_like(board.pawns)
+    for change, mask in (_STEPS[(-1, 0)], _STEPS[(1, 0)]):
+        destinations |= _shift(board.pawns, change, mask)
+        destinations |= _shift(_shift(board.first_move_pawns, change, mask) & board.empty, change, mask)
+    return destinations & ~board.own
+
+
+def _vertical_capture_targets(board):
+    """Takes a _Board and returns the bitboards of the squares its pawns could vertically capture on (see
+    PawnMove.check_vertical_capture): for a pawn moving to row r, the row ChessVar's board lists as number r - 1
+    (white) or r + 1 (black, none past the last row), in the columns on either side of the destination (column a's
+    left side wrapping to column h). The right side only counts if there is no opponent piece on the left side."""
+    destinations = _pawn_destinations(board)
+    rows = _flip_rows(destinations)                      # White: row r -> list number r - 1, i.e. the flipped row
+    if board.black:
+        rows = rows << np.uint64(16)                     # Black: list number r + 1
+    left = _rotate_columns(rows, -1)
+    right_allowed = rows & ~_rotate_columns(board.enemy, 1)
+    return left | ((right_allowed << np.uint64(1)) & _NOT_A)
+
+
+def mobility_maps(codes):
+    """Takes an (N, 64) array of square codes and returns the (N, 2, 8, 8) uint8 array where [n, c, row, col] is the
+    number of pieces of color c (0 white, 1 black) that could move to that square if it were c's turn. The map of the
+    side to move adds up to the number of moves generate_legal_moves gives while the game is unfinished."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    maps = np.zeros((len(codes), 2, 64), dtype=np.uint8)
+    for color_num in (0, 1):
+        for destinations in _destination_groups(_Board(codes, color_num == 1)):
+            maps[:, color_num] += _to_squares(destinations)
+    return maps.reshape(-1, 2, 8, 8)
+
+
+def attack_maps(codes):
+    """Takes an (N, 64) array of square codes and returns the (N, 2, 8, 8) boolean array where [n, c, row, col] is
+    True if color c (0 white, 1 black) could capture an opponent piece standing on that square with its next move:
+    by moving onto it (every piece except a bishop or queen moving towards row 8 and column a, which needs an empty
+    square) or by a pawn's vertical capture."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    maps = np.zeros((len(codes), 2, 64), dtype=bool)
+    for color_num in (0, 1):
+        board = _Board(codes, color_num == 1)
+        attacked = _vertical_capture_targets(board)
+        for change, mask in (_STEPS[(-1, 0)], _STEPS[(1, 0)]):
+            attacked |= _shift(board.pawns, change, mask)
+            attacked |= _shift(_shift(board.first_move_pawns, change, mask) & board.empty, change, mask)
+        for change, mask in _KNIGHT_STEPS:
+            attacked |= _shift(board.knights, change, mask)
+        for change, mask in _STEPS.values():
+            attacked |= _shift(board.kings, change, mask)
+        for sliders, directions in ((board.straight, _ROOK_DIRECTIONS), (board.diagonal, _BISHOP_DIRECTIONS)):
+            for direction in directions:
+                change, mask = _STEPS[direction]
+                frontier = sliders
+                while True:
+                    frontier = _shift(frontier, change, mask)
+                    if not frontier.any():
+                        break
+                    attacked |= frontier
+                    frontier &= board.empty
+        maps[:, color_num] = _to_squares(attacked) != 0
+    return maps.reshape(-1, 2, 8, 8)
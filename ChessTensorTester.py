@@ -0,0 +1,73 @@
+import unittest
+import random
+from ChessVar import ChessVar, BLACK
+try:
+    import numpy
+    from ChessTensor import (PLANE_COUNT, TURN_PLANE, FIRST_MOVE_PLANE, squares_from_games, squares_from_positions,
+                             encode_games, attack_maps, mobility_maps)
+except ImportError:
+    numpy = None
+
+
+def random_games(count, seed):
+    """Returns count games, each after a random number of random moves."""
+    rnd = random.Random(seed)
+    games = []
+    for _ in range(count):
+        today_game = ChessVar()
+        for _ in range(rnd.randint(0, 40)):
+            moves = today_game.generate_legal_moves()
+            if not moves:
+                break
+            today_game.make_encoded_move(rnd.choice(moves))
+        games.append(today_game)
+    return games
+
+
+@unittest.skipIf(numpy is None, "needs NumPy")
+class TestChessTensor(unittest.TestCase):
+
+    def test_1(self):
+        """Tests the planes of the starting position and of a position read from to_bytes."""
+        today_game = ChessVar()
+        today_game.make_move("d2", "d4")
+        planes = encode_games([ChessVar(), today_game])
+        self.assertEqual(planes.shape, (2, PLANE_COUNT, 8, 8))
+        self.assertEqual(planes[0, 0, 6].tolist(), [1] * 8)                  # White pawns on row 2
+        self.assertEqual(planes[0, 10, 0, 3], 1)                              # Black queen on d8
+        self.assertEqual(int(planes[0, FIRST_MOVE_PLANE].sum()), 16)
+        self.assertEqual(int(planes[1, FIRST_MOVE_PLANE].sum()), 15)
+        self.assertEqual(planes[0, TURN_PLANE].max(), 0)
+        self.assertEqual(planes[1, TURN_PLANE].min(), 1)
+        codes, black_to_move = squares_from_positions(today_game.to_bytes() + ChessVar().to_bytes())
+        self.assertEqual(bytes(codes[0]), bytes(today_game._squares))
+        self.assertEqual(black_to_move.tolist(), [True, False])
+        self.assertRaises(ValueError, squares_from_positions, b"\0" * 80)
+
+    def test_2(self):
+        """Tests the mobility map of the side to move counts the moves of generate_legal_moves to every square."""
+        games = [today_game for today_game in random_games(60, 3) if today_game.get_game_state() == "UNFINISHED"]
+        codes, black_to_move = squares_from_games(games)
+        maps = mobility_maps(codes).reshape(-1, 2, 64)
+        for num, today_game in enumerate(games):
+            counts = [0] * 64
+            for move in today_game.generate_legal_moves():
+                counts[move & 63] += 1
+            self.assertEqual(maps[num, int(black_to_move[num])].tolist(), counts)
+
+    def test_3(self):
+        """Tests the attack map marks exactly the opponent pieces some move of the side to move would remove."""
+        games = [today_game for today_game in random_games(60, 4) if today_game.get_game_state() == "UNFINISHED"]
+        codes, black_to_move = squares_from_games(games)
+        maps = attack_maps(codes).reshape(-1, 2, 64)
+        for num, today_game in enumerate(games):
+            own_color = BLACK if black_to_move[num] else 0
+            opponent = {sq for sq, code in enumerate(today_game._squares) if code and code & BLACK != own_color}
+            removed = set()
+            for move in today_game.generate_legal_moves():
+                today_game.make_encoded_move(move)
+                squares = today_game._squares
+                removed |= {sq for sq in opponent if not squares[sq] or squares[sq] & BLACK == own_color}
+                today_game.unmake_move()
+            attacked = {sq for sq in opponent if maps[num, int(black_to_move[num]), sq]}
+            self.assertEqual(attacked, removed)
@@ -5,101 +5,424 @@
 #              but without castling, en passant, and pawn promotion. The first player side to capture all the
 #              opponent's pieces of one chess piece type wins.
 
-import string
+import random
+import struct
+from collections import deque
+
+# Compact square codes used by the board. The low 3 bits hold the chess piece type, bit 3 is set for black pieces and
+# bit 4 marks a pawn that still has its first move (the "pawn 1" of the square strings). An empty square is 0.
+EMPTY = 0
+PAWN = 1
+ROOK = 2
+KNIGHT = 3
+BISHOP = 4
+QUEEN = 5
+KING = 6
+PIECE_MASK = 7
+BLACK = 8
+FIRST_MOVE = 16
+
+PIECE_NAMES = ("-", "pawn", "rook", "knight", "bishop", "queen", "king")      # Piece type code -> chess piece name
+COLOR_NAMES = ("white", "black")                                              # (code >> 3) & 1 -> side color
+
+# Squares are numbered 0-63 in the same order as the rows of the string board: a8 is 0, h8 is 7, a1 is 56, h1 is 63.
+SQUARE_NAMES = tuple(col + row for row in "87654321" for col in "abcdefgh")  # Square number -> "b7"
+SQUARE_INDEX = {name: num for num, name in enumerate(SQUARE_NAMES)}           # "b7" -> square number
+SQUARE_COORDS = tuple(divmod(num, 8) for num in range(64))                   # Square number -> (row, column) number
+
+
+def _build_piece_tables():
+    """Builds the tables converting between square codes and the 'color chess_piece' text of the string board.
+    Returns a tuple (code to text list, (color, chess piece) to code dictionary)."""
+    code_to_text = ["- -"] * 32
+    text_to_code = {}
+    for color_bit, color in ((0, "white"), (BLACK, "black")):
+        for piece in range(PAWN, KING + 1):
+            code_to_text[piece | color_bit] = f"{color} {PIECE_NAMES[piece]}"
+            text_to_code[(color, PIECE_NAMES[piece])] = piece | color_bit
+        code_to_text[PAWN | color_bit | FIRST_MOVE] = f"{color} pawn 1"
+        text_to_code[(color, "pawn 1")] = PAWN | color_bit | FIRST_MOVE
+    return tuple(code_to_text), text_to_code
+
+
+_CODE_TO_TEXT, _TEXT_TO_CODE = _build_piece_tables()
+
+
+def _build_start_squares():
+    """Returns the 64 square codes of the starting position."""
+    back_row = (ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)
+    squares = bytearray(64)
+    for col in range(8):
+        squares[col] = back_row[col] | BLACK                       # Black's back row (row 8)
+        squares[8 + col] = PAWN | BLACK | FIRST_MOVE               # Black pawns (row 7)
+        squares[48 + col] = PAWN | FIRST_MOVE                      # White pawns (row 2)
+        squares[56 + col] = back_row[col]                          # White's back row (row 1)
+    return bytes(squares)
+
+
+_START_SQUARES = _build_start_squares()
+_CAPTURES_TO_WIN = (0, 8, 2, 2, 2, 1, 1)                 # Piece type code -> captures of that type that win the game
+
+
+def _index_pieces(squares):
+    """Takes 64 square codes and returns a list where index = color bit | piece type code (code & 15) and value = set
+    of the squares holding that side's pieces of that type, as a 64-bit mask (bit n set = square number n). Index 0,
+    7, 8 and 15 (no piece type) stay 0."""
+    pieces = [0] * 16
+    for sq_num, code in enumerate(squares):
+        if code != EMPTY:
+            pieces[code & 15] |= 1 << sq_num
+    return pieces
+
+
+def _mask_squares(mask):
+    """Takes a 64-bit square mask and returns a list of its square numbers in increasing order."""
+    sq_nums = []
+    while mask:
+        low_bit = mask & -mask
+        sq_nums.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return sq_nums
+
+
+_START_PIECES = _index_pieces(_START_SQUARES)
+# Square number * 32 + square code -> 'sq_location: color chess_piece' string of the string board
+_SQUARE_TEXT = tuple(f"{SQUARE_NAMES[sq_num]}: {_CODE_TO_TEXT[code]}" for sq_num in range(64) for code in range(32))
+_START_BOARD = tuple(tuple(_SQUARE_TEXT[sq_num * 32 + _START_SQUARES[sq_num]]             # Rows of the starting board
+                           for sq_num in range(row_start, row_start + 8)) for row_start in range(0, 64, 8))
+
+
+def _build_vertical_capture_squares():
+    """Returns the squares a pawn moving to each square checks for a vertical capture (see
+    PawnMove.check_vertical_capture): a tuple indexed by color bit * 8 + destination square number (so white's 64
+    entries and then black's) of (left square number, right square number), -1 where there is no square. Column a's
+    left side wraps around to column h of the same row."""
+    table = []
+    for color_bit in (0, BLACK):
+        for dest in range(64):
+            row, col = SQUARE_COORDS[dest]
+            # Row r of the board is row number 8 - r: white checks list number r - 1, black r + 1
+            vert_row = 7 - row if color_bit == 0 else 9 - row
+            if vert_row > 7:
+                table.append((-1, -1))
+            else:
+                table.append((vert_row * 8 + (col - 1) % 8, vert_row * 8 + col + 1 if col < 7 else -1))
+    return tuple(table)
+
+
+_VERTICAL_CAPTURE_SQUARES = _build_vertical_capture_squares()
+
+
+def _build_move_tables():
+    """Builds the tables used to generate moves: for each square, the knight targets, king targets, rook rays,
+    bishop rays (moving away from row 8 or column a) and the squares the bishop checks when moving towards row 8 and
+    column a. That direction is kept apart because BishopMove also checks the destination square and the one after
+    it (a -1 row or column wrapping around to the last one). Returns a tuple of the five tables."""
+    knight_targets, king_targets, rook_rays, bishop_rays, up_left_checks = [], [], [], [], []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        knight_targets.append(tuple((row + row_step) * 8 + col + col_step
+                                    for row_step, col_step in ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                                                               (1, -2), (1, 2), (2, -1), (2, 1))
+                                    if 0 <= row + row_step < 8 and 0 <= col + col_step < 8))
+        king_targets.append(tuple((row + row_step) * 8 + col + col_step
+                                  for row_step in (-1, 0, 1) for col_step in (-1, 0, 1)
+                                  if (row_step or col_step) and 0 <= row + row_step < 8 and 0 <= col + col_step < 8))
+        rays = []
+        for row_step, col_step in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, 1), (1, -1)):
+            ray = []
+            row_to, col_to = row + row_step, col + col_step
+            while 0 <= row_to < 8 and 0 <= col_to < 8:
+                ray.append(row_to * 8 + col_to)
+                row_to, col_to = row_to + row_step, col_to + col_step
+            rays.append(tuple(ray))
+        rook_rays.append(tuple(rays[:4]))
+        bishop_rays.append(tuple(rays[4:]))
+        up_left_checks.append(tuple((row - step) % 8 * 8 + (col - step) % 8 for step in range(1, min(row, col) + 2)))
+    return tuple(knight_targets), tuple(king_targets), tuple(rook_rays), tuple(bishop_rays), tuple(up_left_checks)
+
+
+_KNIGHT_TARGETS, _KING_TARGETS, _ROOK_RAYS, _BISHOP_RAYS, _UP_LEFT_CHECKS = _build_move_tables()
+
+
+def _build_zobrist_keys():
+    """Builds the random 64-bit keys of the position hash from a fixed seed, so every process gives the same hash for
+    the same position. Returns (square keys, black to move key, score keys). Square keys are indexed by
+    square number * 32 + square code and score keys by (color num * 8 + piece type) * 64 + number collected; the key
+    of an empty square and of a score of 0 is 0."""
+    rnd = random.Random(0x5EED)
+    square_keys = [0 if code == EMPTY else rnd.getrandbits(64) for sq in range(64) for code in range(32)]
+    black_to_move = rnd.getrandbits(64)
+    score_keys = [0 if count == 0 else rnd.getrandbits(64) for piece in range(16) for count in range(64)]
+    return tuple(square_keys), black_to_move, tuple(score_keys)
+
+
+_ZOBRIST_SQUARES, _ZOBRIST_BLACK_TO_MOVE, _ZOBRIST_SCORES = _build_zobrist_keys()
+_START_HASH = 0                                                         # Hash of the starting position
+for _sq_num, _code in enumerate(_START_SQUARES):
+    _START_HASH ^= _ZOBRIST_SQUARES[_sq_num * 32 + _code]
+_PIECE_NUMBERS = {name: num for num, name in enumerate(PIECE_NAMES)}   # Chess piece name -> piece type code
+
+_CODE_TO_FEN = ["?"] * 32                                                # Square code -> to_fen letter
+for _code, _letter in ((PAWN | FIRST_MOVE, "p"), (PAWN, "m"), (ROOK, "r"), (KNIGHT, "n"), (BISHOP, "b"), (QUEEN, "q"),
+                       (KING, "k")):
+    _CODE_TO_FEN[_code | BLACK] = _letter
+    _CODE_TO_FEN[_code] = _letter.upper()
+_FEN_TO_CODE = {letter: code for code, letter in enumerate(_CODE_TO_FEN) if letter != "?"}
+_DIGITS = "012345678"
+_DIGIT_VALUES = {digit: int(digit) for digit in "12345678"}
+_VALID_CODES = bytes([EMPTY] + sorted(_FEN_TO_CODE.values()))
+
+_POSITION_STRUCT = struct.Struct("<64sBH12B")                           # See ChessVar.to_bytes
+POSITION_SIZE = _POSITION_STRUCT.size
+
+EVENT_NAMES = ("move_attempted", "move_rejected", "move_made", "capture", "game_over",   # Events of ChessVar.subscribe
+               "board_changed")
+
+
+def encode_move(original_sq, destination_sq):
+    """Takes the square moved from and the square moved to (i.e. "d2", "d4") and returns the move as one integer:
+    square number moved from * 64 + square number moved to."""
+    return SQUARE_INDEX[original_sq] << 6 | SQUARE_INDEX[destination_sq]
+
+
+def decode_move(move):
+    """Takes a move encoded by encode_move (or generate_legal_moves) and returns (square moved from, square moved
+    to)."""
+    return SQUARE_NAMES[move >> 6], SQUARE_NAMES[move & 63]
+
 
 class ChessVar:
     """Represents a variant of chess consisting of a board, white side, black side, current player turn of
-    the game, round number row number to list converter, and column letter to order in list number. To win the game,
-    one side must capture all of an opponent's pieces of one type."""
-
-    def __init__(self):
-        """Creates a ChessVar game with a board, black and white sides and their scores, a current turn (side),
-        round number, row to list in board converter (dictionary), column to order num in list converter (dictionary).
-        Initializes board as empty list and white_side as an object of WhiteSide class and black_side as an object
-        of BlackSide class. Current turn is initialized to white. Round number initialized to 1."""
-        self._board = self.create_game_board()
+    the game and round number. To win the game, one side must capture all of an opponent's pieces of one type.
+    The board is stored compactly as 64 square codes (see EMPTY, PAWN, ..., BLACK, FIRST_MOVE); the
+    'sq_location: color chess_piece' strings are only rendered when asked for through get_square or get_board."""
+
+    def __init__(self, use_bitboards=False):
+        """Creates a ChessVar game with a board, black and white sides and their scores, a current turn (side) and
+        round number. Initializes board as a bytearray copy of the starting position and white_side as an object of
+        WhiteSide class and black_side as an object of BlackSide class. Current turn is initialized to white. Round
+        number initialized to 1. If use_bitboards is True, moves are checked by the bitboard backend
+        (ChessBitboard.BitboardValidator) instead of the ChessPieceMove validators; both give the same answers.
+        Every move made adds a small tuple to the undo history used by unmake_move, and nothing is dropped until the
+        game is reset, restored or loaded, so the memory a game uses grows with its length."""
+        self._squares = bytearray(_START_SQUARES)
         self._white_side = WhiteSide()
         self._white_score = self._white_side.get_score()
         self._black_side = BlackSide()
         self._black_score = self._black_side.get_score()
         self._current_turn = "white"
         self._round_number = 1
-        self._row_to_list = {"8": 0, "7": 1, "6": 2, "5": 3, "4": 4, "3": 5, "2": 6, "1": 7 }  # Row to list converter
-                                                                                               # Keys=Row, values=list
-        self._col_to_num = {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7}    # Column to num converter
-                                                                                               # Keys=Col, values=order
+        self._hash = _START_HASH
+        # code & 15 -> mask of the squares with that piece (see _index_pieces)
+        self._pieces = list(_START_PIECES)
+        self._listeners = None                      # Dictionary where keys = event name, values = list of callbacks
+        # One (from, to, moved, in destination, captured sq, captured) for every move made
+        self._undo_stack = []
+        self._bitboards = None
+        self._attack_map = None                     # ChessAttacks.AttackMap, made by the first attack query
+        self._board_shared = False                  # True while _squares and _pieces are shared with a GameSnapshot
+        self._scores_shared = False                 # True while the sides and scores are shared with a GameSnapshot
+        if use_bitboards:
+            from ChessBitboard import BitboardValidator
+            self._bitboards = BitboardValidator(self._squares)
+
+    def reset(self):
+        """Puts the game back in the starting position as if it were new: scores, turn, round number, undo history,
+        subscribers, recorded events and attack maps are all cleared. The board and score dictionaries are reused,
+        and a game using bitboards keeps using them. Lets a finished game be recycled (see ChessPool) instead of
+        creating a new one."""
+        if self._board_shared:
+            self._unshare_board()
+        if self._scores_shared:
+            self._unshare_scores()
+        self._squares[:] = _START_SQUARES
+        for score in (self._white_score, self._black_score):
+            for name in score:
+                score[name] = 0
+        self._current_turn = "white"
+        self._round_number = 1
+        self._hash = _START_HASH
+        self._pieces = list(_START_PIECES)
+        self._undo_stack.clear()
+        self._attack_map = None
+        if self._bitboards is not None:
+            self._bitboards = type(self._bitboards)(self._squares)
+        if self._listeners is not None:
+            self._emit("board_changed", {"reason": "reset"})
+            self._listeners = None
+        if hasattr(self, "_recent_events"):
+            del self._recent_events
+
+    def copy(self):
+        """Returns a new game in the same position with the same undo history (so unmake_move works on both), using
+        bitboards if this game does. Subscribers and recorded events are not copied."""
+        new_game = type(self).__new__(type(self))
+        new_game._squares = bytearray(self._squares)
+        new_game._white_side = WhiteSide()
+        new_game._white_score = new_game._white_side.get_score()
+        new_game._white_score.update(self._white_score)
+        new_game._black_side = BlackSide()
+        new_game._black_score = new_game._black_side.get_score()
+        new_game._black_score.update(self._black_score)
+        new_game._current_turn = self._current_turn
+        new_game._round_number = self._round_number
+        new_game._hash = self._hash
+        new_game._pieces = list(self._pieces)
+        new_game._listeners = None
+        new_game._undo_stack = list(self._undo_stack)
+        new_game._bitboards = None
+        new_game._attack_map = None
+        new_game._board_shared = False
+        new_game._scores_shared = False
+        if self._bitboards is not None:
+            new_game._bitboards = type(self._bitboards)(new_game._squares)
+        return new_game
+
+    def snapshot(self):
+        """Returns a GameSnapshot of the current position. The snapshot shares the board, piece lists and sides with
+        the game instead of copying them; the game copies them (once) before it next changes them, so the snapshot
+        never changes. Taking a snapshot costs the same however long the game has gone on."""
+        self._board_shared = True
+        self._scores_shared = True
+        return GameSnapshot(self._squares, self._pieces, self._white_side, self._black_side, self._current_turn,
+                            self._round_number, self._hash, self._bitboards is not None)
+
+    def fork(self):
+        """Returns a new game in the same position that shares the board, piece lists and sides with this one until
+        either of them changes them (see snapshot), so a fork costs one small object instead of a copy. Unlike copy,
+        the fork's undo history starts at the fork; subscribers and recorded events are not passed on either."""
+        return self.snapshot().fork()
+
+    def restore(self, snapshot):
+        """Takes a GameSnapshot (of this game or any other) and sets the game back to its position, sharing the
+        board, piece lists and sides with the snapshot until the game next changes them. The undo history is emptied;
+        subscribers are kept."""
+        self._squares = snapshot._squares
+        self._pieces = snapshot._pieces
+        self._white_side = snapshot._white_side
+        self._white_score = snapshot._white_side.get_score()
+        self._black_side = snapshot._black_side
+        self._black_score = snapshot._black_side.get_score()
+        self._current_turn = snapshot._current_turn
+        self._round_number = snapshot._round_number
+        self._hash = snapshot._hash
+        self._board_shared = True
+        self._scores_shared = True
+        self._undo_stack.clear()
+        self._attack_map = None
+        if self._bitboards is not None:
+            self._bitboards = type(self._bitboards)(self._squares)
+        if self._listeners is not None:
+            self._emit("board_changed", {"reason": "restore"})
+
+    def _unshare_board(self):
+        """Gives the game its own copy of the board and piece lists it shares with a snapshot (see snapshot), so it
+        can change them."""
+        self._squares = bytearray(self._squares)
+        self._pieces = list(self._pieces)
+        self._board_shared = False
+        if self._attack_map is not None:
+            self._attack_map.set_board(self._squares)
+
+    def _unshare_scores(self):
+        """Gives the game its own sides and score dictionaries in place of the ones it shares with a snapshot."""
+        white_side = WhiteSide()
+        white_side.get_score().update(self._white_score)
+        black_side = BlackSide()
+        black_side.get_score().update(self._black_score)
+        self._white_side = white_side
+        self._white_score = white_side.get_score()
+        self._black_side = black_side
+        self._black_score = black_side.get_score()
+        self._scores_shared = False
+
+    def subscribe(self, event_name, callback):
+        """Takes an event name (one of EVENT_NAMES, or '*' for all of them) and a function, and calls the function as
+        callback(event_name, details) every time the event happens. details is a dictionary:
+        move_attempted: "from", "to" (square locations) and "turn" (side moving);
+        move_made: the same, "changes", a tuple of (square location, new contents as a to_fen letter, '' if empty)
+        for every square the move changed, and "captured", (square location, piece) or None;
+        move_rejected: the same and "reason" ('illegal move' or 'game over');
+        capture: "square", "piece" (i.e. 'black queen') and "by" (side capturing);
+        game_over: "state" ('WHITE_WON' or 'BLACK_WON');
+        board_changed: "reason" ('unmake_move', 'set_square', 'restore' or 'reset'), after any change to the position
+        that is not a move (reset sends it just before dropping the subscribers).
+        While nothing is subscribed, events are not even built."""
+        if self._listeners is None:
+            self._listeners = {}
+        self._listeners.setdefault(event_name, []).append(callback)
+
+    def unsubscribe(self, event_name, callback):
+        """Takes an event name and a function subscribed to it and stops calling the function for that event. Raises
+        KeyError if nothing is subscribed to the event and ValueError if the function is not."""
+        if self._listeners is None:
+            raise KeyError(event_name)
+        callbacks = self._listeners[event_name]
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._listeners[event_name]
+        if not self._listeners:
+            self._listeners = None
+
+    def record_events(self, max_events):
+        """Keeps the last max_events events (of every kind) in a ring buffer, returned by get_recent_events. Calling it
+        again only changes the size of the buffer, keeping the most recent events that fit; the buffer is never
+        subscribed twice."""
+        self._recent_events = deque(getattr(self, "_recent_events", ()), maxlen=max_events)
+        if self._listeners is None or self._record_event not in self._listeners.get("*", ()):
+            self.subscribe("*", self._record_event)
+
+    def _record_event(self, event_name, details):
+        """Adds an event to the ring buffer of recent events."""
+        self._recent_events.append((event_name, details))
+
+    def get_recent_events(self):
+        """Returns a list of (event name, details) of the recent events, oldest first. Empty if record_events was not
+        called."""
+        return list(getattr(self, "_recent_events", ()))
+
+    def _emit(self, event_name, details):
+        """Calls every function subscribed to the event or to all events with the event name and details."""
+        for callback in self._listeners.get(event_name, ()):
+            callback(event_name, details)
+        for callback in self._listeners.get("*", ()):
+            callback(event_name, details)
 
     def create_game_board(self):
         """Creates starting game board 8x8 (rows 1-8) and (columns a-h) consisting of 8 lists (each with 8 elements)
-        within the board (an empty list initially). If a square is empty, it is occupied with a "-" in the list.
+        within the board. If a square is empty, it contains 'sq_location: - -'.
         For an occupied square, it contains 'sq_location: color chess_piece'.
-        For example: 'c2: white pawn'"""
-        board_whole = list()
-        ind = 8
-        for each_row in range(8):
-            row = []
-            if each_row == 0 or each_row == 7:
-                # If this is the first or last row
-                if each_row == 0:
-                    # First row is black side's back row
-                    color = "black"
-                else:
-                    # Last row is white side's back row
-                    color = "white"
-                for place in range(8):
-                    location = string.ascii_lowercase[place] + str(each_row + ind)
-                    if place == 0 or place == 7:
-                        # Places rooks
-                        chess_piece = "rook"
-                    if place == 1 or place == 6:
-                        # Places knights
-                        chess_piece = "knight"
-                    if place == 2 or place == 5:
-                        # Places bishops
-                        chess_piece = "bishop"
-                    if place == 3:
-                        # Place queen
-                        chess_piece = "queen"
-                    if place == 4:
-                        # Place king
-                        chess_piece = "king"
-
-                    row.append(f"{location}: {color} {chess_piece}")
-            elif each_row == 1 or each_row == 6:
-                # If pawn row
-                chess_piece = "pawn 1"
-                if each_row == 1:
-                    # This row is black pawns
-                    color = "black"
-                else:
-                    # This row is white pawns
-                    color = "white"
-                for place in range(8):
-                    location = string.ascii_lowercase[place] + str(each_row + ind)
-                    row.append(f"{location}: {color} {chess_piece}")
-            else:
-                # Empty squares
-                for place in range(8):
-                    empty = "-"
-                    location = string.ascii_lowercase[place] + str(each_row + ind)
-                    row.append(f"{location}: {empty} {empty}")
-            ind -= 2
-            board_whole.append(row)
-        return board_whole
+        For example: 'c2: white pawn'. The board is copied from a template rendered once."""
+        return [list(row) for row in _START_BOARD]
+
+    def _render_board(self, squares):
+        """Takes 64 square codes and returns them as the string board (8 lists of 8 'sq_location: color chess_piece'
+        strings, row 8 first). The strings come from a table of every square and code, so none are built."""
+        return [[_SQUARE_TEXT[sq * 32 + squares[sq]] for sq in range(row_start, row_start + 8)]
+                for row_start in range(0, 64, 8)]
 
+    def get_board(self):
+        """Returns the current board rendered as the string board (8 lists of 8 'sq_location: color chess_piece'
+        strings, row 8 first). The lists are built on every call, so changing them does not change the game."""
+        return self._render_board(self._squares)
 
     def display_board(self):
         """Prints current board. Iterates through board and prints what each square contains."""
-        for row in self._board:
-            print([square for square in row])
+        for row in self.get_board():
+            print(row)
             print()
 
     def get_white_score(self):
         """Returns white side's score."""
+        if self._scores_shared:
+            self._unshare_scores()
         return self._white_score
 
     def get_black_score(self):
         """Returns white side's score."""
+        if self._scores_shared:
+            self._unshare_scores()
         return self._black_score
 
     def get_game_state(self):
@@ -129,148 +452,529 @@ class ChessVar:
         else:
             # If it was just white's turn, make it black's turn
             self._current_turn = "black"
+        self._hash ^= _ZOBRIST_BLACK_TO_MOVE
+
+    def _compute_hash(self):
+        """Computes the position hash from scratch: the keys of every square code, of black to move and of every
+        number of collected pieces in the two scores. The round number is not part of the position."""
+        position_hash = 0
+        for sq_num, code in enumerate(self._squares):
+            position_hash ^= _ZOBRIST_SQUARES[sq_num * 32 + code]
+        if self._current_turn == "black":
+            position_hash ^= _ZOBRIST_BLACK_TO_MOVE
+        for color_num, score in enumerate((self._white_score, self._black_score)):
+            for chess_piece, count in score.items():
+                position_hash ^= _ZOBRIST_SCORES[(color_num * 8 + _PIECE_NUMBERS[chess_piece]) * 64 + (count & 63)]
+        return position_hash
+
+    def to_fen(self):
+        """Returns the position as one line of text, like chess FEN: the rows from 8 to 1 separated by '/' (white
+        pieces in capitals P R N B Q K, black in lower case, a digit for a run of empty squares, and M/m for a pawn that
+        has used its first move), the current turn ('w' or 'b'), white's and black's scores (numbers of pawns, rooks,
+        knights, bishops, queens and kings collected, separated by commas) and the round number. The starting position
+        is 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1'."""
+        rows = []
+        squares = self._squares
+        for row_start in range(0, 64, 8):
+            row = ""
+            empty = 0
+            for code in squares[row_start:row_start + 8]:
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    row += _DIGITS[empty]
+                    empty = 0
+                row += _CODE_TO_FEN[code]
+            if empty:
+                row += _DIGITS[empty]
+            rows.append(row)
+        white_counts = ",".join([str(self._white_score[name]) for name in PIECE_NAMES[PAWN:]])
+        black_counts = ",".join([str(self._black_score[name]) for name in PIECE_NAMES[PAWN:]])
+        return f"{'/'.join(rows)} {self._current_turn[0]} {white_counts} {black_counts} {self._round_number}"
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Takes a position written by to_fen and returns a new game in that position. Raises ValueError if the text
+        is not a valid position."""
+        fields = fen.split()
+        if len(fields) != 5 or fields[1] not in ("w", "b"):
+            raise ValueError(f"not a ChessVar position: {fen!r}")
+        rows = fields[0].split("/")
+        squares = bytearray()
+        try:
+            for row in rows:
+                row_start = len(squares)
+                for char in row:
+                    if char in _DIGIT_VALUES:
+                        squares += bytes(_DIGIT_VALUES[char])
+                    else:
+                        squares.append(_FEN_TO_CODE[char])
+                if len(squares) - row_start != 8:
+                    raise ValueError(f"row {row!r} does not have 8 squares")
+            white_counts = [int(count) for count in fields[2].split(",")]
+            black_counts = [int(count) for count in fields[3].split(",")]
+            round_number = int(fields[4])
+        except (KeyError, ValueError):
+            raise ValueError(f"not a ChessVar position: {fen!r}") from None
+        if len(rows) != 8 or len(squares) != 64 or len(white_counts) != 6 or len(black_counts) != 6:
+            raise ValueError(f"not a ChessVar position: {fen!r}")
+        # The same limits as to_bytes: one byte for each count and two for the round number
+        if not all(0 <= count <= 255 for count in white_counts + black_counts) or not 1 <= round_number <= 65535:
+            raise ValueError(f"score count or round number out of range: {fen!r}")
+        today_game = cls()
+        today_game._load(squares, "white" if fields[1] == "w" else "black", round_number, white_counts, black_counts)
+        return today_game
+
+    def to_bytes(self):
+        """Returns the position as POSITION_SIZE (79) bytes: the 64 square codes, the current turn (0 white, 1 black),
+        the round number (2 bytes, little-endian) and white's then black's score counts (1 byte each, in PIECE_NAMES
+        order)."""
+        white_score = self._white_score
+        black_score = self._black_score
+        return _POSITION_STRUCT.pack(bytes(self._squares), self._current_turn == "black", self._round_number,
+                                     white_score["pawn"], white_score["rook"], white_score["knight"],
+                                     white_score["bishop"], white_score["queen"], white_score["king"],
+                                     black_score["pawn"], black_score["rook"], black_score["knight"],
+                                     black_score["bishop"], black_score["queen"], black_score["king"])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Takes a position written by to_bytes and returns a new game in that position. Raises ValueError if the data
+        is not POSITION_SIZE bytes or has an invalid square code, a turn other than 0 or 1 or a round number of 0."""
+        if len(data) != POSITION_SIZE:
+            raise ValueError(f"a ChessVar position is {POSITION_SIZE} bytes, not {len(data)}")
+        fields = _POSITION_STRUCT.unpack(data)
+        squares = fields[0]
+        if squares.translate(None, _VALID_CODES):
+            raise ValueError("invalid square code in ChessVar position")
+        if fields[1] > 1 or fields[2] < 1:
+            raise ValueError(f"invalid turn ({fields[1]}) or round number ({fields[2]}) in ChessVar position")
+        today_game = cls()
+        today_game._load(squares, COLOR_NAMES[fields[1]], fields[2], fields[3:9], fields[9:15])
+        return today_game
+
+    def _load(self, squares, current_turn, round_number, white_counts, black_counts):
+        """Takes 64 square codes, the current turn, round number and white's and black's score counts (in PIECE_NAMES
+        order) and sets the game to that position. The undo stack is emptied."""
+        if self._board_shared:
+            self._unshare_board()
+        if self._scores_shared:
+            self._unshare_scores()
+        self._squares[:] = squares
+        self._current_turn = current_turn
+        self._round_number = round_number
+        for num, name in enumerate(PIECE_NAMES[PAWN:]):
+            self._white_score[name] = white_counts[num]
+            self._black_score[name] = black_counts[num]
+        self._reindex()
+        self._undo_stack.clear()
+
+    def _reindex(self):
+        """Rebuilds everything kept up to date from the squares and scores (position hash, piece lists, bitboards,
+        attack maps) after they were all changed at once."""
+        self._hash = self._compute_hash()
+        self._pieces = _index_pieces(self._squares)
+        if self._bitboards is not None:
+            self._bitboards = type(self._bitboards)(self._squares)
+        if self._attack_map is not None:
+            self._attack_map = type(self._attack_map)(self._squares)
+
+    def position_hash(self):
+        """Returns the 64-bit hash of the position (board, current turn and scores). It is updated with every change
+        instead of being computed again, and the same position always has the same hash."""
+        return self._hash
+
+    def _change_score(self, color_num, chess_piece, change):
+        """Takes a side (0 for white, 1 for black), the type of chess piece collected and +1 or -1, and updates that
+        side's score and the position hash."""
+        if self._scores_shared:
+            self._unshare_scores()
+        if color_num:
+            side, score = self._black_side, self._black_score
+        else:
+            side, score = self._white_side, self._white_score
+        piece_name = PIECE_NAMES[chess_piece]
+        key_num = (color_num * 8 + chess_piece) * 64
+        self._hash ^= _ZOBRIST_SCORES[key_num + (score[piece_name] & 63)]
+        if change > 0:
+            side.set_score(piece_name)
+        else:
+            side.undo_score(piece_name)
+        self._hash ^= _ZOBRIST_SCORES[key_num + (score[piece_name] & 63)]
 
     def get_current_turn(self):
         """Returns current_turn (current player)."""
         return self._current_turn
 
+    def _put(self, sq_num, code):
+        """Takes a square number (0-63) and a square code and stores the code in that square. Every change to the
+        board goes through here, so the position hash and piece lists are updated here too, and a board shared with a
+        snapshot is copied here before its first change."""
+        if self._board_shared:
+            self._unshare_board()
+        squares = self._squares
+        old_code = squares[sq_num]
+        self._hash ^= _ZOBRIST_SQUARES[sq_num * 32 + old_code] ^ _ZOBRIST_SQUARES[sq_num * 32 + code]
+        squares[sq_num] = code
+        if old_code:
+            self._pieces[old_code & 15] ^= 1 << sq_num
+        if code:
+            self._pieces[code & 15] ^= 1 << sq_num
+        if self._bitboards is not None:
+            self._bitboards.set_square(sq_num, code)
+        if self._attack_map is not None:
+            self._attack_map.set_square(sq_num, code)
+
     def set_square(self, sq_location, side_color, chess_piece):
         """Takes square location and the side color and chess piece that will occupy the given square and updates it.
         Side color and chess piece can be '-' if square is now empty."""
-        row = sq_location[1]                                            # Gets number of row
-        col = sq_location[0]                                            # Gets letter column
-        row_num = int(self._row_to_list[row])                           # Converts row to list in board
-        col_order = self._col_to_num[col]                               # Converts column to order num in list of board
-
-        if chess_piece == "-":
+        if chess_piece == "-" or side_color == "-":
             # If square is now empty
-            self._board[row_num][col_order] = f"{sq_location}: {side_color} {chess_piece}"
+            self._put(SQUARE_INDEX[sq_location], EMPTY)
         else:
             # If new chess piece occupies square, update
-            self._board[row_num][col_order] = f"{sq_location}: {side_color} {chess_piece}"
+            self._put(SQUARE_INDEX[sq_location], _TEXT_TO_CODE[(side_color, chess_piece)])
+        if self._listeners is not None:
+            self._emit("board_changed", {"reason": "set_square"})
 
     def get_square(self, sq_location):
         """Takes square location string and returns what's contained in that square. If square has '- -'
         location key square is empty."""
-        row = sq_location[1]                                            # Gets number of row
-        col = sq_location[0]                                            # Gets letter column
-        row_num = int(self._row_to_list[row])                           # Converts row to list in board
-        col_order = self._col_to_num[col]                               # Converts column to order num in list of board
-        sq = self._board[row_num][col_order]                            # Contents of sq
-
-        return sq              # "sq_location: side color chess piece" and "sq_location: - -" if empty
+        code = self._squares[SQUARE_INDEX[sq_location]]
+
+        return f"{sq_location}: {_CODE_TO_TEXT[code]}"    # "sq_location: side color chess piece" and "sq_location: - -"
+
+    def get_piece_squares(self, side_color, chess_piece):
+        """Takes a side color ('white' or 'black') and a chess piece name ('pawn', 'rook', ...) and returns a tuple of
+        the square locations of that side's pieces of that type, in board order (a8 to h1). Uses the piece lists kept
+        by every change to the board instead of looking at all 64 squares."""
+        mask = self._pieces[(BLACK if side_color == "black" else 0) | _PIECE_NUMBERS[chess_piece]]
+        return tuple(SQUARE_NAMES[sq_num] for sq_num in _mask_squares(mask))
+
+    def count_pieces(self, side_color, chess_piece):
+        """Takes a side color and a chess piece name and returns how many of that side's pieces of that type are on
+        the board."""
+        return self._pieces[(BLACK if side_color == "black" else 0) | _PIECE_NUMBERS[chess_piece]].bit_count()
+
+    def get_material(self, side_color):
+        """Takes a side color and returns a dictionary where keys = chess piece names and values = how many of that
+        side's pieces of that type are on the board."""
+        color_bit = BLACK if side_color == "black" else 0
+        return {PIECE_NAMES[chess_piece]: self._pieces[color_bit | chess_piece].bit_count()
+                for chess_piece in range(PAWN, KING + 1)}
+
+    def pieces_before_loss(self, side_color, chess_piece):
+        """Takes a side color and a chess piece name and returns how many more of that side's pieces of that type the
+        opponent has to capture to win (1 means the next such capture loses the game, 0 that it was already lost).
+        This is the number of captures still needed, worked out from the opponent's score as get_game_state does, not
+        the number of those pieces left on the board (see count_pieces): a piece that leaves the board without being
+        scored, such as one a pawn steps forward onto, does not count, so the result can be more than the pieces
+        left."""
+        chess_piece = _PIECE_NUMBERS[chess_piece]
+        opponent_score = self._white_score if side_color == "black" else self._black_score
+        return max(_CAPTURES_TO_WIN[chess_piece] - opponent_score[PIECE_NAMES[chess_piece]], 0)
+
+    def _get_attack_map(self):
+        """Returns the game's ChessAttacks.AttackMap, making it the first time. From then on every change to the
+        board keeps it up to date."""
+        if self._attack_map is None:
+            from ChessAttacks import AttackMap
+            self._attack_map = AttackMap(self._squares)
+        return self._attack_map
+
+    def attacked_squares(self, side_color):
+        """Takes a side color and returns a tuple of the square locations (a8 to h1) where that side could capture an
+        opponent piece with its next move, whether or not one is there. A pawn attacks the squares it can move to and
+        the squares it could vertically capture on."""
+        mask = self._get_attack_map().get_attacked(BLACK if side_color == "black" else 0)
+        return tuple(SQUARE_NAMES[sq_num] for sq_num in _mask_squares(mask))
+
+    def attackers_of(self, sq_location):
+        """Takes a square location and returns a tuple of the square locations (a8 to h1) of the pieces, of either
+        side, that attack it (see attacked_squares)."""
+        mask = self._get_attack_map().get_attackers(SQUARE_INDEX[sq_location])
+        return tuple(SQUARE_NAMES[sq_num] for sq_num in _mask_squares(mask))
+
+    def threatened_pieces(self, side_color):
+        """Takes a side color and returns a tuple of the square locations (a8 to h1) of that side's pieces the
+        opponent could capture with its next move."""
+        color_bit = BLACK if side_color == "black" else 0
+        pieces = self._pieces
+        own = (pieces[color_bit | PAWN] | pieces[color_bit | ROOK] | pieces[color_bit | KNIGHT] |
+               pieces[color_bit | BISHOP] | pieces[color_bit | QUEEN] | pieces[color_bit | KING])
+        mask = self._get_attack_map().get_attacked(color_bit ^ BLACK) & own
+        return tuple(SQUARE_NAMES[sq_num] for sq_num in _mask_squares(mask))
 
     def is_move_legal(self, original_sq, destination_sq):
         """Takes the square moved from (original_sq) (i.e. "b3")and square moved to (destination_sq). Checks the chess
         piece in the original_sq and makes sure the change in location is legal for that piece type. If not legal or
-        other pieces in path, returns False. Otherwise, returns True. To check what's in square, calls get_square."""
+        other pieces in path, returns False. Otherwise, returns True."""
 
-        in_original_sq = self.get_square(original_sq)
-        if "-" in in_original_sq or in_original_sq[4:9] != self._current_turn:
+        orig_num = SQUARE_INDEX[original_sq]
+        dest_num = SQUARE_INDEX[destination_sq]
+        in_original_sq = self._squares[orig_num]
+        if in_original_sq == EMPTY or COLOR_NAMES[in_original_sq >> 3 & 1] != self._current_turn:
             # If original square is empty or if has opponent piece
             return False
 
-        in_dest_sq = self.get_square(destination_sq)
-        if in_dest_sq[4:9] == self._current_turn:
+        in_dest_sq = self._squares[dest_num]
+        if in_dest_sq != EMPTY and COLOR_NAMES[in_dest_sq >> 3 & 1] == self._current_turn:
             # If destination square is occupied and has current turn's piece
             return False
 
         # ALREADY CHECKED FOR INVALIDITY IN ORIGINAL AND DESTINATION SQUARES,
         # CHECK ON CHESS PIECE VALIDITY
-
-        if "pawn" in in_original_sq:
-            pawn_move = PawnMove(original_sq, destination_sq)
-            return pawn_move.is_move_valid(self._round_number, self._board, in_original_sq[-1])
-
-        elif "rook" in in_original_sq:
-            rook_move = RookMove(original_sq, destination_sq)
-            return rook_move.is_move_valid(self._board)
-
-        elif "knight" in in_original_sq:
-            knight_move = KnightMove(original_sq, destination_sq)
-            return knight_move.is_move_valid()
-
-        elif "bishop" in in_original_sq:
-            bishop_move = BishopMove(original_sq, destination_sq)
-            return bishop_move.is_move_valid(self._board)
-
-        elif "queen" in in_original_sq:
-            queen_move = QueenMove(original_sq, destination_sq)
-            return queen_move.is_move_valid(self._board)
-
-        elif "king" in in_original_sq:
-            king_move = KingMove(original_sq, destination_sq)
-            return king_move.is_move_valid()
+        if self._bitboards is not None:
+            return self._bitboards.is_move_valid(in_original_sq, orig_num, dest_num)
+
+        # The shared validator of the chess piece (PawnMove, RookMove, ...)
+        return _VALIDATORS[in_original_sq & PIECE_MASK].validate(orig_num, dest_num, self._squares,
+                                                                 in_original_sq & FIRST_MOVE != 0)
+
+    def _add_piece_moves(self, orig, moves):
+        """Takes the square number of one of the current player's pieces and a list, and appends the encoded moves that
+        piece can legally make to the list. Gives the same moves as is_move_legal."""
+        squares = self._squares
+        code = squares[orig]
+        own_color = code & BLACK
+        chess_piece = code & PIECE_MASK
+        move_from = orig << 6
+
+        if chess_piece == PAWN:
+            # Pawns move 1 forwards or backwards, or 2 on their first move if the square in between is empty
+            for step in (-8, 8):
+                dest = orig + step
+                if 0 <= dest < 64:
+                    in_dest = squares[dest]
+                    if in_dest == EMPTY or in_dest & BLACK != own_color:
+                        moves.append(move_from | dest)
+                    if code & FIRST_MOVE and in_dest == EMPTY and 0 <= dest + step < 64:
+                        in_dest = squares[dest + step]
+                        if in_dest == EMPTY or in_dest & BLACK != own_color:
+                            moves.append(move_from | dest + step)
+            return
+
+        if chess_piece == KNIGHT or chess_piece == KING:
+            targets = _KNIGHT_TARGETS[orig] if chess_piece == KNIGHT else _KING_TARGETS[orig]
+            for dest in targets:
+                in_dest = squares[dest]
+                if in_dest == EMPTY or in_dest & BLACK != own_color:
+                    moves.append(move_from | dest)
+            return
+
+        rays = ()
+        if chess_piece == ROOK or chess_piece == QUEEN:
+            rays = _ROOK_RAYS[orig]
+        if chess_piece == BISHOP or chess_piece == QUEEN:
+            rays += _BISHOP_RAYS[orig]
+            # Towards row 8 and column a the destination and the square after it have to be empty
+            checks = _UP_LEFT_CHECKS[orig]
+            for num in range(len(checks)):
+                if squares[checks[num]] != EMPTY:
+                    break
+                if num:
+                    moves.append(move_from | checks[num - 1])
+        for ray in rays:
+            for dest in ray:
+                in_dest = squares[dest]
+                if in_dest == EMPTY:
+                    moves.append(move_from | dest)
+                    continue
+                if in_dest & BLACK != own_color:
+                    moves.append(move_from | dest)
+                break
+
+    def generate_legal_moves(self):
+        """Returns a tuple of every move the current player can make, each encoded as one integer (see encode_move
+        and decode_move). Returns an empty tuple if the game is over, since make_move would refuse every move."""
+        if self.get_game_state() != "UNFINISHED":
+            return ()
+        pieces = self._pieces
+        own_color = BLACK if self._current_turn == "black" else 0
+        moves = []
+        for sq_num in _mask_squares(pieces[own_color | PAWN] | pieces[own_color | ROOK] | pieces[own_color | KNIGHT] |
+                                    pieces[own_color | BISHOP] | pieces[own_color | QUEEN] | pieces[own_color | KING]):
+            self._add_piece_moves(sq_num, moves)
+        return tuple(moves)
+
+    def legal_destinations(self, sq_location):
+        """Takes a square location and returns a tuple of the square locations the piece in it can legally move to.
+        Returns an empty tuple if the square is empty, has an opponent piece or the game is over."""
+        sq_num = SQUARE_INDEX[sq_location]
+        code = self._squares[sq_num]
+        if code == EMPTY or COLOR_NAMES[code >> 3 & 1] != self._current_turn or self.get_game_state() != "UNFINISHED":
+            return ()
+        moves = []
+        self._add_piece_moves(sq_num, moves)
+        return tuple(SQUARE_NAMES[move & 63] for move in moves)
 
     def make_move(self, original_sq, destination_sq):
         """Takes strings representing square moved from and square moved to. If square moved from has
         opponent's piece, illegal move attempted (calls is_move_legal to check), or game is over
         (calling get_game_state), updates turn, returns False. Otherwise, makes indicated move and removes
-        captured piece (if any) (calling set_square to do so), updates score (if needed), update whose turn
-        (turn_changer), and returns True."""
+        captured piece (if any), updates score (if needed), update whose turn (turn_changer), and returns True."""
 
-        print(f"from_square is {original_sq} and to_square is {destination_sq}")
+        if self._listeners is not None:
+            self._emit("move_attempted", {"from": original_sq, "to": destination_sq, "turn": self._current_turn})
 
         # Checks if original_sq has opponent or empty, if destination_sq has current player's piece, or if move is
         # illegal -> if so, return FALSE
         if self.is_move_legal(original_sq, destination_sq) is False:
+            if self._listeners is not None:
+                self._emit("move_rejected", {"from": original_sq, "to": destination_sq, "turn": self._current_turn,
+                                             "reason": "illegal move"})
             return False
 
         # Check is game over - get_game_state -> if so, False
-        elif self.get_game_state() == "WHITE_WON" or self.get_game_state() == "BLACK_WON":
+        elif self.get_game_state() != "UNFINISHED":
+            if self._listeners is not None:
+                self._emit("move_rejected", {"from": original_sq, "to": destination_sq, "turn": self._current_turn,
+                                             "reason": "game over"})
             return False
 
-
         # Otherwise:
-        in_orig_square = self.get_square(original_sq)
-        in_dest_square = self.get_square(destination_sq)
+        self._play(SQUARE_INDEX[original_sq], SQUARE_INDEX[destination_sq])
 
+        # VALID MOVE OR VALID CAPTURE
+        return True
+
+    def make_encoded_move(self, move):
+        """Takes a move encoded as one integer (as given by generate_legal_moves), makes it and returns True. The move
+        is not checked, so it has to be one of the moves generate_legal_moves gave for the current position."""
+        self._play(move >> 6, move & 63)
+        return True
+
+    def _play(self, orig_num, dest_num):
+        """Takes the square numbers moved from and to of a legal move. Makes the move and removes captured piece (if
+        any), updates score (if needed), update whose turn (turn_changer) and records how to undo it."""
+        in_orig_square = self._squares[orig_num]
+        in_dest_square = self._squares[dest_num]
+        captured_sq = -1
 
         # If destination sq is occupied and has opponent, CAPTURE OCCURS, update score of current player
 
         # If pawn, check vertical capture:
-        if "pawn" in in_orig_square:
-            pawn_piece = PawnMove(original_sq, destination_sq)
-            vert_capture = pawn_piece.check_vertical_capture(self._board, self._current_turn)
-            if vert_capture:
-                self.set_square(vert_capture, "-", "-")
-                if "pawn" in vert_capture:
-                    chess_piece_cap = vert_capture[10:14]
-                else:
-                    chess_piece_cap = vert_capture[10:]
-                if self._current_turn == "white":
-                    self._white_side.set_score(chess_piece_cap)
-                else:
-                    self._black_side.set_score(chess_piece_cap)
-
-        # If not, check regular capture:
-        else:
-            if "pawn" in in_dest_square:
-                chess_piece_cap = in_dest_square[10:14]
-            else:
-                chess_piece_cap = in_dest_square[10:]
-            if "-" not in in_dest_square and in_dest_square[4:9] != self._current_turn:
-                if self._current_turn == "white":
-                    self._white_side.set_score(chess_piece_cap)
-                elif self._current_turn == "black":
-                    self._black_side.set_score(chess_piece_cap)
-
-        if "pawn" in in_orig_square:
-            chess_piece = in_orig_square[10:14]
+        if in_orig_square & PIECE_MASK == PAWN:
+            vert_capture = _VALIDATORS[PAWN].vertical_capture(dest_num, self._squares, in_orig_square & BLACK)
+            if vert_capture is not None:
+                captured_sq = vert_capture
+
+        # If not, check regular capture (the move is legal so it is an opponent's piece):
+        elif in_dest_square != EMPTY:
+            captured_sq = dest_num
+
+        if captured_sq == -1:
+            captured = EMPTY
         else:
-            chess_piece = in_orig_square[10:]
+            captured = self._squares[captured_sq]
+            self._change_score(in_orig_square >> 3 & 1, captured & PIECE_MASK, 1)
+            if captured_sq != dest_num:
+                self._put(captured_sq, EMPTY)
+
+        # Still make move regardless. A pawn that has moved loses its first move.
+        self._put(orig_num, EMPTY)                                         # empty original_sq
+        self._put(dest_num, in_orig_square & ~FIRST_MOVE)                  # update destination_sq with current
+                                                                           # player and its chess piece
+        self._undo_stack.append((orig_num, dest_num, in_orig_square, in_dest_square, captured_sq, captured))
 
-        # Still make move regardless
-        self.set_square(original_sq, "-", "-")                                     # empty original_sq
-        self.set_square(destination_sq, self._current_turn, chess_piece)           # update destination_sq with current
-                                                                                   # player and its chess piece
         # Update turn
         self.turn_changer()
 
-        # VALID MOVE OR VALID CAPTURE
+        if self._listeners is not None:
+            self._emit_move_events(orig_num, dest_num, captured_sq, captured)
+
+    def _emit_move_events(self, orig_num, dest_num, captured_sq, captured):
+        """Takes the square numbers moved from and to and the captured square number and code (-1 and EMPTY if
+        nothing was captured) of the move just made, and sends the move_made, capture and game_over events."""
+        mover = "white" if self._current_turn == "black" else "black"
+        changes = ((SQUARE_NAMES[orig_num], ""), (SQUARE_NAMES[dest_num], _CODE_TO_FEN[self._squares[dest_num]]))
+        if captured_sq not in (-1, dest_num):
+            changes += ((SQUARE_NAMES[captured_sq], ""),)
+        captured_piece = None if captured_sq == -1 else (SQUARE_NAMES[captured_sq], _CODE_TO_TEXT[captured])
+        self._emit("move_made", {"from": SQUARE_NAMES[orig_num], "to": SQUARE_NAMES[dest_num], "turn": mover,
+                                 "changes": changes, "captured": captured_piece})
+        if captured_sq != -1:
+            self._emit("capture", {"square": captured_piece[0], "piece": captured_piece[1], "by": mover})
+            game_state = self.get_game_state()
+            if game_state != "UNFINISHED":
+                self._emit("game_over", {"state": game_state})
+
+    def unmake_move(self):
+        """Takes back the last move made by make_move or make_encoded_move: puts the moved and captured pieces back,
+        takes the capture off the score and gives the turn (and round number) back. Returns False if there is no move
+        to take back (none made since the game was created, reset, restored or loaded), otherwise True."""
+        if not self._undo_stack:
+            return False
+        orig_num, dest_num, in_orig_square, in_dest_square, captured_sq, captured = self._undo_stack.pop()
+
+        # Give the turn back to the side that made the move
+        if self._current_turn == "white":
+            self._current_turn = "black"
+            self._round_number -= 1
+        else:
+            self._current_turn = "white"
+        self._hash ^= _ZOBRIST_BLACK_TO_MOVE
+
+        self._put(dest_num, in_dest_square)
+        self._put(orig_num, in_orig_square)
+        if captured_sq != -1:
+            self._put(captured_sq, captured)
+            self._change_score(in_orig_square >> 3 & 1, captured & PIECE_MASK, -1)
+        if self._listeners is not None:
+            self._emit("board_changed", {"reason": "unmake_move"})
         return True
 
 
+class GameSnapshot:
+    """Represents a position saved by ChessVar.snapshot: the game's board, piece lists and sides at that moment
+    (shared with the game, not copied), its current turn, round number and position hash, and whether it used
+    bitboards. Games copy a shared board or side before changing it, so a snapshot never changes and any number of
+    snapshots and forks of one position share a single board."""
+
+    __slots__ = ("_squares", "_pieces", "_white_side", "_black_side", "_current_turn", "_round_number", "_hash",
+                 "_use_bitboards")
+
+    def __init__(self, squares, pieces, white_side, black_side, current_turn, round_number, position_hash,
+                 use_bitboards):
+        """Creates a GameSnapshot of a game's (shared) squares, piece lists and sides and its turn, round number and
+        position hash."""
+        self._squares = squares
+        self._pieces = pieces
+        self._white_side = white_side
+        self._black_side = black_side
+        self._current_turn = current_turn
+        self._round_number = round_number
+        self._hash = position_hash
+        self._use_bitboards = use_bitboards
+
+    def get_current_turn(self):
+        """Returns the side to move in the saved position."""
+        return self._current_turn
+
+    def get_round_number(self):
+        """Returns the round number of the saved position."""
+        return self._round_number
+
+    def position_hash(self):
+        """Returns the position hash of the saved position (see ChessVar.position_hash)."""
+        return self._hash
+
+    def fork(self):
+        """Returns a new game in the saved position with no undo history or subscribers, sharing the board, piece
+        lists and sides with the snapshot until it changes them. It uses bitboards if the game snapshotted did."""
+        today_game = ChessVar.__new__(ChessVar)
+        today_game._listeners = None
+        today_game._undo_stack = []
+        today_game._bitboards = None
+        today_game._attack_map = None
+        today_game.restore(self)
+        if self._use_bitboards:
+            from ChessBitboard import BitboardValidator
+            today_game._bitboards = BitboardValidator(self._squares)
+        return today_game
+
+
 class BlackSide:
     """Represents the black side of the chess variant game."""
 
@@ -283,6 +987,10 @@ class BlackSide:
         """Takes name of chess piece collected (string) and updates BlackSide's score."""
         self._score[piece_collected] += 1               # Increments chess piece collected score by 1
 
+    def undo_score(self, piece_collected):
+        """Takes name of chess piece collected (string) and takes it back off BlackSide's score."""
+        self._score[piece_collected] -= 1               # Decrements chess piece collected score by 1
+
     def get_score(self):
         """Returns BlackSide score."""
         return self._score
@@ -300,69 +1008,101 @@ class WhiteSide:
         """Takes name of chess piece collected (string) and updates WhiteSide's score."""
         self._score[piece_collected] += 1               # Increments chess piece collected score by 1
 
+    def undo_score(self, piece_collected):
+        """Takes name of chess piece collected (string) and takes it back off WhiteSide's score."""
+        self._score[piece_collected] -= 1               # Decrements chess piece collected score by 1
+
     def get_score(self):
         """Returns WhiteSide score."""
         return self._score
 
 
 class ChessPieceMove:
-    """Represents a ChessPieceMove with an original square and destination square."""
+    """Represents a ChessPieceMove with an original square and destination square. The chess piece validators keep
+    no state of their own: validate takes square numbers, so ChessVar checks every move with one shared validator per
+    chess piece type (see _VALIDATORS) instead of making new objects. The original and destination squares are only
+    needed for the older is_move_valid form. Each chess piece validator defines validate."""
+
+    __slots__ = ("_original_sq", "_destination_sq")
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a ChessPieceMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
+    def __init__(self, original_sq=None, destination_sq=None):
+        """Creates a ChessPieceMove with an original_sq and destination_sq (both optional, since validate does not
+        use them)."""
         self._original_sq = original_sq        # COL LETTER, ROW NUMBER "b7"
         self._destination_sq = destination_sq
-        self._row_to_list = {"8": 0, "7": 1, "6": 2, "5": 3, "4": 4, "3": 5, "2": 6, "1": 7}  # Row to list converter
-        self._col_to_num = {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7}   # Column to num converter
 
+    def _is_square_empty(self, game_board, row_num, col_order):
+        """Takes a board, a row (list number) and a column (order num in list) and returns True if that square is
+        empty. The board can be ChessVar's compact board (64 square codes) or the string board of
+        create_game_board/get_board. A row or column of -1 wraps around to the last one, as list indexes do."""
+        if isinstance(game_board, (bytes, bytearray)):
+            return game_board[row_num % 8 * 8 + col_order % 8] == EMPTY
+        return "-" in game_board[row_num][col_order]
+
+    def is_move_valid(self, game_board):
+        """Checks if the move from the original square to the destination square is valid for the chess piece."""
+        return self.validate(SQUARE_INDEX[self._original_sq], SQUARE_INDEX[self._destination_sq], game_board)
 
 
 class PawnMove(ChessPieceMove):
     """Represents a PawnMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a PawnMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self, round_number, board_game, first_move_if_there):
+    def validate(self, orig_num, dest_num, game_board, first_move=False):
         """Checks if proposed pawn move is valid. Pawns can move forward 1 and if it's the first move, can move
-        forward 2."""
-        row_orig = self._row_to_list[self._original_sq[1]]  # gets row -> corresponding list NUM
-        col_orig = self._col_to_num[self._original_sq[0]]   # gets column -> corresponding order NUM in list
-
-        row_dest = self._row_to_list[self._destination_sq[1]]
-        col_dest = self._col_to_num[self._destination_sq[0]]
-
-        if first_move_if_there == "1":
+        forward 2 if the square in between is empty."""
+        row_orig, col_orig = SQUARE_COORDS[orig_num]
+        row_dest, col_dest = SQUARE_COORDS[dest_num]
+        if col_orig != col_dest:
+            return False
+        if first_move and abs(row_orig - row_dest) == 2:
             # Pawn can move 2 or 1 if it's the first move for that pawn
-            if abs(row_orig-row_dest) == 2 and col_orig == col_dest:
-                if row_orig > row_dest:
-                    sq_bw = board_game[row_dest+1][col_orig]
-                    if "-" not in sq_bw:
-                        return False
-                elif row_dest > row_orig:
-                    sq_bw = board_game[row_orig + 1][col_orig]
-                    if "-" not in sq_bw:
-                        return False
-                return True                                      # if nothing in the way
-
+            return self._is_square_empty(game_board, (row_orig + row_dest) // 2, col_orig)
         # If not first move, can only move forward 1
-        return abs(row_orig-row_dest) == 1 and col_orig == col_dest
+        return abs(row_orig - row_dest) == 1
 
-    def check_vertical_capture(self, board_game, current_turn):
-        """Checks if pawn can vertical capture."""
-        left_vertical_col = self._col_to_num[self._destination_sq[0]] - 1
-        right_vertical_col = self._col_to_num[self._destination_sq[0]] + 1
+    def is_move_valid(self, round_number, board_game, first_move_if_there):
+        """Checks if proposed pawn move is valid. first_move_if_there is '1' if it's the pawn's first move."""
+        return self.validate(SQUARE_INDEX[self._original_sq], SQUARE_INDEX[self._destination_sq], board_game,
+                             first_move_if_there == "1")
+
+    def vertical_capture(self, dest_num, game_board, color_bit):
+        """Takes the square number a pawn moves to, ChessVar's compact board and the pawn's color bit (0 white, BLACK)
+        and returns the square number of the piece the pawn vertically captures, or None if there is none (see
+        check_vertical_capture)."""
+        left_sq, right_sq = _VERTICAL_CAPTURE_SQUARES[color_bit * 8 + dest_num]
+        if left_sq == -1:
+            return None
+        left_code = game_board[left_sq]
+        if left_code != EMPTY and left_code & BLACK != color_bit:
+            # Left vertical capture
+            return left_sq
+        if right_sq != -1:
+            right_code = game_board[right_sq]
+            if right_code != EMPTY and right_code & BLACK != color_bit:
+                # Right vertical capture
+                return right_sq
+        return None
 
-        if current_turn == "white":
-            vert_row = int(self._destination_sq[1]) - 1
+    def check_vertical_capture(self, board_game, current_turn):
+        """Checks if pawn can vertical capture. With ChessVar's compact board, returns the square number of the
+        captured piece; with the string board, returns the captured square's string. Returns None if no capture.
+        For a pawn moving to row r, the squares checked are in row r - 1 (white) or r + 1 (black) of the board list,
+        on either side of the destination column; squares beyond the edge of the board are never captured."""
+        dest_num = SQUARE_INDEX[self._destination_sq]
+        color_bit = BLACK if current_turn == "black" else 0
+        if isinstance(board_game, (bytes, bytearray)):
+            return self.vertical_capture(dest_num, board_game, color_bit)
+
+        left_num, right_num = _VERTICAL_CAPTURE_SQUARES[color_bit * 8 + dest_num]
+        if left_num == -1:
+            return None
+        left_sq = board_game[left_num // 8][left_num % 8]
+        if right_num != -1:
+            right_sq = board_game[right_num // 8][right_num % 8]
         else:
-            vert_row = int(self._destination_sq[1]) + 1
-
-        left_sq = board_game[vert_row][left_vertical_col]
-        right_sq = board_game[vert_row][right_vertical_col]
+            right_sq = "-"
         if "-" not in left_sq and current_turn not in left_sq:
             # Left vertical capture
             vert_capture = left_sq
@@ -373,50 +1113,30 @@ class PawnMove(ChessPieceMove):
             vert_capture = None
         return vert_capture
 
+
 class RookMove(ChessPieceMove):
     """Represents a RookMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a RookMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self, game_board):
+    def validate(self, orig_num, dest_num, game_board, first_move=False):
         """Checks if proposed rook move is valid. Rooks can move forwards, backwards, or sideways any number
         of squares, as long as no other pieces are in its way."""
-
-        row_orig = self._row_to_list[self._original_sq[1]]              # gets row -> corresponding list NUM
-        col_orig = self._col_to_num[self._original_sq[0]]               # gets column -> corresponding order NUM in list
-
-        row_dest = self._row_to_list[self._destination_sq[1]]
-        col_dest = self._col_to_num[self._destination_sq[0]]
+        row_orig, col_orig = SQUARE_COORDS[orig_num]
+        row_dest, col_dest = SQUARE_COORDS[dest_num]
 
         if row_orig == row_dest:
             # Piece is moving sideways - SAME ROW
-            if col_orig > col_dest:                                     # trying to move left (from starting board)
-                for each_col_num in range(col_dest + 1, col_orig):
-                    sq = game_board[row_orig][each_col_num]
-                    if "-" not in sq:
-                        return False                                    # piece in way
-            elif col_dest > col_orig:                                   # trying to move right (from starting board)
-                for each_col_num in range(col_orig + 1, col_dest):
-                    sq = game_board[row_orig][each_col_num]
-                    if "-" not in sq:
-                        return False
+            for each_col_num in range(min(col_orig, col_dest) + 1, max(col_orig, col_dest)):
+                if not self._is_square_empty(game_board, row_orig, each_col_num):
+                    return False                                        # piece in way
             return True                                                 # No piece in the way
 
         elif col_orig == col_dest:
             # Piece is moving forwards/backwards - SAME COLUMN
-            if row_dest > row_orig:                                     # trying to move down (from starting board)
-                for row_num in range(row_orig+1, row_dest):
-                    sq = game_board[row_num][col_orig]
-                    if "-" not in sq:
-                        return False
-            elif row_orig > row_dest:                                   # trying to move up (from starting board)
-                for row_num in range(row_dest+1, row_orig):
-                    sq = game_board[row_num][col_orig]
-                    if "-" not in sq:
-                        return False
+            for row_num in range(min(row_orig, row_dest) + 1, max(row_orig, row_dest)):
+                if not self._is_square_empty(game_board, row_num, col_orig):
+                    return False
             return True                                                 # No piece in the way
         # If tried diagonal:
         return False
@@ -425,43 +1145,31 @@ class RookMove(ChessPieceMove):
 class KnightMove(ChessPieceMove):
     """Represents a KnightMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a KnightMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self):
+    def validate(self, orig_num, dest_num, game_board=None, first_move=False):
         """Checks if proposed knight move is valid. Knights can move in an L shape (moving 2 and moving 1 in different
         directions) and can jump over other pieces."""
-        row_orig = self._row_to_list[self._original_sq[1]]  # gets row -> corresponding list NUM
-        col_orig = self._col_to_num[self._original_sq[0]]   # gets column -> corresponding order NUM in list
+        row_orig, col_orig = SQUARE_COORDS[orig_num]
+        row_dest, col_dest = SQUARE_COORDS[dest_num]
+        # If L shape is made (moves of 2 and 1 are the only ones whose product is 2)
+        return abs(row_orig - row_dest) * abs(col_orig - col_dest) == 2
 
-        row_dest = self._row_to_list[self._destination_sq[1]]
-        col_dest = self._col_to_num[self._destination_sq[0]]
-
-        if abs(row_orig - row_dest) == 2 and abs(col_orig - col_dest) == 1:
-            return True
-        elif abs(col_orig - col_dest) == 2 and abs(row_orig - row_dest) == 1:
-            return True
-        # If L shape is not made:
-        return False
+    def is_move_valid(self):
+        """Checks if proposed knight move is valid."""
+        return self.validate(SQUARE_INDEX[self._original_sq], SQUARE_INDEX[self._destination_sq])
 
 
 class BishopMove(ChessPieceMove):
     """Represents a BishopMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a BishopMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self, game_board):
-        """Checks if proposed bishop move is valid."""
-        row_orig = self._row_to_list[self._original_sq[1]]  # gets row -> corresponding list NUM
-        col_orig = self._col_to_num[self._original_sq[0]]  # gets column -> corresponding order NUM in list
-
-        row_dest = self._row_to_list[self._destination_sq[1]]
-        col_dest = self._col_to_num[self._destination_sq[0]]
+    def validate(self, orig_num, dest_num, game_board, first_move=False):
+        """Checks if proposed bishop move is valid. When moving towards row 8 and column a, the destination and the
+        square after it are checked too (a -1 row or column wrapping around to the last one)."""
+        row_orig, col_orig = SQUARE_COORDS[orig_num]
+        row_dest, col_dest = SQUARE_COORDS[dest_num]
 
         if abs(row_orig - row_dest) == abs(col_orig - col_dest):
             # if moving diagonally, check to see if no pieces in the way
@@ -472,32 +1180,28 @@ class BishopMove(ChessPieceMove):
                 while row_start > row_stop and col_start < col_stop:
                     row_start -= 1
                     col_start += 1
-                    sq = game_board[row_start][col_start]
-                    if "-" not in sq:
+                    if not self._is_square_empty(game_board, row_start, col_start):
                         return False
             elif row_dest < row_orig and col_dest < col_orig:
                 # if row and col decr
                 while row_start > row_stop and col_start > col_stop:
                     row_start -= 1
                     col_start -= 1
-                    sq = game_board[row_start][col_start]
-                    if "-" not in sq:
+                    if not self._is_square_empty(game_board, row_start, col_start):
                         return False
             elif row_dest > row_orig and col_dest > col_orig:
                 # if row and col incr
                 while row_start < row_stop and col_start < col_stop:
                     row_start += 1
                     col_start += 1
-                    sq = game_board[row_start][col_start]
-                    if "-" not in sq:
+                    if not self._is_square_empty(game_board, row_start, col_start):
                         return False
             elif row_dest > row_orig and col_dest < col_orig:
                 # if row incr and col decr
                 while row_start < row_stop and col_start > col_stop:
                     row_start += 1
                     col_start -= 1
-                    sq = game_board[row_start][col_start]
-                    if "-" not in sq:
+                    if not self._is_square_empty(game_board, row_start, col_start):
                         return False
             # If diagonal and no piece found in its way, return True
             return True
@@ -508,51 +1212,44 @@ class BishopMove(ChessPieceMove):
 class QueenMove(ChessPieceMove):
     """Represents a QueenMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a QueenMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self, game_board):
+    def validate(self, orig_num, dest_num, game_board, first_move=False):
         """Checks if proposed queen move is valid. Queen can move like a rook or bishop."""
-        rook_move = RookMove(self._original_sq, self._destination_sq)
-        bishop_move = BishopMove(self._original_sq, self._destination_sq)
-
         # If its a valid rook or bishop move it's a valid queen move
-        return rook_move.is_move_valid(game_board) or bishop_move.is_move_valid(game_board)
+        return (_VALIDATORS[ROOK].validate(orig_num, dest_num, game_board) or
+                _VALIDATORS[BISHOP].validate(orig_num, dest_num, game_board))
 
 
 class KingMove(ChessPieceMove):
     """Represents a KingMove that inherits from ChessPieceMove."""
 
-    def __init__(self, original_sq, destination_sq):
-        """Creates a KingMove with an original_sq, destination_sq, row to list int converter, and column to order
-        num in list converter."""
-        super().__init__(original_sq, destination_sq)
+    __slots__ = ()
 
-    def is_move_valid(self):
+    def validate(self, orig_num, dest_num, game_board=None, first_move=False):
         """Checks if proposed king move is valid. King can move 1 square in any direction."""
-        row_orig = self._row_to_list[self._original_sq[1]]  # gets row -> corresponding list NUM
-        col_orig = self._col_to_num[self._original_sq[0]]  # gets column -> corresponding order NUM in list
+        row_orig, col_orig = SQUARE_COORDS[orig_num]
+        row_dest, col_dest = SQUARE_COORDS[dest_num]
+        # if 1 square was moved in some direction
+        return max(abs(row_orig - row_dest), abs(col_orig - col_dest)) == 1
 
-        row_dest = self._row_to_list[self._destination_sq[1]]
-        col_dest = self._col_to_num[self._destination_sq[0]]
+    def is_move_valid(self):
+        """Checks if proposed king move is valid."""
+        return self.validate(SQUARE_INDEX[self._original_sq], SQUARE_INDEX[self._destination_sq])
 
-        if abs(row_orig-row_dest) == 1 and col_orig == col_dest:
-            # if moved backward or forward 1
-            return True
-        elif abs(col_orig-col_dest) == 1 and row_orig == row_dest:
-            # if moved sideways 1
-            return True
-        elif abs(row_orig-row_dest) == 1 and abs(col_orig-col_dest) == 1:
-            # if moved diagonally 1
-            return True
-        # if 1 square was not moved
-        return False
+
+# One shared validator per chess piece type: piece type code -> validator (None for EMPTY)
+_VALIDATORS = (None, PawnMove(), RookMove(), KnightMove(), BishopMove(), QueenMove(), KingMove())
+
+
+def print_event(event_name, details):
+    """Prints an event of a ChessVar game (see ChessVar.subscribe)."""
+    print(event_name, " ".join(f"{key}={value}" for key, value in details.items()))
 
 
 def main():
     today_game = ChessVar()
+    today_game.subscribe("*", print_event)
     today_game.create_game_board()
     today_game.make_move("d2", "d4")  # white turn
     today_game.make_move("b7", "b5")  # black turn
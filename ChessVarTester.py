@@ -1,8 +1,13 @@
 
 import unittest
 import string
+import random
+import io
+import contextlib
+import tracemalloc
 from ChessVar import ChessVar, BlackSide, WhiteSide, ChessPieceMove, PawnMove
 from ChessVar import RookMove, KnightMove, BishopMove, QueenMove, KingMove
+from ChessVar import SQUARE_NAMES, POSITION_SIZE, encode_move, decode_move
 
 class TestChessVar(unittest.TestCase):
 
@@ -111,3 +116,310 @@ class TestChessVar(unittest.TestCase):
         self.assertFalse(today_game.make_move("e5", "e4")) # w - pawn not capturing
 
 
+
+    def test15(self):
+        """Tests get_board renders the compact board as the string board."""
+        today_game = ChessVar()
+        today_game.make_move("d2", "d4")
+        board = today_game.get_board()
+        self.assertEqual([len(row) for row in board], [8] * 8)
+        self.assertEqual(board[4][3], "d4: white pawn")
+        self.assertEqual(board[6][3], "d2: - -")
+        self.assertEqual(today_game.create_game_board()[6][3], "d2: white pawn 1")
+
+    def test16(self):
+        """Tests a vertical capture empties the captured square and a pawn move to the h column does not fail."""
+        today_game = ChessVar()
+        today_game.make_move("d2", "d4")
+        today_game.make_move("e7", "e5")          # black pawn captures f2
+        self.assertEqual(today_game.get_square("f2"), "f2: - -")
+        self.assertEqual(today_game.get_black_score()["pawn"], 1)
+        self.assertTrue(today_game.make_move("h2", "h3"))
+
+    def test17(self):
+        """Tests generate_legal_moves gives the same moves as checking every pair of squares with is_move_legal."""
+        today_game = ChessVar()
+        today_game.make_move("d2", "d4")
+        today_game.make_move("e7", "e5")
+        today_game.make_move("c1", "g5")
+        brute_force = {encode_move(a, b) for a in SQUARE_NAMES for b in SQUARE_NAMES if today_game.is_move_legal(a, b)}
+        self.assertEqual(set(today_game.generate_legal_moves()), brute_force)
+        self.assertEqual(len(ChessVar().generate_legal_moves()), 20)
+
+    def test18(self):
+        """Tests legal_destinations and decode_move."""
+        today_game = ChessVar()
+        self.assertEqual(set(today_game.legal_destinations("g1")), {"f3", "h3"})
+        self.assertEqual(today_game.legal_destinations("g8"), ())
+        self.assertEqual(decode_move(encode_move("d2", "d4")), ("d2", "d4"))
+
+    def test19(self):
+        """Tests unmake_move puts back the board, scores, turn and round number after each move of a random game."""
+        today_game = ChessVar()
+        rnd = random.Random(3)
+        states = []
+        while today_game.generate_legal_moves() and len(states) < 60:
+            states.append((today_game.get_board(), dict(today_game.get_white_score()),
+                           dict(today_game.get_black_score()), today_game.get_current_turn(),
+                           today_game._round_number))
+            today_game.make_encoded_move(rnd.choice(today_game.generate_legal_moves()))
+        while states:
+            self.assertTrue(today_game.unmake_move())
+            self.assertEqual((today_game.get_board(), today_game.get_white_score(), today_game.get_black_score(),
+                              today_game.get_current_turn(), today_game._round_number), states.pop())
+        self.assertFalse(today_game.unmake_move())
+
+    def test20(self):
+        """Tests position_hash is updated by make_move, unmake_move and set_square and matches a full computation."""
+        today_game = ChessVar()
+        start_hash = today_game.position_hash()
+        rnd = random.Random(5)
+        for ply in range(40):
+            moves = today_game.generate_legal_moves()
+            if not moves:
+                break
+            today_game.make_encoded_move(rnd.choice(moves))
+            self.assertEqual(today_game.position_hash(), today_game._compute_hash())
+        today_game.set_square("e4", "black", "queen")
+        self.assertEqual(today_game.position_hash(), today_game._compute_hash())
+        today_game.set_square("e4", "-", "-")
+        while today_game.unmake_move():
+            self.assertEqual(today_game.position_hash(), today_game._compute_hash())
+        self.assertEqual(today_game.position_hash(), start_hash)
+
+    def test21(self):
+        """Tests the same position reached by different move orders has the same hash."""
+        first_game = ChessVar()
+        second_game = ChessVar()
+        for original_sq, destination_sq in (("g1", "f3"), ("g8", "f6"), ("b1", "c3")):
+            first_game.make_move(original_sq, destination_sq)
+        for original_sq, destination_sq in (("b1", "c3"), ("g8", "f6"), ("g1", "f3")):
+            second_game.make_move(original_sq, destination_sq)
+        self.assertEqual(first_game.position_hash(), second_game.position_hash())
+        self.assertNotEqual(first_game.position_hash(), ChessVar().position_hash())
+
+    def test22(self):
+        """Tests move, capture, rejection and game over events are sent to subscribers and make_move prints nothing."""
+        today_game = ChessVar()
+        events = []
+        today_game.subscribe("*", lambda event_name, details: events.append((event_name, details)))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            today_game.make_move("d2", "d4")
+            today_game.make_move("e7", "e5")
+            today_game.make_move("g1", "f3")
+            today_game.make_move("d8", "g5")
+            today_game.make_move("c1", "g5")
+            today_game.make_move("a7", "a6")
+        self.assertEqual(output.getvalue(), "")
+        event_names = [event_name for event_name, details in events]
+        self.assertEqual(event_names.count("move_made"), 5)
+        self.assertIn(("capture", {"square": "f2", "piece": "white pawn 1", "by": "black"}), events)
+        self.assertIn(("capture", {"square": "g5", "piece": "black queen", "by": "white"}), events)
+        self.assertEqual(events[-3], ("game_over", {"state": "WHITE_WON"}))
+        self.assertEqual(events[-1], ("move_rejected", {"from": "a7", "to": "a6", "turn": "black",
+                                                        "reason": "game over"}))
+
+    def test23(self):
+        """Tests the ring buffer keeps only the latest events and unsubscribe stops events."""
+        today_game = ChessVar()
+        rejected = []
+        today_game.record_events(3)
+        today_game.subscribe("move_rejected", lambda event_name, details: rejected.append(details["reason"]))
+        today_game.make_move("d2", "d5")
+        today_game.make_move("d2", "d4")
+        self.assertEqual(rejected, ["illegal move"])
+        self.assertEqual([event_name for event_name, details in today_game.get_recent_events()],
+                         ["move_rejected", "move_attempted", "move_made"])
+        today_game.unsubscribe("*", today_game._record_event)
+        today_game.make_move("d7", "d6")
+        self.assertEqual(len(today_game.get_recent_events()), 3)
+        self.assertIsNone(ChessVar()._listeners)
+        self.assertRaises(KeyError, ChessVar().unsubscribe, "*", today_game._record_event)
+        self.assertRaises(ValueError, today_game.unsubscribe, "move_rejected", today_game._record_event)
+
+    def test24(self):
+        """Tests to_fen/from_fen and to_bytes/from_bytes give back the same position."""
+        today_game = ChessVar()
+        self.assertEqual(today_game.to_fen(), "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1")
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5"), ("g1", "f3"), ("d8", "g5")):
+            today_game.make_move(original_sq, destination_sq)
+        fen = today_game.to_fen()
+        self.assertEqual(fen, "rnb1kbnr/pppp1ppp/8/4m1q1/3M4/5N2/PPP1P1PP/RNBQKB1R w 0,0,0,0,0,0 1,0,0,0,0,0 3")
+        data = today_game.to_bytes()
+        self.assertEqual(len(data), POSITION_SIZE)
+        for copy_game in (ChessVar.from_fen(fen), ChessVar.from_bytes(data)):
+            self.assertEqual(copy_game.get_board(), today_game.get_board())
+            self.assertEqual(copy_game.get_black_score(), today_game.get_black_score())
+            self.assertEqual(copy_game.get_current_turn(), "white")
+            self.assertEqual(copy_game._round_number, 3)
+            self.assertEqual(copy_game.position_hash(), today_game.position_hash())
+            self.assertTrue(copy_game.make_move("c1", "g5"))
+            self.assertEqual(copy_game.get_game_state(), "WHITE_WON")
+
+    def test25(self):
+        """Tests from_fen and from_bytes reject invalid positions."""
+        for fen in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w 0,0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w 0,0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x 0,0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnrrnbqkbnr//8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,-1 0,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 256,0,0,0,0,0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 0",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 0,0,0,0,0,0 0,0,0,0,0,0 65536"):
+            self.assertRaises(ValueError, ChessVar.from_fen, fen)
+        self.assertRaises(ValueError, ChessVar.from_bytes, bytes(10))
+        self.assertRaises(ValueError, ChessVar.from_bytes, b"\x07" + ChessVar().to_bytes()[1:])
+        data = ChessVar().to_bytes()
+        self.assertRaises(ValueError, ChessVar.from_bytes, data[:64] + b"\x02" + data[65:])
+        self.assertRaises(ValueError, ChessVar.from_bytes, data[:65] + b"\x00\x00" + data[67:])
+
+    def test26(self):
+        """Tests the piece lists and material counts follow moves, captures, unmake_move, set_square and from_fen."""
+        today_game = ChessVar()
+        self.assertEqual(today_game.get_piece_squares("white", "knight"), ("b1", "g1"))
+        self.assertEqual(today_game.get_material("black"), {"pawn": 8, "rook": 2, "knight": 2, "bishop": 2,
+                                                            "queen": 1, "king": 1})
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5")):
+            today_game.make_move(original_sq, destination_sq)
+        # e5 captured f2 vertically
+        self.assertEqual(today_game.count_pieces("white", "pawn"), 7)
+        self.assertEqual(today_game.get_piece_squares("white", "pawn"), ("d4", "a2", "b2", "c2", "e2", "g2", "h2"))
+        today_game.unmake_move()
+        self.assertEqual(today_game.count_pieces("white", "pawn"), 8)
+        today_game.set_square("d5", "white", "queen")
+        self.assertEqual(today_game.get_piece_squares("white", "queen"), ("d5", "d1"))
+        today_game.set_square("d1", "-", "-")
+        self.assertEqual(today_game.get_piece_squares("white", "queen"), ("d5",))
+        copy_game = ChessVar.from_fen(today_game.to_fen())
+        for side_color in ("white", "black"):
+            self.assertEqual(copy_game.get_material(side_color), today_game.get_material(side_color))
+
+        # Random games: the piece lists always match the board
+        rnd = random.Random(26)
+        for _ in range(200):
+            moves = today_game.generate_legal_moves()
+            if not moves:
+                break
+            today_game.make_encoded_move(rnd.choice(moves))
+            for side_color in ("white", "black"):
+                for chess_piece in ("pawn", "rook", "knight", "bishop", "queen", "king"):
+                    squares = tuple(sq for sq in SQUARE_NAMES
+                                    if today_game.get_square(sq).startswith(f"{sq}: {side_color} {chess_piece}"))
+                    self.assertEqual(today_game.get_piece_squares(side_color, chess_piece), squares)
+
+    def test27(self):
+        """Tests pieces_before_loss counts down with captures of that type."""
+        today_game = ChessVar()
+        self.assertEqual(today_game.pieces_before_loss("black", "pawn"), 8)
+        self.assertEqual(today_game.pieces_before_loss("white", "queen"), 1)
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5")):
+            today_game.make_move(original_sq, destination_sq)
+        self.assertEqual(today_game.pieces_before_loss("white", "pawn"), 7)
+        self.assertEqual(today_game.pieces_before_loss("black", "pawn"), 8)
+        today_game.get_white_score()["rook"] = 1
+        self.assertEqual(today_game.pieces_before_loss("black", "rook"), 1)
+        today_game.get_white_score()["rook"] = 2
+        self.assertEqual(today_game.pieces_before_loss("black", "rook"), 0)
+        today_game.set_square("b8", "-", "-")
+        today_game.set_square("g8", "-", "-")
+        self.assertEqual(today_game.count_pieces("black", "knight"), 0)
+        self.assertEqual(today_game.pieces_before_loss("black", "knight"), 2)
+
+    def test28(self):
+        """Tests the shared validators (validate with square numbers) agree with the is_move_valid and
+        check_vertical_capture forms on both boards, and keep no per-object dictionaries."""
+        today_game = ChessVar()
+        today_game.create_game_board()
+        for original_sq, destination_sq in (("d2", "d4"), ("e7", "e5"), ("g1", "f3")):
+            today_game.make_move(original_sq, destination_sq)
+        string_board = today_game.get_board()
+        for board in (string_board, today_game._squares):
+            self.assertTrue(PawnMove("e5", "e4").is_move_valid(2, board, ""))
+            self.assertFalse(PawnMove("c7", "c5").is_move_valid(2, board, ""))
+            self.assertTrue(PawnMove("c7", "c5").is_move_valid(2, board, "1"))
+            self.assertTrue(RookMove("h1", "g1").is_move_valid(board))
+            self.assertFalse(BishopMove("f1", "d3").is_move_valid(board))
+            self.assertTrue(QueenMove("d8", "h4").is_move_valid(board))
+        self.assertTrue(KnightMove("f3", "g5").is_move_valid())
+        self.assertTrue(KingMove("e1", "d2").is_move_valid())
+        # d4 moving to d5 checks row 4 of the board list (row number 4): c4 and e4 are empty
+        self.assertIsNone(PawnMove("d4", "d5").check_vertical_capture(today_game._squares, "white"))
+        # e5 moving to e4 checks row 5 of the board list (row number 3): d3 is empty, so f3 is captured
+        self.assertEqual(PawnMove("e5", "e4").check_vertical_capture(string_board, "black"), "f3: white knight")
+        self.assertEqual(PawnMove("e5", "e4").check_vertical_capture(today_game._squares, "black"), 45)
+        self.assertEqual(PawnMove().vertical_capture(36, today_game._squares, 8), 45)
+        self.assertTrue(KnightMove().validate(45, 30, None))
+        self.assertFalse(hasattr(PawnMove("a2", "a3"), "__dict__"))
+
+    def test29(self):
+        """Tests snapshots stay the same and forks are independent of the game and each other while sharing the
+        board until one of them moves."""
+        today_game = ChessVar(use_bitboards=True)
+        for original_sq, destination_sq in (("d2", "d4"), ("h7", "h5"), ("b2", "b3"), ("c7", "c5")):
+            self.assertTrue(today_game.make_move(original_sq, destination_sq))
+        position = today_game.to_bytes()
+        snapshot = today_game.snapshot()
+        first_fork = today_game.fork()
+        second_fork = snapshot.fork()
+        self.assertIs(first_fork._squares, today_game._squares)
+        self.assertIs(second_fork._squares, today_game._squares)
+        self.assertEqual(snapshot.position_hash(), today_game.position_hash())
+        self.assertEqual(snapshot.get_current_turn(), "white")
+        self.assertEqual(snapshot.get_round_number(), 3)
+
+        self.assertTrue(today_game.make_move("g1", "f3"))
+        self.assertTrue(first_fork.make_move("c1", "a3"))
+        self.assertTrue(first_fork.make_move("c5", "c4"))
+        self.assertEqual(second_fork.to_bytes(), position)
+        self.assertNotEqual(first_fork.to_fen(), today_game.to_fen())
+        self.assertEqual(first_fork.position_hash(), ChessVar.from_fen(first_fork.to_fen()).position_hash())
+        self.assertIsNotNone(first_fork._bitboards)
+        self.assertTrue(first_fork.unmake_move())
+        self.assertTrue(first_fork.unmake_move())
+        self.assertFalse(first_fork.unmake_move())
+        self.assertEqual(first_fork.to_bytes(), position)
+
+        second_fork.get_white_score()["pawn"] = 5
+        self.assertEqual(snapshot.fork().get_white_score()["pawn"], 0)
+        today_game.attacked_squares("white")
+        today_game.restore(snapshot)
+        self.assertEqual(today_game.to_bytes(), position)
+        self.assertFalse(today_game.unmake_move())
+        self.assertEqual(today_game.attacked_squares("white"), ChessVar.from_bytes(position).attacked_squares("white"))
+        self.assertTrue(today_game.make_move("g1", "f3"))
+        self.assertEqual(today_game.attacked_squares("black"),
+                         ChessVar.from_bytes(today_game.to_bytes()).attacked_squares("black"))
+        self.assertEqual(snapshot.fork().to_bytes(), position)
+
+    def test30(self):
+        """Tests hundreds of forks and snapshots of a game cost kilobytes."""
+        today_game = ChessVar()
+        for original_sq, destination_sq in (("d2", "d4"), ("h7", "h5"), ("b2", "b3"), ("c7", "c5")):
+            today_game.make_move(original_sq, destination_sq)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            branches = [today_game.fork() for _ in range(250)] + [today_game.snapshot() for _ in range(250)]
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(branches), 500)
+        self.assertLess(used, 250 * 1024)
+
+    def test31(self):
+        """Tests calling record_events again resizes the buffer without recording every event twice."""
+        today_game = ChessVar()
+        today_game.record_events(4)
+        today_game.make_move("d2", "d4")
+        today_game.record_events(5)
+        today_game.record_events(5)
+        today_game.make_move("h7", "h5")
+        self.assertEqual([event_name for event_name, details in today_game.get_recent_events()],
+                         ["move_attempted", "move_made", "move_attempted", "move_made", "capture"])
+        today_game.record_events(2)
+        self.assertEqual([event_name for event_name, details in today_game.get_recent_events()],
+                         ["move_made", "capture"])
+        self.assertEqual(len(today_game._listeners["*"]), 1)